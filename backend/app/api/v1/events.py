@@ -0,0 +1,50 @@
+import asyncio
+import json
+import time
+from typing import Annotated
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+from app.core import deps
+from app.core.config import settings
+from app.services.events import events
+
+router = APIRouter()
+
+@router.get("/stream")
+async def stream_events(
+    current_user: Annotated[deps.TokenData, Depends(deps.get_current_user)]
+):
+    """
+    Server-Sent Events do condomínio (avisos, multas, ocorrências, reservas, usuários).
+    Cada evento diz apenas o que mudou (`event: <tabela>`, data com op/id); o cliente
+    busca os dados pelos endpoints normais. `resync` pede para recarregar tudo.
+    Não usa sessão do banco: a escuta é compartilhada (app.services.events).
+    """
+    subscription = events.subscribe(current_user)
+
+    async def event_source():
+        loop = asyncio.get_running_loop()
+        # Close when this connection's access token expires (its cookie expires with it):
+        # the client refreshes the session and opens a new stream
+        lifetime = settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+        if current_user.exp:
+            lifetime = current_user.exp - time.time()
+        deadline = loop.time() + lifetime
+        try:
+            yield "retry: 5000\n\n"
+            while loop.time() < deadline:
+                try:
+                    event = await asyncio.wait_for(subscription.get(), settings.EVENTS_HEARTBEAT)
+                except asyncio.TimeoutError:
+                    # Keeps proxies from closing an idle connection
+                    yield ": ping\n\n"
+                    continue
+                yield f"event: {event['table']}\ndata: {json.dumps(event)}\n\n"
+        finally:
+            events.unsubscribe(subscription)
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -1,98 +1,165 @@
-from fastapi import APIRouter, Depends
-from typing import List, Annotated
+from fastapi import APIRouter, Depends, Header, Response
+from typing import List, Annotated, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, desc
+from sqlalchemy import select, desc, literal, text, union_all, update
 from app.core import deps
 from app.announcements.models import Announcement
 from app.violations.models import Violation
 from app.users.models import User
-from app.schemas.notification import NotificationItem
+from app.models.notification import NotificationState
+from app.schemas.notification import NotificationItem, NotificationCount
 from datetime import datetime, timezone
 
 router = APIRouter()
 
+STAFF_ROLES = ['ADMIN', 'SINDICO', 'SUBSINDICO', 'CONSELHO', 'PORTEIRO', 'FINANCEIRO']
+
+async def get_state(db: AsyncSession, current_user: deps.TokenData) -> NotificationState:
+    """
+    Contador de não lidas / versão do feed do usuário (uma leitura por chave primária).
+    """
+    stmt = select(NotificationState).where(NotificationState.user_id == current_user.user_id)
+    state = (await db.execute(stmt)).scalar_one_or_none()
+    if state is None:
+        # User without a row yet (created before notification_state existed)
+        await db.execute(text("SELECT refresh_notification_state(:uid)"), {"uid": current_user.user_id})
+        await db.commit()
+        state = (await db.execute(stmt)).scalar_one()
+    return state
+
+def feed_headers(state: NotificationState) -> dict:
+    return {
+        "ETag": f'W/"{state.version}"',
+        "X-Unread-Count": str(state.unread_count),
+        # Always revalidate: the browser resends If-None-Match and gets a 304
+        "Cache-Control": "private, no-cache",
+    }
+
+def not_modified(state: NotificationState, if_none_match: Optional[str]) -> bool:
+    if not if_none_match:
+        return False
+    etag = f'W/"{state.version}"'
+    return any(tag.strip() in (etag, '*') for tag in if_none_match.split(','))
+
 @router.get("/", response_model=List[NotificationItem])
 async def get_notifications(
+    response: Response,
     db: Annotated[AsyncSession, Depends(deps.get_db)],
-    current_user: Annotated[deps.TokenData, Depends(deps.get_current_user)]
+    current_user: Annotated[deps.TokenData, Depends(deps.get_current_user)],
+    if_none_match: Annotated[Optional[str], Header()] = None
 ):
     """
     Agrega notificações de múltiplas fontes:
     1. Avisos (Announcements) do condomínio
     2. Infrações/Multas (Violations) do usuário
-    
-    Estado de leitura baseado em 'last_notification_check' do usuário.
+
+    Estado de leitura baseado em 'notification_state.last_read_at' do usuário.
+    Responde 304 quando o If-None-Match bate com a versão atual do feed.
     """
-    
-    # Check user's last read timestamp
-    user_stmt = select(User.last_notification_check).where(User.id == current_user.user_id)
-    last_check = (await db.execute(user_stmt)).scalar()
-    
-    notifications = []
-    
-    # 1. Fetch recent Announcements (last 5)
-    ann_stmt = select(Announcement).where(
+    state = await get_state(db, current_user)
+    headers = feed_headers(state)
+    if not_modified(state, if_none_match):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+
+    last_check = state.last_read_at
+
+    # 1. Recent Announcements (last 5)
+    ann_q = select(
+        Announcement.id, literal('ANNOUNCEMENT').label('kind'), Announcement.title,
+        Announcement.description, Announcement.created_at
+    ).where(
         Announcement.condominium_id == current_user.condo_id
-    ).order_by(desc(Announcement.created_at)).limit(5)
-    
-    announcements = (await db.execute(ann_stmt)).scalars().all()
-    
-    for ann in announcements:
-        is_read = False
-        if last_check and ann.created_at <= last_check:
-            is_read = True
-
-        # Determine link based on role
-        target_link = '/resident/announcements'
-        if current_user.role in ['ADMIN', 'SINDICO', 'SUBSINDICO', 'CONSELHO', 'PORTEIRO', 'FINANCEIRO']:
-            target_link = '/admin/announcements'
-            
-        notifications.append(NotificationItem(
-            id=str(ann.id),
-            title=f"Novo Aviso: {ann.title}",
-            description=ann.description[:50] + "..." if ann.description else "",
-            type='ANNOUNCEMENT',
-            created_at=ann.created_at,
-            read=is_read,
-            link=target_link
-        ))
-        
-    # 2. Fetch recent Violations (last 5) if Resident
-    if current_user.role == 'RESIDENT':
-        vio_stmt = select(Violation).where(
+    ).order_by(desc(Announcement.created_at)).limit(5).subquery()
+    queries = [select(ann_q)]
+
+    # 2. Recent Violations (last 5) if Resident
+    if current_user.role == 'RESIDENTE':
+        vio_q = select(
+            Violation.id, literal('VIOLATION').label('kind'), Violation.type.label('title'),
+            Violation.description, Violation.created_at
+        ).where(
             Violation.resident_id == current_user.user_id
-        ).order_by(desc(Violation.created_at)).limit(5)
-        
-        violations = (await db.execute(vio_stmt)).scalars().all()
-        
-        for vio in violations:
-            is_read = False
-            if last_check and vio.created_at <= last_check:
-                is_read = True
+        ).order_by(desc(Violation.created_at)).limit(5).subquery()
+        queries.append(select(vio_q))
+
+    # Combined list ordered by the database
+    feed = union_all(*queries).subquery()
+    rows = (await db.execute(
+        select(feed).order_by(desc(feed.c.created_at)).limit(10)
+    )).all()
+
+    # Determine link based on role
+    announcement_link = '/admin/announcements' if current_user.role in STAFF_ROLES else '/resident/announcements'
 
+    notifications = []
+    for row in rows:
+        is_read = bool(last_check and row.created_at <= last_check)
+        description = row.description[:50] + "..." if row.description else ""
+        if row.kind == 'ANNOUNCEMENT':
+            notifications.append(NotificationItem(
+                id=str(row.id),
+                title=f"Novo Aviso: {row.title}",
+                description=description,
+                type='ANNOUNCEMENT',
+                created_at=row.created_at,
+                read=is_read,
+                link=announcement_link
+            ))
+        else:
             notifications.append(NotificationItem(
-                id=str(vio.id),
-                title=f"Nova Notificação/Multa: {vio.type}",
-                description=vio.description[:50] + "..." if vio.description else "",
+                id=str(row.id),
+                title=f"Nova Notificação/Multa: {row.title}",
+                description=description,
                 type='VIOLATION',
-                created_at=vio.created_at,
+                created_at=row.created_at,
                 read=is_read,
                 link='/resident/issues'
             ))
-            
-    # Sort combined list by date desc
-    notifications.sort(key=lambda x: x.created_at, reverse=True)
-    
-    return notifications[:10]
+
+    return notifications
+
+@router.head("/")
+async def head_notifications(
+    db: Annotated[AsyncSession, Depends(deps.get_db)],
+    current_user: Annotated[deps.TokenData, Depends(deps.get_current_user)],
+    if_none_match: Annotated[Optional[str], Header()] = None
+):
+    """
+    Só os cabeçalhos (ETag, X-Unread-Count) para polling barato.
+    """
+    state = await get_state(db, current_user)
+    status_code = 304 if not_modified(state, if_none_match) else 200
+    return Response(status_code=status_code, headers=feed_headers(state))
+
+@router.get("/count", response_model=NotificationCount)
+async def count_unread(
+    response: Response,
+    db: Annotated[AsyncSession, Depends(deps.get_db)],
+    current_user: Annotated[deps.TokenData, Depends(deps.get_current_user)],
+    if_none_match: Annotated[Optional[str], Header()] = None
+):
+    state = await get_state(db, current_user)
+    headers = feed_headers(state)
+    if not_modified(state, if_none_match):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return NotificationCount(unread=state.unread_count, version=state.version)
 
 @router.post("/read-all")
 async def mark_all_read(
     db: Annotated[AsyncSession, Depends(deps.get_db)],
     current_user: Annotated[deps.TokenData, Depends(deps.get_current_user)]
 ):
-    stmt = select(User).where(User.id == current_user.user_id)
-    user = (await db.execute(stmt)).scalar_one()
     # Using simple utcnow to match DB timezone=True behavior which stores as UTC usually
-    user.last_notification_check = datetime.now(timezone.utc)
+    now = datetime.now(timezone.utc)
+    await db.execute(
+        update(User).where(User.id == current_user.user_id).values(last_notification_check=now)
+    )
+    await db.execute(
+        update(NotificationState)
+        .where(NotificationState.user_id == current_user.user_id)
+        .values(unread_count=0, last_read_at=now, version=NotificationState.version + 1)
+    )
     await db.commit()
     return {"status": "success"}
@@ -122,10 +122,10 @@ async def update_my_profile(
         
         # Verify current password
         # Need to import security logic. Assuming password_hash exists on User model.
-        if not security.verify_password(profile_update.current_password, user.password_hash):
+        if not await security.verify_password_async(profile_update.current_password, user.password_hash):
              raise HTTPException(status_code=401, detail="Senha atual incorreta.")
              
-        user.password_hash = security.get_password_hash(profile_update.password)
+        user.password_hash = await security.get_password_hash_async(profile_update.password)
 
     await db.commit()
     
@@ -0,0 +1,47 @@
+from typing import Dict
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+
+# Room for the other form fields and the multipart boundaries/headers
+MULTIPART_OVERHEAD = 64 * 1024
+
+class BodySizeLimitMiddleware:
+    """
+    Caps the request body of upload routes before Starlette spools it to disk:
+    a Content-Length above the limit is refused without reading the body, and
+    bodies without one (chunked) are cut off as soon as they exceed it.
+    `limits` maps a route path to the largest accepted file, in bytes.
+    """
+    def __init__(self, app, limits: Dict[str, int]):
+        self.app = app
+        self.limits = {path.rstrip("/"): max_size for path, max_size in limits.items()}
+
+    async def __call__(self, scope, receive, send):
+        max_size = None
+        if scope["type"] == "http" and scope["method"] in ("POST", "PUT"):
+            max_size = self.limits.get(scope["path"].rstrip("/"))
+        if max_size is None:
+            await self.app(scope, receive, send)
+            return
+
+        limit = max_size + MULTIPART_OVERHEAD
+        detail = f"Arquivo excede o limite de {max_size // (1024 * 1024)} MB."
+        for name, value in scope["headers"]:
+            if name == b"content-length" and value.isdigit() and int(value) > limit:
+                response = JSONResponse({"detail": detail}, status_code=413, headers={"Connection": "close"})
+                await response(scope, receive, send)
+                return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    # Raised inside the form parsing: FastAPI re-raises HTTPExceptions as is
+                    raise HTTPException(status_code=413, detail=detail)
+            return message
+
+        await self.app(scope, limited_receive, send)
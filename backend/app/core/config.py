@@ -11,6 +11,22 @@ class Settings(BaseSettings):
     POSTGRES_PASSWORD: str = "postgres"
     POSTGRES_DB: str = "maison_manager"
     DATABASE_URL: Optional[str] = None
+
+    # Connection pool (per uvicorn worker: total connections = workers * (size + overflow))
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 30  # seconds waiting for a free connection before failing
+    DB_POOL_RECYCLE: int = 1800  # seconds; -1 disables
+    DB_POOL_PRE_PING: bool = False  # extra round-trip per checkout, enable behind flaky networks
+    DB_POOL_SLOW_WAIT_MS: float = 500  # log a warning when a checkout waits longer; 0 disables
+
+    # asyncpg
+    DB_STATEMENT_CACHE_SIZE: int = 100  # asyncpg prepared statement cache (per connection)
+    DB_PREPARED_STATEMENT_CACHE_SIZE: int = 100  # SQLAlchemy adapter cache (per connection)
+    DB_COMMAND_TIMEOUT: Optional[float] = 60  # seconds per statement; None disables
+    # Running behind PgBouncer in transaction/statement pooling: server-side prepared
+    # statements cannot be reused across backends, so caching is turned off.
+    DB_PGBOUNCER: bool = False
     
     # Security
     # These MUST be provided via environment variables. The app will fail to start if missing.
@@ -18,10 +34,65 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 15
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    # JWT verification: 'jose' (python-jose) or 'pyjwt' (optional PyJWT package, faster)
+    JWT_BACKEND: str = "jose"
+    JWT_CACHE_SIZE: int = 2048  # verified tokens kept per worker; 0 disables the cache
+    
+    # Password hashing (bcrypt). Changing the cost rehashes each password on its next login.
+    PASSWORD_BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 2  # concurrent bcrypt operations per worker process
+    PASSWORD_HASH_QUEUE_LIMIT: int = 32  # pending operations before answering 503
     
     # Encryption Key for PGCrypto (must match what was used in DB Setup if applicable, or for App-side logic)
     APP_ENCRYPTION_KEY: str 
 
+    # GeoIP for login access logs: 'ip-api' (online), 'csv' / 'mmdb' (offline file at GEOIP_DB_PATH) or 'none'
+    GEOIP_BACKEND: str = "ip-api"
+    GEOIP_DB_PATH: Optional[str] = None
+    GEOIP_TIMEOUT: float = 3
+    GEOIP_CACHE_SIZE: int = 10000
+    GEOIP_CACHE_TTL: int = 86400  # seconds
+    GEOIP_QUEUE_SIZE: int = 1000
+
+    # Audit records: 'transactional' (written in the caller's transaction) or 'async'
+    # (queued at COMMIT and written in batches by a background task; the last
+    # AUDIT_FLUSH_INTERVAL seconds of records can be lost if the process dies)
+    AUDIT_MODE: str = "transactional"
+    AUDIT_QUEUE_SIZE: int = 10000
+    AUDIT_BATCH_SIZE: int = 500
+    AUDIT_FLUSH_INTERVAL: float = 1.0  # seconds
+    AUDIT_ENQUEUE_TIMEOUT: float = 2.0  # seconds waiting for queue space before writing in the caller's transaction
+    # 'insert' (multi-row INSERT) or 'copy' (COPY, needs a role that bypasses RLS on audit_logs)
+    AUDIT_WRITE_METHOD: str = "insert"
+
+    # Live events (GET /api/v1/events/stream). LISTEN needs a session-pooled connection:
+    # behind PgBouncer in transaction mode point EVENTS_DATABASE_URL straight at Postgres.
+    EVENTS_DATABASE_URL: Optional[str] = None
+    EVENTS_CLIENT_QUEUE_SIZE: int = 100  # undelivered events per client before it is told to resync
+    EVENTS_HEARTBEAT: float = 25  # seconds between keep-alive comments
+
+    # Document uploads: streamed to disk in chunks; files above DOCUMENT_OPTIMIZE_MIN_BYTES
+    # are optimized afterwards by a background job (app/services/document_jobs.py)
+    DOCUMENT_MAX_UPLOAD_BYTES: int = 50 * 1024 * 1024
+    DOCUMENT_UPLOAD_CHUNK_BYTES: int = 1024 * 1024
+    DOCUMENT_OPTIMIZE_MIN_BYTES: int = 1024 * 1024
+    # Document contents (app/documents/storage.py): 'local' (content-addressed files under
+    # DOCUMENT_STORAGE_DIR, default backend/storage/documents) or 's3' (needs boto3;
+    # credentials from the standard AWS_* variables). DOCUMENT_STORAGE_DIR also holds
+    # the staging area of uploads for both backends.
+    DOCUMENT_STORAGE: str = "local"
+    DOCUMENT_STORAGE_DIR: Optional[str] = None
+    DOCUMENT_S3_BUCKET: Optional[str] = None
+    DOCUMENT_S3_PREFIX: str = "documents/"
+    DOCUMENT_S3_ENDPOINT_URL: Optional[str] = None  # MinIO or another S3-compatible service
+    DOCUMENT_S3_REGION: Optional[str] = None
+
+    # CPU-bound file optimization (app/services/optimizer.py), run in separate processes
+    OPTIMIZER_WORKERS: int = 2
+    OPTIMIZER_TIMEOUT: float = 120  # seconds per job; the worker is interrupted (and recycled if stuck)
+    OPTIMIZER_MEMORY_LIMIT_MB: int = 1024  # address space per worker process; 0 disables
+    OPTIMIZER_QUEUE_LIMIT: int = 16  # queued + running jobs before new uploads get 503
+
     model_config = SettingsConfigDict(case_sensitive=True, env_file=".env", extra="ignore")
 
     def get_database_url(self) -> str:
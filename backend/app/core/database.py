@@ -1,18 +1,81 @@
+from uuid import uuid4
+from sqlalchemy import event, text
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
-from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.orm import DeclarativeBase, Session
 from app.core.config import settings
+from app.core.pool_metrics import InstrumentedQueuePool, instrument_checkouts, metrics
+
+def get_connect_args() -> dict:
+    """
+    asyncpg.connect() options.
+    """
+    args = {
+        "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        "prepared_statement_cache_size": settings.DB_PREPARED_STATEMENT_CACHE_SIZE,
+        "command_timeout": settings.DB_COMMAND_TIMEOUT,
+    }
+    if settings.DB_PGBOUNCER:
+        # No statement reuse, and unique names so two clients multiplexed on the
+        # same server backend never collide on "__asyncpg_stmt_1__".
+        args["statement_cache_size"] = 0
+        args["prepared_statement_cache_size"] = 0
+        args["prepared_statement_name_func"] = lambda: f"__asyncpg_{uuid4()}__"
+    return args
 
 # Create Async Engine
 engine = create_async_engine(
     settings.get_database_url(),
     echo=False,
-    future=True
+    future=True,
+    poolclass=InstrumentedQueuePool,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+    connect_args=get_connect_args()
+)
+
+metrics.slow_wait_ms = settings.DB_POOL_SLOW_WAIT_MS
+instrument_checkouts(engine)
+
+# Key in Session.info holding the RLS context of the request (see deps.get_db)
+SECURITY_CONTEXT_KEY = "security_context"
+
+# Transaction-local (is_local = true): values vanish at COMMIT/ROLLBACK, so a pooled
+# connection never carries the previous request's user into the next checkout.
+SET_SECURITY_CONTEXT_SQL = text(
+    "SELECT set_config('app.current_user_id', :uid, true), "
+    "set_config('app.current_condo_id', :cid, true), "
+    "set_config('app.current_role', :role, true), "
+    "set_config('app.current_user_key', :key, true), "
+    "set_config('app.current_user_ip', :ip, true)"
 )
 
+class ContextSession(Session):
+    """
+    Sync session behind AsyncSessionLocal. Re-applies the security context
+    stored in `info` at the start of every transaction.
+
+    Cost: one extra statement (a round-trip, asyncpg cannot merge it with the
+    first query) per transaction. Every request that touches the database pays
+    it, and pays it again for each transaction after a commit(); only requests
+    that never reach the database skip it. The trade is for safety: settings
+    applied once per connection would outlive the request on a pooled connection.
+    """
+
+@event.listens_for(ContextSession, "after_begin")
+def _apply_security_context(session, transaction, connection):
+    # Runs when a transaction actually starts, right before its first statement
+    params = session.info.get(SECURITY_CONTEXT_KEY)
+    if params:
+        connection.execute(SET_SECURITY_CONTEXT_SQL, params)
+
 # Create Session Factory
 AsyncSessionLocal = async_sessionmaker(
     bind=engine,
     class_=AsyncSession,
+    sync_session_class=ContextSession,
     expire_on_commit=False,
     autocommit=False,
     autoflush=False,
@@ -1,91 +1,207 @@
 import functools
 import inspect
-from app.services.audit_service import AuditService
+import logging
+import operator
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Optional
+from sqlalchemy import event, insert
+from sqlalchemy import inspect as sa_inspect
 from sqlalchemy.ext.asyncio import AsyncSession
-from fastapi import HTTPException
+from app.core.database import ContextSession
+from app.models.audit import AuditLog
+from app.services.audit_service import AuditService
+from app.services.audit_writer import audit_writer
+
+logger = logging.getLogger(__name__)
+
+# Key in Session.info holding the audit records waiting for COMMIT (buffered mode)
+AUDIT_BUFFER_KEY = "audit_buffer"
+
+_JSON_NATIVE = frozenset((str, int, float, bool, type(None)))
+_SERIALIZERS: Dict[type, Optional[Callable[[Any], dict]]] = {}
 
-def audit_log(action: str, table_name: str):
+def serializer_for(model: type) -> Optional[Callable[[Any], dict]]:
+    """
+    Column accessor compiled once per mapped class: one attrgetter call
+    returns every column value; values that are not JSON-native are str()'ed.
+    None for classes that are not mapped.
+    """
+    try:
+        return _SERIALIZERS[model]
+    except KeyError:
+        pass
+
+    mapper = sa_inspect(model, raiseerr=False)
+    if mapper is None or not mapper.column_attrs:
+        _SERIALIZERS[model] = None
+        return None
+
+    keys = [attr.key for attr in mapper.column_attrs]
+    names = [attr.columns[0].name for attr in mapper.column_attrs]
+    getter = operator.attrgetter(*keys)
+    single = len(keys) == 1
+
+    def serialize(obj):
+        values = (getter(obj),) if single else getter(obj)
+        return {
+            name: value if type(value) in _JSON_NATIVE else str(value)
+            for name, value in zip(names, values)
+        }
+
+    _SERIALIZERS[model] = serialize
+    return serialize
+
+def _arg_getter(sig: inspect.Signature, name: str) -> Callable[[tuple, dict], Any]:
+    """
+    Reads argument `name` from a call's (args, kwargs) without binding the
+    whole signature. `args` excludes `self`.
+    """
+    param = sig.parameters.get(name)
+    if param is None:
+        return lambda args, kwargs: None
+
+    index = list(sig.parameters).index(name) - 1
+    default = None if param.default is param.empty else param.default
+    positional = param.kind in (param.POSITIONAL_ONLY, param.POSITIONAL_OR_KEYWORD)
+
+    def get(args, kwargs):
+        if name in kwargs:
+            return kwargs[name]
+        if positional and index < len(args):
+            return args[index]
+        return default
+    return get
+
+def _record(action: str, table_name: str, result: Any, actor_id: Any, fallback_id: Any) -> dict:
+    """
+    AuditService.log arguments taken from the service result (without new_data).
+    """
+    record_id = getattr(result, 'id', None) if result else None
+    condo_id = getattr(result, 'condominium_id', None) if result else None
+    return {
+        "action": action,
+        "table_name": table_name,
+        "record_id": str(record_id) if record_id else (fallback_id or "UNKNOWN"),
+        "actor_id": str(actor_id) if actor_id else None,
+        "condominium_id": str(condo_id) if condo_id else None,
+    }
+
+def _new_data(result: Any) -> Any:
+    if not result or not hasattr(result, 'id'):
+        return None
+    serialize = serializer_for(type(result))
+    return serialize(result) if serialize else str(result)
+
+def audit_log(action: str, table_name: str, buffered: bool = False):
     """
     Decorator to automatically log service actions.
     Assumes the first argument is 'self' (Service instance) which has 'self.db'.
     Assumes the return value is the record (model instance) or the ID.
-    
-    Tries to find 'current_user_id' in args/kwargs for actor_id.
+
+    Tries to find 'current_user_id' (or 'current_user') in args/kwargs for actor_id.
+
+    buffered=True defers serialization to COMMIT: the records of the whole
+    transaction are written with one multi-row INSERT (see flush_audit_buffer)
+    and reflect the final state of each row. Nothing is written on rollback.
     """
     def decorator(func):
+        # Signature work happens once, here, not on every call
+        sig = inspect.signature(func)
+        get_actor_id = _arg_getter(sig, 'current_user_id')
+        get_current_user = _arg_getter(sig, 'current_user')
+        get_user_id = _arg_getter(sig, 'user_id')
+        get_id = _arg_getter(sig, 'id')
+
         @functools.wraps(func)
         async def wrapper(self, *args, **kwargs):
-            # 1. Execute the actual function
-            try:
-                result = await func(self, *args, **kwargs)
-            except Exception as e:
-                # We do not log failures here (or we could log ERROR actions)
-                raise e
+            result = await func(self, *args, **kwargs)
 
             try:
-                # 2. Extract Metadata for Logging
-                
-                # Get DB Session from Service instance
                 db = getattr(self, 'db', None)
-                if not db or not isinstance(db, AsyncSession):
-                    # Fail silently or log error? Silently to avoid breaking flow
-                    print(f"AuditLog Error: Could not find db session in {self}")
+                if not isinstance(db, AsyncSession):
+                    logger.warning(f"AuditLog: could not find db session in {self}")
                     return result
 
-                # Extract Actor ID
-                # We inspect signature to bind args
-                sig = inspect.signature(func)
-                bound_args = sig.bind(self, *args, **kwargs)
-                bound_args.apply_defaults()
-                
-                actor_id = bound_args.arguments.get('current_user_id')
-                
-                # If not found, maybe in kwargs directly (already checked by bind?)
-                # Maybe 'current_user' object?
+                actor_id = get_actor_id(args, kwargs)
                 if not actor_id:
-                    current_user = bound_args.arguments.get('current_user')
-                    if current_user and hasattr(current_user, 'id'):
-                        actor_id = str(current_user.id)
-
-                # Extract Record ID and New Data
-                record_id = None
-                new_data = None
-                condo_id = None
-                
-                if result:
-                    if hasattr(result, 'id'):
-                        record_id = str(result.id)
-                        # Try to serialize?
-                        try:
-                            # Crude way to dict
-                            new_data = {c.name: str(getattr(result, c.name)) for c in result.__table__.columns}
-                        except:
-                            new_data = str(result)
-                            
-                    if hasattr(result, 'condominium_id'):
-                        condo_id = str(result.condominium_id)
-                
-                # If we couldn't get record_id from result (e.g. function returns None or bool),
-                # maybe from args (e.g. delete_user(user_id...))
-                if not record_id:
-                    record_id = bound_args.arguments.get('user_id') or bound_args.arguments.get('id')
-
-                # Log it
-                await AuditService.log(
-                    db=db,
-                    action=action,
-                    table_name=table_name,
-                    record_id=record_id or "UNKNOWN",
-                    actor_id=actor_id,
-                    new_data=new_data, # For UPDATE/INSERT
-                    condominium_id=condo_id
+                    actor_id = getattr(get_current_user(args, kwargs), 'id', None)
+
+                fallback_id = get_user_id(args, kwargs) or get_id(args, kwargs)
+                if buffered:
+                    db.info.setdefault(AUDIT_BUFFER_KEY, []).append(
+                        (action, table_name, result, actor_id, fallback_id)
+                    )
+                else:
                     # old_data is hard to get in generic decorator without pre-hook
-                )
-                
+                    entry = _record(action, table_name, result, actor_id, fallback_id)
+                    await AuditService.log(db=db, new_data=_new_data(result), **entry)
             except Exception as e:
                 # Never block main flow due to logging error
-                print(f"Audit Logging Failed: {e}")
-            
+                logger.error(f"Audit logging failed for {func.__qualname__}: {e}")
+
             return result
         return wrapper
     return decorator
+
+def _uuid(value: Any) -> Optional[uuid.UUID]:
+    return uuid.UUID(str(value)) if value else None
+
+def _buffered_row(entry: tuple) -> dict:
+    """
+    audit_logs row for a buffered entry. Raises ValueError for values the
+    table would reject (record_id is a UUID, condominium_id NOT NULL), so a
+    bad entry is skipped instead of failing the INSERT of the whole batch.
+    """
+    action, table_name, result, actor_id, fallback_id = entry
+    record = _record(action, table_name, result, actor_id, fallback_id)
+    if not record["condominium_id"]:
+        raise ValueError("no condominium_id")
+    return {
+        **record,
+        "id": uuid.uuid4(),
+        "action": record["action"].upper(),
+        "record_id": uuid.UUID(record["record_id"]),
+        "actor_id": _uuid(record["actor_id"]),
+        "condominium_id": _uuid(record["condominium_id"]),
+        "old_data": None,
+        "new_data": _new_data(result),
+        "ip_address": None,
+        "created_at": datetime.now(timezone.utc),
+    }
+
+@event.listens_for(ContextSession, "before_commit")
+def flush_audit_buffer(session):
+    """
+    Writes the buffered records of the committing transaction. Like the
+    unbuffered path, an audit failure never blocks the commit: bad entries
+    are skipped and the INSERT runs in a SAVEPOINT.
+    With AUDIT_MODE=async the rows go to the background writer instead
+    (AuditWriter.stage_committed).
+    """
+    entries = session.info.pop(AUDIT_BUFFER_KEY, None)
+    if not entries:
+        return
+    # Pending changes first: ids and server-side values are then available
+    session.flush()
+    rows = []
+    for entry in entries:
+        try:
+            rows.append(_buffered_row(entry))
+        except Exception as e:
+            logger.error(f"Audit logging failed for {entry[0]} on {entry[1]}: {e}")
+    if not rows:
+        return
+
+    if audit_writer.enabled:
+        audit_writer.stage_committed(session, rows)
+        return
+    try:
+        with session.begin_nested():
+            session.execute(insert(AuditLog), rows)
+    except Exception as e:
+        logger.error(f"Audit logging failed for {len(rows)} buffered records: {e}")
+
+@event.listens_for(ContextSession, "after_soft_rollback")
+def _discard_audit_buffer(session, previous_transaction):
+    session.info.pop(AUDIT_BUFFER_KEY, None)
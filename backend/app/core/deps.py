@@ -1,14 +1,52 @@
+import time
 from typing import AsyncGenerator, Annotated
 from fastapi import Depends, HTTPException, status, Request
 from fastapi.security import OAuth2PasswordBearer
-from jose import jwt, JWTError
-from sqlalchemy import text
+from jose import JWTError
 from app.core import config, security, database
 from app.schemas.token import TokenData
+from app.utils.cache import TTLCache
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{config.settings.API_V1_STR}/auth/login", auto_error=False)
 
+# Tokens já verificados: sha256(token) -> TokenData, válidos até o `exp` do próprio token
+_token_cache = TTLCache(maxsize=max(config.settings.JWT_CACHE_SIZE, 1), ttl=0)
+
+def _verify_token(token: str) -> TokenData:
+    """
+    Decodifica e valida o JWT. Resultado em cache até a expiração do token,
+    evitando HMAC + parse do payload a cada requisição.
+    Levanta JWTError/ValueError se o token for inválido.
+    """
+    key = security.get_token_hash(token)
+    if config.settings.JWT_CACHE_SIZE:
+        cached = _token_cache.get(key)
+        if cached:
+            return cached
+
+    payload = security.decode_access_token(token)
+    user_id: str = payload.get("sub")
+    condo_id: str = payload.get("condo_id")
+    role: str = payload.get("role")
+
+    if user_id is None or condo_id is None or role is None:
+        raise ValueError("Token sem claims obrigatórias")
+
+    exp = payload.get("exp")
+    token_data = TokenData(user_id=user_id, condo_id=condo_id, role=role, exp=float(exp) if exp else None)
+    if config.settings.JWT_CACHE_SIZE and exp:
+        remaining = float(exp) - time.time()
+        if remaining > 0:
+            _token_cache.set(key, token_data, remaining)
+    return token_data
+
 async def get_current_user(request: Request, token: Annotated[str | None, Depends(oauth2_scheme)] = None) -> TokenData:
+    # O FastAPI já resolve esta dependência uma única vez por requisição (get_db e a rota
+    # compartilham o resultado); request.state cobre chamadas fora da injeção de dependências.
+    cached_user = getattr(request.state, "current_user", None)
+    if cached_user:
+        return cached_user
+
     # If token is not in header (oauth2_scheme), check cookie
     if not token:
         token = request.cookies.get("access_token")
@@ -21,44 +59,40 @@ async def get_current_user(request: Request, token: Annotated[str | None, Depend
         raise credentials_exception
         
     try:
-        payload = jwt.decode(token, config.settings.SECRET_KEY, algorithms=[config.settings.ALGORITHM])
-        user_id: str = payload.get("sub")
-        condo_id: str = payload.get("condo_id")
-        role: str = payload.get("role")
-        
-        if user_id is None or condo_id is None or role is None:
-            raise credentials_exception
-            
-        return TokenData(user_id=user_id, condo_id=condo_id, role=role)
-    except JWTError:
+        current_user = _verify_token(token)
+    except (JWTError, ValueError):
         raise credentials_exception
 
+    request.state.current_user = current_user
+    return current_user
+
+def _set_security_context(session, request: Request, current_user: TokenData) -> None:
+    # Define o contexto da sessão (Zero Trust)
+    # Nenhum round-trip aqui: os valores ficam em session.info e são aplicados com
+    # set_config(..., true) no início de cada transação (database._apply_security_context),
+    # um round-trip por transação. Por serem locais à transação, não sobrevivem na
+    # conexão devolvida ao pool.
+
+    # Extrai o IP (FastAPI Request.client.host já lida com X-Forwarded-For se proxy-headers estiver ativo)
+    client_ip = request.client.host if request.client else None
+
+    # O uso de parâmetros no set_config garante segurança contra injeção de SQL.
+    # Nota: os valores de current_setting no Postgres são sempre strings.
+    session.info[database.SECURITY_CONTEXT_KEY] = {
+        "uid": current_user.user_id,
+        "cid": current_user.condo_id,
+        "role": current_user.role,
+        "key": config.settings.APP_ENCRYPTION_KEY,
+        "ip": client_ip
+    }
+
 async def get_db(request: Request, current_user: Annotated[TokenData, Depends(get_current_user)]) -> AsyncGenerator:
     """
     IMPORTANTE: Esta dependência injeta o contexto de segurança na sessão do banco.
     As políticas de RLS (Segurança ao nível de linha) dependem dessas configurações.
     """
     async with database.AsyncSessionLocal() as session:
-        # Define o contexto da sessão (Zero Trust)
-        try:
-             # Extrai o IP (FastAPI Request.client.host já lida com X-Forwarded-For se proxy-headers estiver ativo)
-             client_ip = request.client.host if request.client else None
-             
-             # O uso de parâmetros no set_config garante segurança contra injeção de SQL.
-             # Nota: os valores de current_setting no Postgres são sempre strings.
-             await session.execute(
-                 text("SELECT set_config('app.current_user_id', :uid, false), set_config('app.current_condo_id', :cid, false), set_config('app.current_role', :role, false), set_config('app.current_user_key', :key, false), set_config('app.current_user_ip', :ip, false)"),
-                 {
-                     "uid": current_user.user_id, 
-                     "cid": current_user.condo_id, 
-                     "role": current_user.role, 
-                     "key": config.settings.APP_ENCRYPTION_KEY,
-                     "ip": client_ip
-                 }
-             )
-        except Exception as e:
-            # Se não conseguir definir o contexto, não deve liberar a sessão.
-             raise HTTPException(status_code=500, detail="Falha ao inicializar o contexto de segurança")
+        _set_security_context(session, request, current_user)
 
         try:
             yield session
@@ -68,6 +102,16 @@ async def get_db(request: Request, current_user: Annotated[TokenData, Depends(ge
         finally:
             await session.close()
 
+async def open_db_session(request: Request, current_user: TokenData):
+    """
+    Sessão com contexto de segurança cujo ciclo de vida é controlado pelo chamador.
+    Usada por respostas em streaming, que continuam lendo do banco depois que o
+    endpoint retorna. O chamador DEVE fechar a sessão (session.close()).
+    """
+    session = database.AsyncSessionLocal()
+    _set_security_context(session, request, current_user)
+    return session
+
 # Dependência especial para Autenticação (Login) que ainda não possui usuário logado
 async def get_db_no_context() -> AsyncGenerator:
     """
@@ -0,0 +1,108 @@
+import time
+import threading
+import logging
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+logger = logging.getLogger(__name__)
+
+class DurationStat:
+    """
+    Count / total / max of a duration in milliseconds.
+    """
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def add(self, ms: float) -> None:
+        self.count += 1
+        self.total_ms += ms
+        if ms > self.max_ms:
+            self.max_ms = ms
+
+    def as_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "max_ms": round(self.max_ms, 3),
+        }
+
+class PoolMetrics:
+    """
+    In-process connection pool metrics (per worker).
+    - wait: time to obtain a connection from the pool (queueing + new connects)
+    - checkout: time a connection stays checked out (session lifetime)
+    """
+    def __init__(self, slow_wait_ms: float = 0):
+        self.slow_wait_ms = slow_wait_ms
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.wait = DurationStat()
+            self.checkout = DurationStat()
+            self.timeouts = 0
+
+    def record_wait(self, ms: float) -> None:
+        with self._lock:
+            self.wait.add(ms)
+        if self.slow_wait_ms and ms >= self.slow_wait_ms:
+            logger.warning(f"DB pool wait of {ms:.1f} ms (pool exhausted?)")
+
+    def record_checkout(self, ms: float) -> None:
+        with self._lock:
+            self.checkout.add(ms)
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def snapshot(self, pool) -> dict:
+        with self._lock:
+            data = {
+                "wait": self.wait.as_dict(),
+                "checkout": self.checkout.as_dict(),
+                "timeouts": self.timeouts,
+            }
+        data["pool"] = {
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "idle": pool.checkedin(),
+            "overflow": pool.overflow(),
+        }
+        return data
+
+metrics = PoolMetrics()
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """
+    AsyncAdaptedQueuePool that times how long callers wait for a connection.
+    """
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            metrics.record_timeout()
+            raise
+        finally:
+            metrics.record_wait((time.perf_counter() - start) * 1000)
+
+def instrument_checkouts(engine) -> None:
+    """
+    Checkout duration via pool checkout/checkin events.
+    """
+    pool_events = engine.sync_engine.pool
+
+    @event.listens_for(pool_events, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        connection_record.info["checkout_at"] = time.perf_counter()
+
+    @event.listens_for(pool_events, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        started = connection_record.info.pop("checkout_at", None)
+        if started is not None:
+            metrics.record_checkout((time.perf_counter() - started) * 1000)
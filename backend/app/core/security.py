@@ -1,10 +1,21 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta,  timezone
-from typing import Any, Union
-from jose import jwt
+from typing import Any, Optional, Tuple, Union
+from fastapi import HTTPException
+from jose import jwt, JWTError
 from passlib.context import CryptContext
 from app.core.config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# min/max pinned to the configured cost: hashes made with any other cost
+# are reported by verify_and_update and rehashed on login.
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.PASSWORD_BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.PASSWORD_BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.PASSWORD_BCRYPT_ROUNDS,
+)
 
 import secrets
 import hashlib
@@ -20,6 +31,30 @@ def create_access_token(subject: Union[str, Any], claims: dict, expires_delta: t
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
+def _build_jwt_decoder():
+    """
+    Token verification function for settings.JWT_BACKEND.
+    Both backends raise jose.JWTError on any invalid/expired token.
+    """
+    if settings.JWT_BACKEND.lower() == "pyjwt":
+        try:
+            import jwt as pyjwt
+        except ImportError:
+            raise RuntimeError("JWT_BACKEND=pyjwt requires the 'PyJWT' package")
+
+        def decode(token: str) -> dict:
+            try:
+                return pyjwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+            except pyjwt.PyJWTError as e:
+                raise JWTError(str(e))
+        return decode
+
+    def decode(token: str) -> dict:
+        return jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    return decode
+
+decode_access_token = _build_jwt_decoder()
+
 def create_refresh_token() -> str:
     return secrets.token_urlsafe(32)
 
@@ -31,3 +66,40 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
+
+# bcrypt releases the GIL, so a small thread pool runs hashes in parallel
+# without blocking the event loop.
+_hash_executor = ThreadPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt")
+_hash_pending = 0
+
+async def _run_hash(fn, *args):
+    """
+    Runs a bcrypt operation in the hashing pool. When more than
+    PASSWORD_HASH_QUEUE_LIMIT operations are waiting, fails fast with 503
+    instead of letting requests pile up behind a ~250ms-per-item queue.
+    """
+    global _hash_pending
+    if _hash_pending >= settings.PASSWORD_HASH_QUEUE_LIMIT:
+        raise HTTPException(
+            status_code=503,
+            detail="Servidor ocupado, tente novamente em instantes.",
+            headers={"Retry-After": "1"}
+        )
+    _hash_pending += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_hash_executor, fn, *args)
+    finally:
+        _hash_pending -= 1
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await _run_hash(pwd_context.verify, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    return await _run_hash(pwd_context.hash, password)
+
+async def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Returns (valid, new_hash). new_hash is set when the stored hash uses an
+    outdated scheme/cost and should replace it.
+    """
+    return await _run_hash(pwd_context.verify_and_update, plain_password, hashed_password)
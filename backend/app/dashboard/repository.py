@@ -0,0 +1,143 @@
+from typing import List
+from uuid import UUID
+from datetime import date
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, literal, union_all, desc, and_
+from app.financial.models import Transaction
+from app.units.models import Unit
+from app.users.models import User
+from app.readings.models import ReadingWater, ReadingGas, ReadingElectricity
+from app.occurrences.models import Occurrence
+from app.reservations.models import Reservation
+from app.utils.period import in_range
+
+class DashboardRepository:
+    """
+    Aggregations for the admin dashboard.
+    Each method issues a single (grouped) statement.
+    """
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_monthly_series(self, condo_id: UUID, start: date, end: date) -> List:
+        """
+        One row per month in [start, end) with income, expense, water, gas and energy totals.
+        Each source table is scanned once (GROUP BY date_trunc + FILTER aggregates).
+        """
+        # All bucketed columns are DATE: plain calendar months, no time zone shift
+        # (same bounds as FinancialRepository's period_filter)
+        def month_of(col):
+            return func.date_trunc('month', col)
+
+        def in_window(col):
+            # start/end are the first days of the months, compared against the raw column
+            return and_(*in_range(col, start, end))
+
+        zero = literal(0)
+
+        tx_month = month_of(Transaction.date)
+        financial = select(
+            tx_month.label('month'),
+            func.coalesce(func.sum(Transaction.amount).filter(Transaction.type == 'RECEITA'), 0).label('income'),
+            func.coalesce(func.sum(Transaction.amount).filter(Transaction.type == 'DESPESA'), 0).label('expense'),
+            zero.label('water'),
+            zero.label('gas'),
+            zero.label('energy'),
+        ).where(
+            Transaction.condominium_id == condo_id,
+            in_window(Transaction.date)
+        ).group_by(tx_month)
+
+        water_month = month_of(ReadingWater.reading_date)
+        water = select(
+            water_month.label('month'), zero, zero,
+            func.sum(ReadingWater.value_m3), zero, zero,
+        ).where(
+            ReadingWater.condominium_id == condo_id,
+            in_window(ReadingWater.reading_date)
+        ).group_by(water_month)
+
+        gas_month = month_of(ReadingGas.purchase_date)
+        gas = select(
+            gas_month.label('month'), zero, zero, zero,
+            func.sum(ReadingGas.cylinder_1_kg + ReadingGas.cylinder_2_kg + ReadingGas.cylinder_3_kg + ReadingGas.cylinder_4_kg),
+            zero,
+        ).where(
+            ReadingGas.condominium_id == condo_id,
+            in_window(ReadingGas.purchase_date)
+        ).group_by(gas_month)
+
+        energy_month = month_of(ReadingElectricity.due_date)
+        energy = select(
+            energy_month.label('month'), zero, zero, zero, zero,
+            func.sum(ReadingElectricity.consumption_kwh),
+        ).where(
+            ReadingElectricity.condominium_id == condo_id,
+            in_window(ReadingElectricity.due_date)
+        ).group_by(energy_month)
+
+        series = union_all(financial, water, gas, energy).subquery()
+        stmt = select(
+            series.c.month,
+            func.sum(series.c.income).label('income'),
+            func.sum(series.c.expense).label('expense'),
+            func.sum(series.c.water).label('water'),
+            func.sum(series.c.gas).label('gas'),
+            func.sum(series.c.energy).label('energy'),
+        ).group_by(series.c.month)
+
+        result = await self.db.execute(stmt)
+        return result.all()
+
+    async def get_counts(self, condo_id: UUID):
+        """
+        Occupancy and pending counters in a single row.
+        Users are scanned once using conditional (FILTER) aggregates.
+        """
+        active_with_unit = (User.status == 'ATIVO') & User.unit_id.isnot(None)
+
+        users = select(
+            func.count(User.id).filter(active_with_unit).label('residents_count'),
+            func.count(func.distinct(User.unit_id)).filter(active_with_unit).label('occupied_units'),
+            func.count(User.id).filter((User.status == 'PENDENTE') & (User.role == 'RESIDENTE')).label('access_requests'),
+        ).where(User.condominium_id == condo_id).subquery()
+
+        total_units = select(func.count(Unit.id)).where(
+            Unit.condominium_id == condo_id
+        ).scalar_subquery()
+
+        pending_occurrences = select(func.count(Occurrence.id)).where(
+            Occurrence.condominium_id == condo_id,
+            Occurrence.status == 'ABERTO'
+        ).scalar_subquery()
+
+        pending_reservations = select(func.count(Reservation.id)).where(
+            Reservation.condominium_id == condo_id,
+            Reservation.status == 'PENDENTE'
+        ).scalar_subquery()
+
+        stmt = select(
+            total_units.label('total_units'),
+            users.c.residents_count,
+            users.c.occupied_units,
+            users.c.access_requests,
+            pending_occurrences.label('pending_occurrences'),
+            pending_reservations.label('pending_reservations'),
+        ).select_from(users)
+
+        result = await self.db.execute(stmt)
+        return result.one()
+
+    async def get_recent_residents(self, condo_id: UUID, limit: int = 5) -> List:
+        # Join units instead of one db.get(Unit) per resident (N+1)
+        stmt = select(
+            User.id, User.name, User.status, User.created_at,
+            Unit.block, Unit.number
+        ).outerjoin(Unit, User.unit_id == Unit.id).where(
+            User.condominium_id == condo_id,
+            User.role == 'RESIDENTE',
+            User.status == 'ATIVO'
+        ).order_by(desc(User.created_at)).limit(limit)
+
+        result = await self.db.execute(stmt)
+        return result.all()
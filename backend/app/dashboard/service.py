@@ -0,0 +1,124 @@
+from uuid import UUID
+import calendar
+import datetime
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.dashboard.repository import DashboardRepository
+from app.utils.period import month_start, add_months
+from app.schemas.dashboard import (
+    DashboardStats, DashboardFinancialStats, DashboardOccupancyStats,
+    DashboardReadingStats, DashboardChartData, DashboardRecentResident,
+    DashboardPendingCounts
+)
+
+CHART_MONTHS = 6
+
+# Helper to subtract months
+def subtract_months(dt, months):
+    month = dt.month - months
+    year = dt.year
+    while month <= 0:
+        month += 12
+        year -= 1
+
+    # Handle end of month edge cases (e.g. March 31 - 1 month = Feb 28/29)
+    _, days_in_month = calendar.monthrange(year, month)
+    day = min(dt.day, days_in_month)
+
+    return dt.replace(year=year, month=month, day=day)
+
+def calc_growth(curr, last):
+    return ((curr - last) / last * 100) if last > 0 else 0
+
+class DashboardService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.repo = DashboardRepository(db)
+
+    async def get_stats(self, condo_id: UUID) -> DashboardStats:
+        today = datetime.date.today()
+
+        # Chart window: first day of the oldest charted month up to the first day of next month.
+        # It also covers "current" and "last" month used by the cards.
+        months = [subtract_months(today, i) for i in range(CHART_MONTHS - 1, -1, -1)]
+        window_start = month_start(months[0].year, months[0].month)
+        window_end = month_start(*add_months(today.year, today.month, 1))
+
+        series_rows = await self.repo.get_monthly_series(condo_id, window_start, window_end)
+        counts = await self.repo.get_counts(condo_id)
+        recent = await self.repo.get_recent_residents(condo_id)
+
+        by_month = {(r.month.year, r.month.month): r for r in series_rows if r.month}
+
+        def totals(d):
+            row = by_month.get((d.year, d.month))
+            if not row:
+                return 0, 0, 0, 0, 0
+            return (row.income or 0, row.expense or 0, row.water or 0, row.gas or 0, row.energy or 0)
+
+        curr = totals(months[-1])
+        last = totals(months[-2])
+        rev_curr, exp_curr, water_curr, gas_curr, energy_curr = curr
+        rev_last, exp_last, water_last, gas_last, energy_last = last
+
+        # Monthly figures for the "Receita Total" card (vs last month)
+        financial_stats = DashboardFinancialStats(
+            revenue=rev_curr,
+            revenue_growth=calc_growth(rev_curr, rev_last),
+            expense=exp_curr,
+            expense_growth=calc_growth(exp_curr, exp_last),
+            balance=rev_curr - exp_curr # Monthly balance
+        )
+
+        occupancy_stats = DashboardOccupancyStats(
+            total_units=counts.total_units or 0,
+            occupied_units=counts.occupied_units or 0,
+            residents_count=counts.residents_count or 0
+        )
+
+        readings_stats = DashboardReadingStats(
+            water_total=float(water_curr),
+            water_growth=calc_growth(water_curr, water_last),
+            gas_total=float(gas_curr),
+            gas_growth=calc_growth(gas_curr, gas_last),
+            energy_total=float(energy_curr),
+            energy_growth=calc_growth(energy_curr, energy_last)
+        )
+
+        charts = []
+        for d in months:
+            _, _, w_val, g_val, e_val = totals(d)
+            charts.append(DashboardChartData(
+                name=d.strftime("%b"), # Short month name
+                water=float(w_val),
+                gas=float(g_val),
+                energy=float(e_val)
+            ))
+
+        recent_residents = []
+        for r in recent:
+            unit_name = "N/A"
+            if r.number:
+                unit_name = f"{r.block}-{r.number}" if r.block else r.number
+
+            recent_residents.append(DashboardRecentResident(
+                id=str(r.id),
+                name=r.name,
+                unit=unit_name,
+                start_date=r.created_at.strftime("%d/%m/%Y"),
+                status=r.status
+            ))
+
+        pending_counts = DashboardPendingCounts(
+            occurrences=counts.pending_occurrences or 0,
+            access_requests=counts.access_requests or 0,
+            reservations=counts.pending_reservations or 0
+        )
+
+        return DashboardStats(
+            financial=financial_stats,
+            occupancy=occupancy_stats,
+            readings=readings_stats,
+            charts=charts,
+            recent_residents=recent_residents,
+            pending_counts=pending_counts
+        )
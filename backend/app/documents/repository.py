@@ -1,7 +1,7 @@
 from typing import List, Optional
 from uuid import UUID
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, desc
+from sqlalchemy import select, desc, delete
 from app.documents.models import Document
 
 class DocumentRepository:
@@ -27,5 +27,10 @@ class DocumentRepository:
         self.db.add(doc)
         return doc
 
-    async def delete(self, doc: Document) -> None:
-        await self.db.delete(doc)
+    async def delete(self, doc: Document) -> Optional[str]:
+        # file_path of the row actually deleted: a concurrent optimization job
+        # may have switched it after `doc` was loaded
+        result = await self.db.execute(
+            delete(Document).where(Document.id == doc.id).returning(Document.file_path)
+        )
+        return result.scalar_one_or_none()
@@ -1,13 +1,12 @@
 from typing import List, Annotated, Optional
 from uuid import UUID
 from fastapi import APIRouter, Depends, UploadFile, File, Form, HTTPException
-from fastapi.responses import FileResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-import os
 
 from app.core import deps
 from app.documents.schemas import DocumentRead, DocumentUpdate, DocumentStatusUpdate
 from app.documents.service import DocumentService
+from app.documents.storage import get_storage
 
 router = APIRouter()
 
@@ -47,10 +46,9 @@ async def download_document(
     if current_user.role != 'ADMIN' and not doc.is_active:
         raise HTTPException(status_code=403, detail="Document not available")
         
-    if not os.path.exists(doc.file_path):
-        raise HTTPException(status_code=404, detail="File not found on server")
-        
-    return FileResponse(doc.file_path, filename=f"{doc.title}.{doc.mime_type.split('/')[-1]}", media_type=doc.mime_type)
+    return await get_storage().response(
+        doc.file_path, filename=f"{doc.title}.{doc.mime_type.split('/')[-1]}", media_type=doc.mime_type
+    )
 
 @router.patch("/{id}/status", response_model=DocumentRead)
 async def toggle_status(
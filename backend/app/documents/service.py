@@ -1,5 +1,7 @@
+import asyncio
+import hashlib
+import logging
 import os
-import shutil
 import uuid
 from typing import List, Optional
 from uuid import UUID
@@ -9,9 +11,43 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.documents.repository import DocumentRepository
 from app.documents.models import Document
 from app.documents.schemas import DocumentCreate, DocumentUpdate
-from app.utils.file_optimizer import optimize_pdf, optimize_image
+from app.documents.storage import get_storage
+from app.core.config import settings
+from app.services.document_jobs import document_jobs
+from app.services.optimizer import optimizer
 
-UPLOAD_DIR = "backend/storage/uploads/documents"
+logger = logging.getLogger(__name__)
+
+class UploadTooLarge(Exception):
+    pass
+
+def _store_upload(src, tmp_path: str, max_size: int) -> tuple[int, str]:
+    """
+    Copia o upload para `tmp_path` (área de staging do storage) em blocos de
+    DOCUMENT_UPLOAD_CHUNK_BYTES, calculando o SHA-256 no caminho.
+    Um upload interrompido ou acima de `max_size` não deixa arquivo parcial.
+    Retorna (tamanho, digest).
+    """
+    sha = hashlib.sha256()
+    size = 0
+    try:
+        with open(tmp_path, "wb") as out:
+            while chunk := src.read(settings.DOCUMENT_UPLOAD_CHUNK_BYTES):
+                size += len(chunk)
+                if size > max_size:
+                    raise UploadTooLarge()
+                sha.update(chunk)
+                out.write(chunk)
+    except BaseException:
+        _remove_file(tmp_path)
+        raise
+    return size, sha.hexdigest()
+
+def _remove_file(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
 
 class DocumentService:
     def __init__(self, db: AsyncSession):
@@ -40,66 +76,66 @@ class DocumentService:
         # 1. Validação do Arquivo
         if file.content_type not in ["application/pdf", "image/jpeg", "image/png"]:
             raise HTTPException(status_code=400, detail="Tipo de arquivo inválido. Apenas PDF, JPG, PNG são permitidos.")
+        max_size = settings.DOCUMENT_MAX_UPLOAD_BYTES
+        if file.size is not None and file.size > max_size:
+            raise HTTPException(status_code=413, detail=f"Arquivo excede o limite de {max_size // (1024 * 1024)} MB.")
         
-        # 2. Preparação do Armazenamento
-        # Nota: a extensão pode mudar se a otimização converter PNG -> JPG
-        original_ext = os.path.splitext(file.filename)[1]
-        
-        # Pasta específica do condomínio
-        save_dir = os.path.join(UPLOAD_DIR, str(condo_id))
-        os.makedirs(save_dir, exist_ok=True)
-        
-        final_mime_type = file.content_type
+        # 2. Armazenamento: o conteúdo vai para o storage (endereçado pelo SHA-256,
+        # uploads idênticos compartilham o mesmo arquivo) referenciado por este documento
+        storage = get_storage()
+        doc_id = uuid.uuid4()
+        tmp_path = storage.staging_path()
         
         try:
-            # Lê o conteúdo para memória
-            content = await file.read()
-            file_size = len(content)
-            
-            # 3. Otimiza se for maior que 1MB
-            if file_size > 1 * 1024 * 1024:
-                import asyncio
-                
-                if file.content_type == "application/pdf":
-                    content = await asyncio.to_thread(optimize_pdf, content)
-                    
-                elif file.content_type in ["image/jpeg", "image/png"]:
-                    content, new_mime = await asyncio.to_thread(optimize_image, content)
-                    final_mime_type = new_mime
-                    
-                    # Atualiza extensão se o mime mudou
-                    if new_mime == "image/jpeg" and original_ext.lower() != ".jpg" and original_ext.lower() != ".jpeg":
-                        original_ext = ".jpg"
-                        
-                file_size = len(content) # Atualiza o tamanho final
-
-            # Gera nome seguro com a extensão correta
-            safe_filename = f"{uuid.uuid4()}{original_ext}"
-            file_path = os.path.join(save_dir, safe_filename)
-
-            # Escreve no disco
-            with open(file_path, "wb") as buffer:
-                buffer.write(content)
-                
+            # Copia em blocos, fora do event loop (nunca o arquivo inteiro em memória)
+            file_size, digest = await asyncio.to_thread(_store_upload, file.file, tmp_path, max_size)
+            key = await storage.put(tmp_path, str(doc_id), digest)
+        except UploadTooLarge:
+            raise HTTPException(status_code=413, detail=f"Arquivo excede o limite de {max_size // (1024 * 1024)} MB.")
         except Exception as e:
+            await asyncio.to_thread(_remove_file, tmp_path)
             raise HTTPException(status_code=500, detail=f"Falha no processamento do arquivo: {str(e)}")
             
-        # 4. Cria o registro no Banco de Dados
+        # 3. Cria o registro no Banco de Dados
         doc = Document(
+            id=doc_id,
             condominium_id=condo_id,
             title=title,
             description=description,
             category=category,
-            file_path=file_path,
-            mime_type=final_mime_type,
+            file_path=key,
+            mime_type=file.content_type,
             file_size=file_size,
             is_active=True,
             created_by=user_id
         )
         
-        await self.repo.create(doc)
-        await self.db.commit()
-        await self.db.refresh(doc)
+        # 4. Otimização (> DOCUMENT_OPTIMIZE_MIN_BYTES) em segundo plano: a vaga na fila
+        # do otimizador é reservada antes do commit; com a fila cheia o documento fica
+        # com o arquivo original (já armazenado) em vez de recusar o upload. O job grava
+        # o conteúdo otimizado e atualiza file_path/file_size/mime_type quando terminar.
+        # Até o commit qualquer falha (inclusive cancelamento) libera o conteúdo; a vaga
+        # só passa ao job no submit, senão a fila do otimizador vaza
+        slot = None
+        try:
+            try:
+                if file_size > settings.DOCUMENT_OPTIMIZE_MIN_BYTES:
+                    slot = optimizer.try_reserve()
+                    if slot is None:
+                        logger.warning(f"Optimizer queue full: document {doc_id} stored without optimization")
+                await self.repo.create(doc)
+                await self.db.commit()
+            except BaseException:
+                await storage.release(key, str(doc_id))
+                raise
+            await self.db.refresh(doc)
+        except BaseException:
+            if slot:
+                slot.release()
+            raise
+
+        if slot:
+            document_jobs.submit(slot, doc.id, condo_id, user_id, key, doc.mime_type)
         return doc
 
     async def update_document(self, id: UUID, data: DocumentUpdate, condo_id: UUID, role: str) -> Document:
@@ -131,12 +167,14 @@ class DocumentService:
             
         doc = await self.get_document(id, condo_id)
         
-        # Delete file from disk
-        if os.path.exists(doc.file_path):
-            try:
-                os.remove(doc.file_path)
-            except Exception:
-                pass # Log error but proceed
-        
-        await self.repo.delete(doc)
+        key = await self.repo.delete(doc)
         await self.db.commit()
+        if key is None:
+            return
+
+        # Release the contents (after the commit: a failed delete keeps the file).
+        # Removed from storage only when no other document has the same content.
+        try:
+            await get_storage().release(key, str(doc.id))
+        except Exception as e:
+            logger.error(f"Could not release contents of document {doc.id}: {e}")
@@ -0,0 +1,364 @@
+import asyncio
+import fcntl
+import hashlib
+import logging
+import os
+import re
+import time
+import uuid
+from abc import ABC, abstractmethod
+from contextlib import asynccontextmanager, contextmanager
+from functools import lru_cache
+from typing import AsyncIterator, Optional
+from urllib.parse import quote
+from fastapi import HTTPException
+from fastapi.responses import FileResponse, StreamingResponse
+from starlette.concurrency import iterate_in_threadpool
+from starlette.responses import Response
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1024 * 1024
+
+# Keys are SHA-256 hex digests of the content; anything else is a pre-CAS path
+DIGEST = re.compile(r"^[0-9a-f]{64}$")
+
+def is_digest(key: str) -> bool:
+    return bool(DIGEST.match(key))
+
+def file_digest(path: str) -> str:
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(CHUNK_SIZE):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+def default_root() -> str:
+    # backend/storage/documents, independent of the working directory
+    return os.path.join(os.path.dirname(__file__), "..", "..", "storage", "documents")
+
+class DocumentStorage(ABC):
+    """
+    Backend interface for document contents. Content-addressed: the key of a
+    file is the SHA-256 of its bytes, so identical uploads share one stored
+    object. Each document holding a key is a reference (`ref`, the document id);
+    an object without references is removed (on release, or by
+    collect_garbage() where the backend cannot do it atomically).
+
+    Uploads are first written to a staging path (same filesystem as the local
+    store, so adding them is a rename) and then handed to put().
+    """
+    def __init__(self, root: str):
+        self.root = os.path.abspath(root)
+        self.staging_dir = os.path.join(self.root, "tmp")
+        os.makedirs(self.staging_dir, exist_ok=True)
+
+    def staging_path(self) -> str:
+        return os.path.join(self.staging_dir, f"{uuid.uuid4()}.part")
+
+    @abstractmethod
+    async def put(self, path: str, ref: str, digest: Optional[str] = None) -> str:
+        """
+        Stores the file at `path` (consumed: moved or deleted) under its digest
+        and adds `ref` to it. Returns the key.
+        """
+
+    @abstractmethod
+    async def release(self, key: str, ref: str) -> None:
+        ...
+
+    @abstractmethod
+    async def response(self, key: str, filename: str, media_type: str) -> Response:
+        """
+        Download response for `key` (404 when the object is missing).
+        """
+
+    @abstractmethod
+    def local_copy(self, key: str):
+        """
+        Async context manager yielding a local, read-only path to the contents.
+        """
+
+    @abstractmethod
+    async def collect_garbage(self, grace: float) -> dict:
+        """
+        Removes objects left without references for more than `grace` seconds.
+        Returns counters for reporting.
+        """
+
+def _not_found() -> HTTPException:
+    return HTTPException(status_code=404, detail="File not found on server")
+
+class LocalStorage(DocumentStorage):
+    """
+    Files under DOCUMENT_STORAGE_DIR:
+        blobs/ab/cd/<digest>        contents
+        refs/ab/cd/<digest>/<ref>   one empty file per referencing document
+        locks/ab.lock               flock serializing put/release of a shard
+    Per-document reference files (instead of a counter) make put/release
+    idempotent; the lock works across the uvicorn worker processes.
+    Keys that are not digests are files written before this layout and are
+    served/removed as plain paths.
+    """
+    def _blob(self, digest: str) -> str:
+        return os.path.join(self.root, "blobs", digest[:2], digest[2:4], digest)
+
+    def _refs(self, digest: str) -> str:
+        return os.path.join(self.root, "refs", digest[:2], digest[2:4], digest)
+
+    def _path(self, key: str) -> str:
+        return self._blob(key) if is_digest(key) else key
+
+    @contextmanager
+    def _locked(self, digest: str):
+        lock_dir = os.path.join(self.root, "locks")
+        os.makedirs(lock_dir, exist_ok=True)
+        with open(os.path.join(lock_dir, f"{digest[:2]}.lock"), "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _put(self, path: str, ref: str, digest: Optional[str]) -> str:
+        digest = digest or file_digest(path)
+        blob = self._blob(digest)
+        refs = self._refs(digest)
+        with self._locked(digest):
+            if os.path.exists(blob):
+                os.remove(path)
+            else:
+                os.makedirs(os.path.dirname(blob), exist_ok=True)
+                os.replace(path, blob)
+            os.makedirs(refs, exist_ok=True)
+            open(os.path.join(refs, ref), "a").close()
+        return digest
+
+    def _release(self, key: str, ref: str) -> None:
+        if not is_digest(key):
+            _remove(key)
+            return
+        refs = self._refs(key)
+        with self._locked(key):
+            _remove(os.path.join(refs, ref))
+            try:
+                if os.listdir(refs):
+                    return
+                os.rmdir(refs)
+            except FileNotFoundError:
+                pass
+            _remove(self._blob(key))
+
+    def _collect_garbage(self, grace: float) -> dict:
+        # release() removes unreferenced blobs itself; this only finds the ones
+        # orphaned by a crash between the two steps
+        removed = 0
+        cutoff = time.time() - grace
+        for shard, _, files in os.walk(os.path.join(self.root, "blobs")):
+            for digest in files:
+                if not is_digest(digest):
+                    continue
+                with self._locked(digest):
+                    blob = self._blob(digest)
+                    try:
+                        if os.listdir(self._refs(digest)):
+                            continue
+                    except FileNotFoundError:
+                        pass
+                    try:
+                        if os.path.getmtime(blob) > cutoff:
+                            continue
+                    except FileNotFoundError:
+                        continue
+                    _remove(blob)
+                    removed += 1
+        return {"removed": removed}
+
+    async def put(self, path: str, ref: str, digest: Optional[str] = None) -> str:
+        return await asyncio.to_thread(self._put, path, ref, digest)
+
+    async def release(self, key: str, ref: str) -> None:
+        await asyncio.to_thread(self._release, key, ref)
+
+    async def collect_garbage(self, grace: float) -> dict:
+        return await asyncio.to_thread(self._collect_garbage, grace)
+
+    async def response(self, key: str, filename: str, media_type: str) -> Response:
+        path = self._path(key)
+        if not await asyncio.to_thread(os.path.exists, path):
+            raise _not_found()
+        return FileResponse(path, filename=filename, media_type=media_type)
+
+    @asynccontextmanager
+    async def local_copy(self, key: str) -> AsyncIterator[str]:
+        # Blobs are never modified in place: the stored file itself is safe to read
+        yield self._path(key)
+
+class S3Storage(DocumentStorage):
+    """
+    Objects in an S3-compatible bucket (AWS, MinIO, ...):
+        <prefix>blobs/ab/cd/<digest>
+        <prefix>refs/<digest>/<ref>   empty object per referencing document
+        <prefix>trash/<digest>        blob being collected (see below)
+    S3 has no lock to make "last reference gone -> delete blob" atomic with a
+    concurrent put() of the same content, so release() only deletes the
+    reference and blobs are removed by collect_garbage():
+      - put() writes the reference first, then uploads the blob if missing;
+      - the sweep moves an unreferenced blob to trash/, then lists the
+        references again and moves it back if one appeared meanwhile. A put()
+        that looked for the blob after the move uploads it itself.
+      - trash/ objects are deleted on a later sweep, after `grace`.
+    The local staging directory is still used for uploads and optimization jobs.
+    """
+    def __init__(self, root: str, bucket: str, prefix: str = "",
+                 endpoint_url: Optional[str] = None, region: Optional[str] = None):
+        try:
+            import boto3
+            from botocore.exceptions import ClientError
+        except ImportError:
+            raise RuntimeError("DOCUMENT_STORAGE=s3 requires the 'boto3' package")
+        if not bucket:
+            raise RuntimeError("DOCUMENT_STORAGE=s3 requires DOCUMENT_S3_BUCKET")
+        super().__init__(root)
+        self.bucket = bucket
+        self.prefix = prefix
+        self._client = boto3.client("s3", endpoint_url=endpoint_url, region_name=region)
+        self._client_error = ClientError
+
+    def _blob(self, digest: str) -> str:
+        return f"{self.prefix}blobs/{digest[:2]}/{digest[2:4]}/{digest}"
+
+    def _refs(self, digest: str) -> str:
+        return f"{self.prefix}refs/{digest}/"
+
+    def _missing(self, error) -> bool:
+        return error.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound")
+
+    def _exists(self, key: str) -> bool:
+        try:
+            self._client.head_object(Bucket=self.bucket, Key=key)
+            return True
+        except self._client_error as e:
+            if self._missing(e):
+                return False
+            raise
+
+    def _put(self, path: str, ref: str, digest: Optional[str]) -> str:
+        try:
+            digest = digest or file_digest(path)
+            self._client.put_object(Bucket=self.bucket, Key=self._refs(digest) + ref, Body=b"")
+            blob = self._blob(digest)
+            if not self._exists(blob):
+                self._client.upload_file(path, self.bucket, blob)
+        finally:
+            _remove(path)
+        return digest
+
+    def _trash(self, digest: str) -> str:
+        return f"{self.prefix}trash/{digest}"
+
+    def _referenced(self, digest: str) -> bool:
+        remaining = self._client.list_objects_v2(Bucket=self.bucket, Prefix=self._refs(digest), MaxKeys=1)
+        return remaining.get("KeyCount", 0) > 0
+
+    def _move(self, source: str, target: str) -> None:
+        self._client.copy_object(Bucket=self.bucket, Key=target, CopySource={"Bucket": self.bucket, "Key": source})
+        self._client.delete_object(Bucket=self.bucket, Key=source)
+
+    def _release(self, key: str, ref: str) -> None:
+        if not is_digest(key):
+            logger.warning(f"S3 storage cannot remove pre-CAS document file {key}")
+            return
+        # The blob itself goes in collect_garbage()
+        self._client.delete_object(Bucket=self.bucket, Key=self._refs(key) + ref)
+
+    def _objects(self, prefix: str):
+        paginator = self._client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=prefix):
+            yield from page.get("Contents", [])
+
+    def _collect_garbage(self, grace: float) -> dict:
+        counts = {"trashed": 0, "restored": 0, "removed": 0}
+        cutoff = time.time() - grace
+
+        for obj in self._objects(f"{self.prefix}blobs/"):
+            digest = obj["Key"].rsplit("/", 1)[-1]
+            if not is_digest(digest) or obj["LastModified"].timestamp() > cutoff or self._referenced(digest):
+                continue
+            self._move(obj["Key"], self._trash(digest))
+            counts["trashed"] += 1
+            # A put() that found the blob before the move has its reference visible by now
+            if self._referenced(digest) and not self._exists(obj["Key"]):
+                self._move(self._trash(digest), obj["Key"])
+                counts["restored"] += 1
+
+        for obj in self._objects(f"{self.prefix}trash/"):
+            digest = obj["Key"].rsplit("/", 1)[-1]
+            if obj["LastModified"].timestamp() > cutoff:
+                continue
+            if self._referenced(digest) and not self._exists(self._blob(digest)):
+                self._move(obj["Key"], self._blob(digest))
+                counts["restored"] += 1
+            else:
+                self._client.delete_object(Bucket=self.bucket, Key=obj["Key"])
+                counts["removed"] += 1
+        return counts
+
+    def _get(self, key: str) -> dict:
+        if not is_digest(key):
+            raise _not_found()
+        try:
+            return self._client.get_object(Bucket=self.bucket, Key=self._blob(key))
+        except self._client_error as e:
+            if self._missing(e):
+                raise _not_found()
+            raise
+
+    async def put(self, path: str, ref: str, digest: Optional[str] = None) -> str:
+        return await asyncio.to_thread(self._put, path, ref, digest)
+
+    async def release(self, key: str, ref: str) -> None:
+        await asyncio.to_thread(self._release, key, ref)
+
+    async def collect_garbage(self, grace: float) -> dict:
+        return await asyncio.to_thread(self._collect_garbage, grace)
+
+    async def response(self, key: str, filename: str, media_type: str) -> Response:
+        obj = await asyncio.to_thread(self._get, key)
+        # Streamed through the API: the bucket does not have to be reachable by browsers
+        return StreamingResponse(
+            iterate_in_threadpool(obj["Body"].iter_chunks(CHUNK_SIZE)),
+            media_type=media_type,
+            headers={
+                "Content-Length": str(obj["ContentLength"]),
+                "Content-Disposition": f"attachment; filename*=utf-8''{quote(filename)}",
+            }
+        )
+
+    @asynccontextmanager
+    async def local_copy(self, key: str) -> AsyncIterator[str]:
+        if not is_digest(key):
+            raise _not_found()
+        path = self.staging_path()
+        await asyncio.to_thread(self._client.download_file, self.bucket, self._blob(key), path)
+        try:
+            yield path
+        finally:
+            await asyncio.to_thread(_remove, path)
+
+def _remove(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+@lru_cache(maxsize=None)
+def get_storage() -> DocumentStorage:
+    root = settings.DOCUMENT_STORAGE_DIR or default_root()
+    if settings.DOCUMENT_STORAGE.lower() == "s3":
+        return S3Storage(
+            root, settings.DOCUMENT_S3_BUCKET, settings.DOCUMENT_S3_PREFIX,
+            settings.DOCUMENT_S3_ENDPOINT_URL, settings.DOCUMENT_S3_REGION
+        )
+    return LocalStorage(root)
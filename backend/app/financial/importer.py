@@ -0,0 +1,209 @@
+import csv
+import hashlib
+import io
+import re
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from typing import IO, Iterator, List, Optional
+
+# Parsers for bank statement imports (CSV / OFX).
+# Both read the upload lazily, one record at a time, so memory does not grow with file size.
+
+# Accepted CSV header names (lowercase) -> TransactionCreate field
+CSV_COLUMNS = {
+    'date': 'date', 'data': 'date',
+    'description': 'description', 'descricao': 'description', 'descrição': 'description', 'historico': 'description', 'histórico': 'description',
+    'amount': 'amount', 'valor': 'amount',
+    'type': 'type', 'tipo': 'type',
+    'category': 'category', 'categoria': 'category',
+    'status': 'status', 'situacao': 'status', 'situação': 'status',
+    'observation': 'observation', 'observacao': 'observation', 'observação': 'observation',
+}
+
+TYPE_ALIASES = {
+    'receita': 'RECEITA', 'income': 'RECEITA', 'credit': 'RECEITA', 'credito': 'RECEITA', 'crédito': 'RECEITA', 'c': 'RECEITA',
+    'despesa': 'DESPESA', 'expense': 'DESPESA', 'debit': 'DESPESA', 'debito': 'DESPESA', 'débito': 'DESPESA', 'd': 'DESPESA',
+}
+
+STATUS_ALIASES = {
+    'pago': 'PAGO', 'paid': 'PAGO',
+    'pendente': 'PENDENTE', 'pending': 'PENDENTE',
+}
+
+@dataclass
+class ImportRow:
+    line: int
+    data: dict = field(default_factory=dict)
+    dedup_key: Optional[str] = None
+    error: Optional[str] = None
+
+def parse_amount(raw: str) -> Decimal:
+    """
+    Accepts '1234.56', '1.234,56', '-1234,56', 'R$ 1.234,56'.
+    """
+    value = raw.strip().replace('R$', '').replace(' ', '')
+    if ',' in value and '.' in value:
+        if value.rfind(',') > value.rfind('.'):
+            value = value.replace('.', '').replace(',', '.')
+        else:
+            value = value.replace(',', '')
+    elif ',' in value:
+        value = value.replace(',', '.')
+    try:
+        return Decimal(value)
+    except InvalidOperation:
+        raise ValueError(f"Valor inválido: '{raw}'")
+
+def parse_date(raw: str) -> date:
+    value = raw.strip()
+    for fmt in ('%Y-%m-%d', '%d/%m/%Y', '%d/%m/%y', '%Y%m%d'):
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    raise ValueError(f"Data inválida: '{raw}'")
+
+def fingerprint(*parts) -> str:
+    return hashlib.sha256("|".join(str(p) for p in parts).encode('utf-8')).hexdigest()
+
+class Occurrences:
+    """
+    Identity of rows that carry no bank id: their content plus how many
+    identical rows came before them in the same file. Two real, identical
+    statement lines (e.g. two equal fees on one day) stay distinct, while
+    importing the file again produces the same keys.
+    """
+    def __init__(self):
+        self._counts = {}
+
+    def key(self, *parts) -> str:
+        base = fingerprint(*parts)
+        n = self._counts.get(base, 0) + 1
+        self._counts[base] = n
+        # The first occurrence keeps the content-only key used by earlier imports
+        return base if n == 1 else fingerprint(base, n)
+
+def _finish_row(line: int, tx_date: date, description: str, amount: Decimal,
+                tx_type: Optional[str], **extra) -> ImportRow:
+    # Signed amounts define the type when it is not explicit; stored amounts are positive
+    if not tx_type:
+        tx_type = 'DESPESA' if amount < 0 else 'RECEITA'
+    data = {
+        'date': tx_date,
+        'description': description[:255],
+        'amount': abs(amount),
+        'type': tx_type,
+        'status': 'PAGO',
+        **{k: v for k, v in extra.items() if v},
+    }
+    return ImportRow(line=line, data=data)
+
+def parse_csv(stream: IO[str]) -> Iterator[ImportRow]:
+    """
+    CSV with a header row. Delimiter (',' or ';') is detected from the header.
+    Required columns: date, description, amount.
+    """
+    header_line = stream.readline()
+    if not header_line:
+        return
+    delimiter = ';' if header_line.count(';') > header_line.count(',') else ','
+    header = next(csv.reader([header_line], delimiter=delimiter))
+    columns = [CSV_COLUMNS.get(h.strip().lower()) for h in header]
+
+    missing = {'date', 'description', 'amount'} - set(columns)
+    if missing:
+        yield ImportRow(line=1, error=f"Colunas obrigatórias ausentes: {', '.join(sorted(missing))}")
+        return
+
+    reader = csv.reader(stream, delimiter=delimiter)
+    occurrences = Occurrences()
+    for line, values in enumerate(reader, start=2):
+        if not any(v.strip() for v in values):
+            continue
+        raw = {col: values[i].strip() for i, col in enumerate(columns) if col and i < len(values)}
+        try:
+            tx_type = None
+            if raw.get('type'):
+                tx_type = TYPE_ALIASES.get(raw['type'].lower())
+                if not tx_type:
+                    raise ValueError(f"Tipo inválido: '{raw['type']}'")
+            if not raw.get('description'):
+                raise ValueError("Descrição vazia")
+
+            row = _finish_row(
+                line, parse_date(raw.get('date', '')), raw['description'], parse_amount(raw.get('amount', '')), tx_type,
+                category=raw.get('category') or None,
+                observation=raw.get('observation') or None,
+            )
+            if raw.get('status'):
+                status = STATUS_ALIASES.get(raw['status'].lower())
+                if not status:
+                    raise ValueError(f"Status inválido: '{raw['status']}'")
+                row.data['status'] = status
+
+            # CSV rows have no bank id: the row content (and its occurrence) is the identity
+            row.dedup_key = occurrences.key('csv', row.data['date'], row.data['type'], row.data['amount'], row.data['description'])
+            yield row
+        except ValueError as e:
+            yield ImportRow(line=line, error=str(e))
+
+OFX_BLOCK = re.compile(r'<STMTTRN>(.*?)</STMTTRN>', re.IGNORECASE | re.DOTALL)
+OFX_TAG = re.compile(r'<(\w+)>([^<\r\n]*)')
+
+def parse_ofx(stream: IO[str], chunk_size: int = 64 * 1024) -> Iterator[ImportRow]:
+    """
+    OFX 1.x (SGML) or 2.x (XML). Only <STMTTRN> blocks are read; the file is
+    scanned in chunks and each complete block is parsed as soon as it is seen.
+    """
+    buffer = ''
+    index = 0
+    occurrences = Occurrences()
+    while True:
+        chunk = stream.read(chunk_size)
+        buffer += chunk
+        last_end = 0
+        for match in OFX_BLOCK.finditer(buffer):
+            index += 1
+            last_end = match.end()
+            tags = {k.upper(): v.strip() for k, v in OFX_TAG.findall(match.group(1))}
+            try:
+                if not tags.get('DTPOSTED') or not tags.get('TRNAMT'):
+                    raise ValueError("Transação OFX sem DTPOSTED/TRNAMT")
+                amount = parse_amount(tags['TRNAMT'])
+                description = tags.get('MEMO') or tags.get('NAME') or 'Importado (OFX)'
+                tx_type = None
+                if amount == 0:
+                    tx_type = TYPE_ALIASES.get(tags.get('TRNTYPE', '').lower())
+
+                row = _finish_row(index, parse_date(tags['DTPOSTED'][:8]), description, amount, tx_type)
+                # FITID is the bank's own transaction id; without it identical blocks are told apart by occurrence
+                if tags.get('FITID'):
+                    row.dedup_key = fingerprint('ofx', tags['FITID'], row.data['date'], tags['TRNAMT'])
+                else:
+                    row.dedup_key = occurrences.key('ofx', '', row.data['date'], tags['TRNAMT'])
+                yield row
+            except ValueError as e:
+                yield ImportRow(line=index, error=str(e))
+        buffer = buffer[last_end:]
+        if not last_end:
+            # No complete block yet: keep only a pending block (or a tag-sized tail)
+            start = buffer.upper().rfind('<STMTTRN>')
+            buffer = buffer[start:] if start >= 0 else buffer[-len('<STMTTRN>'):]
+        if not chunk:
+            break
+
+def take_batch(rows: Iterator[ImportRow], size: int) -> List[ImportRow]:
+    """
+    Pulls up to `size` rows from a parser. Meant to run in a worker thread
+    (asyncio.to_thread) since it reads from the spooled upload file.
+    """
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            break
+    return batch
+
+def open_text(binary: IO[bytes], encoding: str) -> IO[str]:
+    return io.TextIOWrapper(binary, encoding=encoding, errors='replace', newline='')
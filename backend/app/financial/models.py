@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, ForeignKey, TIMESTAMP, Text, DECIMAL, text
+from sqlalchemy import Column, String, ForeignKey, TIMESTAMP, Text, DECIMAL, Integer, text
 from sqlalchemy.dialects.postgresql import UUID
 from app.core.database import Base
 import uuid
@@ -22,6 +22,9 @@ class Transaction(Base):
     
     violation_id = Column(UUID(as_uuid=True), ForeignKey("violations.id"), nullable=True)
     
+    # Fingerprint of imported statement lines (OFX FITID / CSV row), used for de-duplication
+    import_hash = Column(String(64), nullable=True)
+    
     created_at = Column(TIMESTAMP(timezone=True), server_default=text("now()"))
 
 class FinancialShare(Base):
@@ -34,3 +37,16 @@ class FinancialShare(Base):
     expires_at = Column(TIMESTAMP(timezone=True), nullable=False)
     created_by = Column(UUID(as_uuid=True), ForeignKey("users.id"))
     created_at = Column(TIMESTAMP(timezone=True), server_default=text("now()"))
+
+class MonthlyLedger(Base):
+    """
+    Rollup of transactions per (condominium, year, month, type).
+    Maintained by the monthly_ledger_trigger on transactions (see db/init.sql).
+    """
+    __tablename__ = "monthly_ledger"
+    condominium_id = Column(UUID(as_uuid=True), ForeignKey("condominiums.id"), primary_key=True)
+    year = Column(Integer, primary_key=True)
+    month = Column(Integer, primary_key=True)
+    type = Column(String(20), primary_key=True) # RECEITA, DESPESA
+    total = Column(DECIMAL(14, 2), nullable=False, default=0)
+    tx_count = Column(Integer, nullable=False, default=0)
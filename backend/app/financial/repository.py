@@ -1,7 +1,10 @@
 from typing import List, Optional
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, extract, func
-from app.financial.models import Transaction
+from sqlalchemy.ext.asyncio import AsyncSession, AsyncScalarResult
+from sqlalchemy import select, func
+from sqlalchemy.dialects.postgresql import insert
+from app.financial.models import Transaction, MonthlyLedger
+from app.utils.period import period_filter
+from app.utils.pagination import keyset_before
 from uuid import UUID
 
 class FinancialRepository:
@@ -13,25 +16,59 @@ class FinancialRepository:
         # Service commits
         return transaction
 
-    async def get_all(self, condo_id: UUID, month: Optional[int] = None, year: Optional[int] = None, 
-                      type: Optional[str] = None, category: Optional[str] = None) -> List[Transaction]:
-        
+    def _list_query(self, condo_id: UUID, month: Optional[int] = None, year: Optional[int] = None,
+                    type: Optional[str] = None, category: Optional[str] = None,
+                    cursor: Optional[str] = None):
         stmt = select(Transaction).where(Transaction.condominium_id == condo_id)
 
-        if month:
-            stmt = stmt.where(extract('month', Transaction.date) == month)
-        if year:
-            stmt = stmt.where(extract('year', Transaction.date) == year)
+        # Range filter on the raw column (index-backed), see app.utils.period
+        stmt = stmt.where(*period_filter(Transaction.date, month, year))
         if type:
             stmt = stmt.where(Transaction.type == type)
         if category and category != "Todas as Categorias":
             stmt = stmt.where(Transaction.category == category)
-            
-        stmt = stmt.order_by(Transaction.date.desc())
+
+        # Keyset pagination on (date, id): resumes after the last row of the previous page
+        stmt = stmt.where(*keyset_before(Transaction.date, Transaction.id, cursor))
+
+        # id as tie-breaker keeps the order stable across pages
+        return stmt.order_by(Transaction.date.desc(), Transaction.id.desc())
+
+    async def get_all(self, condo_id: UUID, month: Optional[int] = None, year: Optional[int] = None, 
+                      type: Optional[str] = None, category: Optional[str] = None,
+                      limit: Optional[int] = None, cursor: Optional[str] = None) -> List[Transaction]:
+        
+        stmt = self._list_query(condo_id, month, year, type, category, cursor)
+        if limit:
+            stmt = stmt.limit(limit)
         
         result = await self.db.execute(stmt)
         return result.scalars().all()
 
+    async def stream_all(self, condo_id: UUID, batch_size: int = 500, **filters) -> AsyncScalarResult:
+        """
+        Server-side cursor over the listing: rows are fetched in batches of `batch_size`
+        instead of materializing the whole ledger.
+        """
+        stmt = self._list_query(condo_id, **filters).execution_options(yield_per=batch_size)
+        result = await self.db.stream(stmt)
+        return result.scalars()
+
+    async def bulk_insert(self, rows: List[dict]) -> List:
+        """
+        One multi-row INSERT ... ON CONFLICT DO NOTHING RETURNING for a batch of
+        imported rows. Lines already imported (same condominium_id/import_hash)
+        are skipped and therefore not returned.
+        """
+        if not rows:
+            return []
+        stmt = insert(Transaction).values(rows).on_conflict_do_nothing(
+            index_elements=[Transaction.condominium_id, Transaction.import_hash],
+            index_where=Transaction.import_hash.isnot(None)
+        ).returning(Transaction.id, Transaction.type, Transaction.amount)
+        result = await self.db.execute(stmt)
+        return result.all()
+
     async def get_by_id(self, id: UUID, condo_id: UUID) -> Optional[Transaction]:
         stmt = select(Transaction).where(Transaction.id == id, Transaction.condominium_id == condo_id)
         result = await self.db.execute(stmt)
@@ -41,39 +78,23 @@ class FinancialRepository:
         await self.db.delete(transaction)
 
     async def get_summary_stats(self, condo_id: UUID, month: int, year: int) -> dict:
-        # Income Month
-        income_stmt = select(func.sum(Transaction.amount)).where(
-            Transaction.condominium_id == condo_id,
-            extract('month', Transaction.date) == month,
-            extract('year', Transaction.date) == year,
-            Transaction.type == 'RECEITA'
-        )
-        income = (await self.db.execute(income_stmt)).scalar() or 0
+        # Read from the monthly_ledger rollup: one row per month/type instead of
+        # scanning every transaction of the condominium for the all-time balance.
+        is_income = MonthlyLedger.type == 'RECEITA'
+        is_expense = MonthlyLedger.type == 'DESPESA'
+        is_period = (MonthlyLedger.year == year) & (MonthlyLedger.month == month)
 
-        # Expense Month
-        expense_stmt = select(func.sum(Transaction.amount)).where(
-            Transaction.condominium_id == condo_id,
-            extract('month', Transaction.date) == month,
-            extract('year', Transaction.date) == year,
-            Transaction.type == 'DESPESA'
-        )
-        expense = (await self.db.execute(expense_stmt)).scalar() or 0
+        stmt = select(
+            func.coalesce(func.sum(MonthlyLedger.total).filter(is_period & is_income), 0).label('income'),
+            func.coalesce(func.sum(MonthlyLedger.total).filter(is_period & is_expense), 0).label('expense'),
+            func.coalesce(func.sum(MonthlyLedger.total).filter(is_income), 0).label('total_income'),
+            func.coalesce(func.sum(MonthlyLedger.total).filter(is_expense), 0).label('total_expense'),
+        ).where(MonthlyLedger.condominium_id == condo_id)
 
-        # Total Balance
-        total_income_stmt = select(func.sum(Transaction.amount)).where(
-            Transaction.condominium_id == condo_id,
-            Transaction.type == 'RECEITA'
-        )
-        total_expense_stmt = select(func.sum(Transaction.amount)).where(
-            Transaction.condominium_id == condo_id,
-            Transaction.type == 'DESPESA'
-        )
-        
-        ti = (await self.db.execute(total_income_stmt)).scalar() or 0
-        te = (await self.db.execute(total_expense_stmt)).scalar() or 0
+        row = (await self.db.execute(stmt)).one()
         
         return {
-            "income": income,
-            "expense": expense,
-            "balance": ti - te
+            "income": row.income,
+            "expense": row.expense,
+            "balance": row.total_income - row.total_expense
         }
@@ -1,10 +1,12 @@
 from typing import Annotated, List, Optional
 from uuid import UUID
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, Response, UploadFile
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.core import deps
-from app.financial.schemas import TransactionRead, TransactionCreate, TransactionUpdate, ShareCreate, PublicReportResponse
+from app.financial.schemas import TransactionRead, TransactionCreate, TransactionUpdate, ShareCreate, PublicReportResponse, ImportResult
 from app.financial.service import FinancialService
+from app.utils.pagination import NEXT_CURSOR_HEADER, encode_cursor
 
 router = APIRouter()
 
@@ -19,19 +21,99 @@ async def create_transaction(
 
 @router.get("/", response_model=List[TransactionRead])
 async def list_transactions(
+    response: Response,
     db: Annotated[AsyncSession, Depends(deps.get_db)],
     current_user: Annotated[deps.TokenData, Depends(deps.get_current_user)],
     month: Optional[int] = Query(None, ge=1, le=12),
     year: Optional[int] = Query(None, ge=2000, le=2100),
     type: Optional[str] = None,
-    category: Optional[str] = None
+    category: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    cursor: Optional[str] = None
 ):
+    """
+    Without `limit` returns every matching transaction (legacy behaviour).
+    With `limit`, returns one page ordered by (date, id) DESC; the cursor for the
+    next page is sent in the X-Next-Cursor header.
+    """
     service = FinancialService(db)
-    return await service.list_transactions(
+    transactions = await service.list_transactions(
         current_user.role, 
         current_user.condo_id, 
-        month=month, year=year, type=type, category=category
+        month=month, year=year, type=type, category=category,
+        limit=limit, cursor=cursor
     )
+    if limit and len(transactions) == limit:
+        last = transactions[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(last.date, last.id)
+    return transactions
+
+@router.post("/import", response_model=ImportResult)
+async def import_transactions(
+    db: Annotated[AsyncSession, Depends(deps.get_db)],
+    current_user: Annotated[deps.TokenData, Depends(deps.get_current_user)],
+    file: UploadFile = File(...),
+    format: Optional[str] = Query(None, pattern="^(csv|ofx)$"),
+    encoding: str = Query("utf-8")
+):
+    """
+    Bulk import of a bank statement. `format` defaults to the file extension.
+    Rows already imported before (same OFX FITID / same CSV line) are skipped.
+    """
+    fmt = format
+    if not fmt:
+        name = (file.filename or "").lower()
+        fmt = "ofx" if name.endswith(".ofx") else "csv" if name.endswith(".csv") else None
+    if not fmt:
+        raise HTTPException(status_code=400, detail="Formato não suportado. Use CSV ou OFX.")
+
+    try:
+        "".encode(encoding)
+    except LookupError:
+        raise HTTPException(status_code=400, detail=f"Encoding inválido: {encoding}")
+
+    service = FinancialService(db)
+    return await service.import_transactions(
+        file.file, fmt, current_user.role, current_user.condo_id,
+        user_id=current_user.user_id, encoding=encoding
+    )
+
+@router.get("/stream")
+async def stream_transactions(
+    request: Request,
+    current_user: Annotated[deps.TokenData, Depends(deps.get_current_user)],
+    month: Optional[int] = Query(None, ge=1, le=12),
+    year: Optional[int] = Query(None, ge=2000, le=2100),
+    type: Optional[str] = None,
+    category: Optional[str] = None,
+    cursor: Optional[str] = None
+):
+    """
+    NDJSON export (one TransactionRead per line) backed by a server-side cursor,
+    so memory stays flat regardless of ledger size.
+    """
+    # The session outlives this function (rows are read while the body streams),
+    # so it is opened here instead of through the get_db dependency.
+    db = await deps.open_db_session(request, current_user)
+    try:
+        service = FinancialService(db)
+        rows = await service.stream_transactions(
+            current_user.role,
+            current_user.condo_id,
+            month=month, year=year, type=type, category=category, cursor=cursor
+        )
+    except Exception:
+        await db.close()
+        raise
+
+    async def ndjson():
+        try:
+            async for tx in rows:
+                yield TransactionRead.model_validate(tx).model_dump_json() + "\n"
+        finally:
+            await db.close()
+
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
 
 @router.put("/{id}", response_model=TransactionRead)
 async def update_transaction(
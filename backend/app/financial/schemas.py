@@ -61,3 +61,11 @@ class PublicReportResponse(BaseModel):
     summary: dict # FinancialSummary
     transactions: List[TransactionRead]
     generated_at: datetime.datetime
+
+class ImportResult(BaseModel):
+    format: str
+    imported: int
+    duplicates: int
+    batches: int
+    total_income: Decimal
+    total_expense: Decimal
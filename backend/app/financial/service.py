@@ -1,10 +1,19 @@
-from typing import List, Optional
-from uuid import UUID
+import asyncio
+from decimal import Decimal
+from typing import IO, List, Optional
+from uuid import UUID, uuid4
 from fastapi import HTTPException
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession, AsyncScalarResult
 from app.financial.repository import FinancialRepository
-from app.financial.schemas import TransactionCreate, TransactionUpdate
+from app.financial.schemas import TransactionCreate, TransactionUpdate, ImportResult
 from app.financial.models import Transaction
+from app.financial import importer
+from app.services.audit_service import AuditService
+
+IMPORT_BATCH_SIZE = 500
+# Upper bound of DECIMAL(10, 2)
+MAX_AMOUNT = Decimal('99999999.99')
+MAX_REPORTED_ERRORS = 50
 
 class FinancialService:
     def __init__(self, db: AsyncSession):
@@ -53,6 +62,117 @@ class FinancialService:
         self._check_auth(role)
         return await self.repo.get_all(condo_id, **filters)
 
+    async def stream_transactions(self, role: str, condo_id: UUID, **filters) -> AsyncScalarResult:
+        # Auth is checked here, before the caller starts streaming the response
+        self._check_auth(role)
+        return await self.repo.stream_all(condo_id, **filters)
+
+    async def import_transactions(self, file: IO[bytes], fmt: str, role: str, condo_id: UUID,
+                                  user_id: Optional[str] = None, encoding: str = 'utf-8') -> ImportResult:
+        """
+        Bulk import of a bank statement (CSV or OFX).
+        The file is parsed lazily in a worker thread, IMPORT_BATCH_SIZE rows at a time;
+        each batch becomes one multi-row INSERT and one audit summary entry.
+        Everything is committed in a single transaction: any invalid row aborts the import.
+        """
+        self._check_admin(role)
+        parse = importer.parse_ofx if fmt == 'ofx' else importer.parse_csv
+
+        text_stream = importer.open_text(file, encoding)
+        rows = parse(text_stream)
+
+        seen = set()
+        errors = []
+        imported = duplicates = batches = 0
+        totals = {'RECEITA': Decimal(0), 'DESPESA': Decimal(0)}
+        try:
+            while True:
+                batch = await asyncio.to_thread(importer.take_batch, rows, IMPORT_BATCH_SIZE)
+                if not batch:
+                    break
+
+                values = []
+                for row in batch:
+                    if not row.error:
+                        try:
+                            tx = TransactionCreate(**row.data)
+                            if tx.amount > MAX_AMOUNT:
+                                raise ValueError(f"Valor fora do limite: {tx.amount}")
+                            if tx.category and len(tx.category) > 50:
+                                raise ValueError("Categoria com mais de 50 caracteres")
+                        except ValueError as e:
+                            row.error = str(e)
+                    if row.error:
+                        errors.append(f"Linha {row.line}: {row.error}")
+                        continue
+                    if row.dedup_key in seen:
+                        duplicates += 1
+                        continue
+                    seen.add(row.dedup_key)
+                    values.append({
+                        'id': uuid4(),
+                        'condominium_id': condo_id,
+                        'import_hash': row.dedup_key,
+                        **tx.model_dump()
+                    })
+
+                # Keep parsing to report every error, but stop writing
+                if errors or not values:
+                    continue
+
+                inserted = await self.repo.bulk_insert(values)
+                batches += 1
+                imported += len(inserted)
+                duplicates += len(values) - len(inserted)
+                batch_totals = {'RECEITA': Decimal(0), 'DESPESA': Decimal(0)}
+                for r in inserted:
+                    batch_totals[r.type] += r.amount
+                totals['RECEITA'] += batch_totals['RECEITA']
+                totals['DESPESA'] += batch_totals['DESPESA']
+
+                # Row-level audit still comes from the table trigger; this entry
+                # records the import batch itself (who, what file format, how much).
+                await AuditService.log(
+                    self.db,
+                    action='INSERT',
+                    table_name='transactions',
+                    record_id=str(uuid4()),
+                    actor_id=user_id,
+                    new_data={
+                        'import_batch': batches,
+                        'format': fmt,
+                        'rows': len(inserted),
+                        'skipped_duplicates': len(values) - len(inserted),
+                        'total_income': str(batch_totals['RECEITA']),
+                        'total_expense': str(batch_totals['DESPESA']),
+                        'transaction_ids': [str(r.id) for r in inserted],
+                    },
+                    condominium_id=condo_id
+                )
+        except Exception:
+            await self.db.rollback()
+            raise
+        finally:
+            # Leave the upload file open: it belongs to the caller
+            text_stream.detach()
+
+        if errors:
+            await self.db.rollback()
+            detail = errors[:MAX_REPORTED_ERRORS]
+            if len(errors) > MAX_REPORTED_ERRORS:
+                detail.append(f"... e mais {len(errors) - MAX_REPORTED_ERRORS} erro(s)")
+            raise HTTPException(status_code=422, detail=detail)
+
+        await self.db.commit()
+        return ImportResult(
+            format=fmt,
+            imported=imported,
+            duplicates=duplicates,
+            batches=batches,
+            total_income=totals['RECEITA'],
+            total_expense=totals['DESPESA']
+        )
+
     async def update_transaction(self, id: UUID, tx_in: TransactionUpdate, role: str, condo_id: UUID) -> Transaction:
         self._check_admin(role)
         
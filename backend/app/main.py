@@ -1,9 +1,10 @@
-from fastapi import FastAPI
+from typing import Annotated
+from fastapi import FastAPI, Depends, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
 from app.api.v1 import (
     dashboard, condominium, audit, bylaws, 
-    profile, notifications
+    profile, notifications, events as events_router
 )
 from app.users import router as users_router
 from app.users import auth as auth_router
@@ -17,8 +18,16 @@ from app.assets import router as inventory_router
 from app.reservations import router as reservations_router
 from app.documents import router as documents_router
 
-from app.core.database import AsyncSessionLocal
+from app.core.body_limit import BodySizeLimitMiddleware
+from app.core.database import AsyncSessionLocal, engine
+from app.core.pool_metrics import metrics as pool_metrics
+from app.core import deps
 from app.db.init_db import init_db
+from app.services.geoip import geoip
+from app.services.audit_writer import audit_writer
+from app.services.events import events
+from app.services.document_jobs import document_jobs
+from app.services.optimizer import optimizer
 import logging
 
 logger = logging.getLogger("uvicorn")
@@ -36,6 +45,14 @@ async def startup_event():
         except Exception as e:
             logger.error(f"Error initializing database: {e}")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    await geoip.shutdown()
+    await audit_writer.shutdown()
+    await events.shutdown()
+    await document_jobs.shutdown()
+    await optimizer.shutdown()
+
 from fastapi.exceptions import RequestValidationError
 from fastapi.requests import Request
 from fastapi.responses import JSONResponse
@@ -50,7 +67,14 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
         content={"detail": exc.errors(), "body": body.decode()},
     )
 
+# Uploads acima do limite são recusados antes de o corpo ir para disco
+app.add_middleware(
+    BodySizeLimitMiddleware,
+    limits={f"{settings.API_V1_STR}/documents/": settings.DOCUMENT_MAX_UPLOAD_BYTES},
+)
+
 # Configuração de CORS
+# (adicionado por último = mais externo: também cobre as respostas dos middlewares acima)
 # Em produção, restritir origins para o domínio do frontend
 app.add_middleware(
     CORSMiddleware,
@@ -58,6 +82,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Cabeçalhos de resposta que o frontend (outra origem) precisa ler
+    expose_headers=["X-Next-Cursor", "ETag", "X-Unread-Count"],
 )
 
 # Rotas
@@ -82,8 +108,30 @@ app.include_router(audit.router, prefix=f"{settings.API_V1_STR}/audit", tags=["a
 app.include_router(bylaws.router, prefix=f"{settings.API_V1_STR}/bylaws", tags=["bylaws"])
 app.include_router(profile.router, prefix=f"{settings.API_V1_STR}/profile", tags=["profile"])
 app.include_router(notifications.router, prefix=f"{settings.API_V1_STR}/notifications", tags=["notifications"])
+app.include_router(events_router.router, prefix=f"{settings.API_V1_STR}/events", tags=["events"])
 app.include_router(documents_router.router, prefix=f"{settings.API_V1_STR}/documents", tags=["documents"])
 
 @app.get("/")
 def root():
     return {"message": "Maison Manager API - Status OK"}
+
+@app.get(f"{settings.API_V1_STR}/health/db")
+async def db_pool_status(current_user: Annotated[deps.TokenData, Depends(deps.get_current_user)]):
+    # Pool usage of this worker (wait / checkout times in ms)
+    if current_user.role != 'ADMIN':
+        raise HTTPException(status_code=403, detail="Not authorized")
+    return pool_metrics.snapshot(engine.sync_engine.pool)
+
+@app.get(f"{settings.API_V1_STR}/health/audit")
+async def audit_writer_status(current_user: Annotated[deps.TokenData, Depends(deps.get_current_user)]):
+    # Background audit writer of this worker (queue depth, flush times in ms)
+    if current_user.role != 'ADMIN':
+        raise HTTPException(status_code=403, detail="Not authorized")
+    return audit_writer.snapshot()
+
+@app.get(f"{settings.API_V1_STR}/health/optimizer")
+async def optimizer_status(current_user: Annotated[deps.TokenData, Depends(deps.get_current_user)]):
+    # File optimizer process pool of this worker (pending jobs, timeouts, 503s, durations in ms)
+    if current_user.role != 'ADMIN':
+        raise HTTPException(status_code=403, detail="Not authorized")
+    return optimizer.snapshot()
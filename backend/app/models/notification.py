@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Integer, BigInteger, DateTime, ForeignKey, text
+from sqlalchemy.dialects.postgresql import UUID
+from app.core.database import Base
+
+class NotificationState(Base):
+    """
+    Per-user unread counter and feed version. Maintained by database triggers
+    (see notification_state in db/init.sql); the app only reads it and resets it.
+    """
+    __tablename__ = "notification_state"
+
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    condominium_id = Column(UUID(as_uuid=True), ForeignKey("condominiums.id"), nullable=False)
+    unread_count = Column(Integer, nullable=False, server_default=text("0"))
+    version = Column(BigInteger, nullable=False, server_default=text("1"))
+    last_read_at = Column(DateTime(timezone=True), nullable=True)
+    updated_at = Column(DateTime(timezone=True), server_default=text("now()"))
@@ -1,12 +1,15 @@
-from sqlalchemy import Column, String, ForeignKey, TIMESTAMP, Text, Integer, JSON, DECIMAL, Boolean, text
+from sqlalchemy import Column, String, ForeignKey, TIMESTAMP, Text, Integer, BigInteger, JSON, DECIMAL, Boolean, Computed, text
 from sqlalchemy.orm import relationship
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import UUID, TSTZRANGE
 from app.core.database import Base
 import uuid
 
 def uuid_pk():
     return Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
 
+# Statuses that hold a slot (reservations_no_overlap constraint)
+ACTIVE_STATUSES = ('PENDENTE', 'CONFIRMADO', 'BLOQUEADO')
+
 class Reservation(Base):
     __tablename__ = "reservations"
     id = uuid_pk()
@@ -19,6 +22,8 @@ class Reservation(Base):
     status = Column(String(20), default="PENDENTE")
     reason = Column(Text, nullable=True)
     created_at = Column(TIMESTAMP(timezone=True), server_default=text("now()"))
+    # [start_time, end_time), generated by the database
+    period = Column(TSTZRANGE, Computed("tstzrange(start_time, end_time, '[)')", persisted=True))
     
     user = relationship("User")
     common_area = relationship("CommonArea")
@@ -36,3 +41,10 @@ class CommonArea(Base):
     opening_hours = Column(JSON, nullable=True)
     is_active = Column(Boolean, default=True)
     created_at = Column(TIMESTAMP(timezone=True), server_default=text("now()"))
+
+class ReservationVersion(Base):
+    # Bumped by trigger on every reservation change of the area (availability cache key)
+    __tablename__ = "reservation_versions"
+    common_area_id = Column(UUID(as_uuid=True), ForeignKey("common_areas.id", ondelete="CASCADE"), primary_key=True)
+    condominium_id = Column(UUID(as_uuid=True), ForeignKey("condominiums.id"), nullable=False)
+    version = Column(BigInteger, nullable=False, server_default=text("1"))
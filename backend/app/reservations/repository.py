@@ -1,8 +1,8 @@
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, desc, and_
+from sqlalchemy import select, desc, and_, func, text
 from sqlalchemy.orm import joinedload
-from app.reservations.models import Reservation, CommonArea
+from app.reservations.models import Reservation, CommonArea, ReservationVersion, ACTIVE_STATUSES
 from uuid import UUID
 from datetime import datetime
 
@@ -46,13 +46,47 @@ class ReservationRepository:
         return result.scalar_one_or_none()
         
     async def check_overlap(self, area_id: UUID, start: datetime, end: datetime) -> bool:
-        # Check if any reservation overlaps
-        # (StartA <= EndB) and (EndA >= StartB)
-        query = select(Reservation).where(
+        # Advisory only: the reservations_no_overlap constraint is what guarantees it.
+        # Same predicate as the constraint, so the query uses its GiST index.
+        query = select(Reservation.id).where(
             Reservation.common_area_id == area_id,
-            Reservation.status.not_in(['REJEITADO', 'CANCELADO']), # Don't block rejected or cancelled
-            Reservation.start_time < end,
-            Reservation.end_time > start
-        )
+            Reservation.status.in_(ACTIVE_STATUSES),
+            Reservation.period.op('&&')(func.tstzrange(start, end, '[)'))
+        ).limit(1)
         result = await self.db.execute(query)
         return result.first() is not None
+
+    # Availability
+    async def get_availability_version(self, area_id: UUID, condo_id: UUID) -> Optional[int]:
+        # None when the area does not exist in this condominium; 0 before its first booking
+        query = select(func.coalesce(ReservationVersion.version, 0).label("version")).select_from(
+            CommonArea
+        ).outerjoin(
+            ReservationVersion, ReservationVersion.common_area_id == CommonArea.id
+        ).where(CommonArea.id == area_id, CommonArea.condominium_id == condo_id)
+        row = (await self.db.execute(query)).first()
+        return row.version if row else None
+
+    async def get_busy_intervals(self, area_id: UUID, start: datetime, end: datetime) -> List[Tuple[datetime, datetime]]:
+        # Active bookings clipped to the window and merged (range_agg) in one GiST range scan
+        query = text("""
+            SELECT lower(r) AS start, upper(r) AS "end"
+            FROM unnest((
+                SELECT range_agg(period * tstzrange(:start, :end, '[)'))
+                FROM reservations
+                WHERE common_area_id = :area_id
+                  AND status IN ('PENDENTE', 'CONFIRMADO', 'BLOQUEADO')
+                  AND period && tstzrange(:start, :end, '[)')
+            )) AS r
+            ORDER BY 1
+        """)
+        result = await self.db.execute(query, {"area_id": area_id, "start": start, "end": end})
+        return [(row.start, row.end) for row in result]
+
+    async def get_blocks(self, area_id: UUID, start: datetime, end: datetime) -> list:
+        query = select(Reservation.start_time, Reservation.end_time, Reservation.reason).where(
+            Reservation.common_area_id == area_id,
+            Reservation.status == 'BLOQUEADO',
+            Reservation.period.op('&&')(func.tstzrange(start, end, '[)'))
+        ).order_by(Reservation.start_time)
+        return (await self.db.execute(query)).all()
@@ -1,11 +1,12 @@
-from typing import Annotated, List
+from typing import Annotated, List, Optional
 from uuid import UUID
-from fastapi import APIRouter, Depends
+from datetime import datetime
+from fastapi import APIRouter, Depends, Header, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.core import deps
 from app.reservations.schemas import (
     ReservationRead, ReservationCreate, ReservationUpdate,
-    CommonAreaRead, CommonAreaCreate
+    CommonAreaRead, CommonAreaCreate, AvailabilityRead
 )
 from app.reservations.service import ReservationService
 
@@ -49,6 +50,28 @@ async def list_reservations(
     service = ReservationService(db)
     return await service.list_reservations(current_user.user_id, current_user.role, current_user.condo_id)
 
+@router.get("/availability", response_model=AvailabilityRead)
+async def get_availability(
+    response: Response,
+    db: Annotated[AsyncSession, Depends(deps.get_db)],
+    current_user: Annotated[deps.TokenData, Depends(deps.get_current_user)],
+    area: UUID,
+    from_: datetime = Query(alias="from"),
+    to: datetime = Query(),
+    if_none_match: Annotated[Optional[str], Header()] = None
+):
+    """
+    Free/busy calendar of a common area for [from, to). No user data.
+    ETag changes with any reservation change of the area (304 on If-None-Match).
+    """
+    service = ReservationService(db)
+    version, availability = await service.get_availability(area, from_, to, current_user.condo_id)
+    headers = {"ETag": f'W/"{version}"', "Cache-Control": "private, no-cache"}
+    if if_none_match and headers["ETag"] in [tag.strip() for tag in if_none_match.split(',')]:
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return availability
+
 @router.post("/", response_model=ReservationRead)
 async def create_reservation(
     data: ReservationCreate,
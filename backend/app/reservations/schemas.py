@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 from uuid import UUID
 from datetime import datetime
 
@@ -77,3 +77,18 @@ class ReservationRead(ReservationBase):
         
     class Config:
         from_attributes = True
+
+# --- Availability ---
+class BusyInterval(BaseModel):
+    start: datetime
+    end: datetime
+
+class BlockedInterval(BusyInterval):
+    reason: Optional[str] = None
+
+class AvailabilityRead(BaseModel):
+    common_area_id: UUID
+    start: datetime
+    end: datetime
+    busy: List[BusyInterval] # Merged active bookings (no user data)
+    blocked: List[BlockedInterval] # Admin blocks (BLOQUEADO), with their reason
@@ -1,13 +1,32 @@
-from typing import List
+from typing import List, Tuple
 from uuid import UUID
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
 from fastapi import HTTPException
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.reservations.repository import ReservationRepository
 from app.reservations.schemas import (
     ReservationCreate, ReservationUpdate,
-    CommonAreaCreate
+    CommonAreaCreate, AvailabilityRead, BusyInterval, BlockedInterval
 )
 from app.reservations.models import Reservation, CommonArea
+from app.services.enrichment import RESOLVERS
+from app.utils.cache import TTLCache
+from app.utils.period import DEFAULT_TZ
+
+# SQLSTATE of exclusion_violation (reservations_no_overlap)
+EXCLUSION_VIOLATION = '23P01'
+
+def is_overlap(e: IntegrityError) -> bool:
+    return getattr(e.orig, 'sqlstate', None) == EXCLUSION_VIOLATION
+
+MAX_AVAILABILITY_WINDOW = timedelta(days=93)
+
+# (area, version, start, end) -> AvailabilityRead. The version changes with every
+# reservation change of the area (reservation_versions), so entries never go stale;
+# the TTL only bounds memory.
+_availability_cache = TTLCache(maxsize=2048, ttl=600)
 
 class ReservationService:
     def __init__(self, db: AsyncSession):
@@ -32,8 +51,18 @@ class ReservationService:
         if not area: raise HTTPException(status_code=404, detail="Area not found")
         await self.repo.delete_area(area)
         await self.db.commit()
+        RESOLVERS["common_areas"].invalidate(condo_id, id)
 
     # Reservations
+    async def commit_or_conflict(self) -> None:
+        try:
+            await self.db.commit()
+        except IntegrityError as e:
+            await self.db.rollback()
+            if is_overlap(e):
+                raise HTTPException(status_code=409, detail="Horário indisponível.")
+            raise
+
     async def list_reservations(self, user_id: UUID, role: str, condo_id: UUID) -> List[Reservation]:
         # Allow Residents to see all reservations (for calendar blocked dates)
         reservations = await self.repo.get_reservations(condo_id, user_id=None)
@@ -50,11 +79,11 @@ class ReservationService:
     async def create_reservation(self, data: ReservationCreate, user_id: UUID, role: str, condo_id: UUID) -> Reservation:
         # 1. Validate Area restrictions (min/max time, capacity) -> Skipped for brevity, focusing on structure
         
-        # 2. Check overlap
-        overlap = await self.repo.check_overlap(data.common_area_id, data.start_time, data.end_time)
-        if overlap:
-             raise HTTPException(status_code=409, detail="Horário indisponível.")
-             
+        if data.end_time <= data.start_time:
+            raise HTTPException(status_code=400, detail="O horário final deve ser após o inicial.")
+
+        # 2. Overlap is checked by the database (reservations_no_overlap) on insert:
+        # a single index probe, and two concurrent bookings cannot both succeed.
         initial_status = 'PENDENTE'
         if role == 'ADMIN' and data.status:
              initial_status = data.status
@@ -66,7 +95,7 @@ class ReservationService:
             **data.model_dump(exclude={'user_id', 'status'})
         )
         await self.repo.create_reservation(res)
-        await self.db.commit()
+        await self.commit_or_conflict()
         # Fetch with relationships for Pydantic response
         return await self.repo.get_reservation_by_id(res.id, condo_id)
 
@@ -89,6 +118,43 @@ class ReservationService:
              
         if data.status: res.status = data.status
         
-        await self.db.commit()
+        # Re-activating a cancelled/rejected booking may collide with a newer one
+        await self.commit_or_conflict()
         # Fetch status change with relationships
         return await self.repo.get_reservation_by_id(res.id, condo_id)
+
+    async def get_availability(self, area_id: UUID, start: datetime, end: datetime, condo_id: UUID) -> Tuple[int, AvailabilityRead]:
+        """
+        Merged busy intervals of an area in [start, end), plus admin blocks.
+        Returns (version, availability); the version is the ETag of the window.
+        """
+        # Naive bounds are local to the condominium
+        tz = ZoneInfo(DEFAULT_TZ)
+        start = start if start.tzinfo else start.replace(tzinfo=tz)
+        end = end if end.tzinfo else end.replace(tzinfo=tz)
+        if end <= start:
+            raise HTTPException(status_code=400, detail="'to' deve ser após 'from'.")
+        if end - start > MAX_AVAILABILITY_WINDOW:
+            raise HTTPException(status_code=400, detail="Janela máxima de 93 dias.")
+
+        # Version first: anything read afterwards is at least as new as the cache key
+        version = await self.repo.get_availability_version(area_id, condo_id)
+        if version is None:
+            raise HTTPException(status_code=404, detail="Area not found")
+
+        key = (str(area_id), version, start, end)
+        cached = _availability_cache.get(key)
+        if cached:
+            return version, cached
+
+        busy = await self.repo.get_busy_intervals(area_id, start, end)
+        blocks = await self.repo.get_blocks(area_id, start, end)
+        availability = AvailabilityRead(
+            common_area_id=area_id,
+            start=start,
+            end=end,
+            busy=[BusyInterval(start=s, end=e) for s, e in busy],
+            blocked=[BlockedInterval(start=b.start_time, end=b.end_time, reason=b.reason) for b in blocks],
+        )
+        _availability_cache.set(key, availability)
+        return version, availability
@@ -10,3 +10,7 @@ class NotificationItem(BaseModel):
     created_at: datetime
     read: bool = False # Always false effectively unless we track it
     link: Optional[str] = None
+
+class NotificationCount(BaseModel):
+    unread: int
+    version: int
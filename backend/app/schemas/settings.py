@@ -60,5 +60,6 @@ class AuditLogRead(BaseModel):
     created_at: Optional[datetime]
     
     actor_name: Optional[str] = None # Enriched field
+    changed_fields: Optional[List[str]] = None # UPDATE only
 
     model_config = ConfigDict(from_attributes=True)
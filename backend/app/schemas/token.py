@@ -10,6 +10,7 @@ class TokenData(BaseModel):
     user_id: str
     condo_id: str
     role: str
+    exp: Optional[float] = None  # expiry of the access token (unix time)
 
 class UserLogin(BaseModel):
     email: EmailStr
@@ -1,7 +1,9 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.audit import AuditLog
+from app.services.audit_writer import audit_writer
 import uuid
 import json
+from datetime import datetime, timezone
 from typing import Optional, Any
 
 class AuditService:
@@ -16,14 +18,33 @@ class AuditService:
         new_data: Optional[dict] = None,
         ip_address: Optional[str] = None,
         condominium_id: Optional[str] = None
-    ) -> AuditLog:
+    ) -> Optional[AuditLog]:
         """
         Create a system audit log entry.
+        With AUDIT_MODE=async the entry is handed to the background writer
+        after the caller commits, and None is returned.
         """
         # Ensure UUIDs if passed as strings (though SQLAlchemy handles this usually, validation helps)
         actor_uuid = uuid.UUID(str(actor_id)) if actor_id else None
         condo_uuid = uuid.UUID(str(condominium_id)) if condominium_id else None
 
+        if audit_writer.enabled:
+            row = {
+                "id": uuid.uuid4(),
+                "condominium_id": condo_uuid,
+                "actor_id": actor_uuid,
+                "action": action.upper(),
+                "table_name": table_name,
+                "record_id": str(record_id),
+                "old_data": old_data,
+                "new_data": new_data,
+                "ip_address": ip_address,
+                # Time of the action, not of the (later) batch write
+                "created_at": datetime.now(timezone.utc),
+            }
+            if await audit_writer.stage(db, row):
+                return None
+
         # new_id = uuid.uuid4()
         log_entry = AuditLog(
             id=uuid.uuid4(),
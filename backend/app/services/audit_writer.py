@@ -0,0 +1,242 @@
+import asyncio
+import json
+import logging
+import time
+from typing import List, Optional
+from sqlalchemy import event, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core import database
+from app.core.pool_metrics import DurationStat
+from app.models.audit import AuditLog
+
+logger = logging.getLogger(__name__)
+
+# Key in Session.info holding the rows to queue once the transaction commits
+PENDING_KEY = "audit_pending"
+
+COLUMNS = (
+    "id", "condominium_id", "actor_id", "action", "table_name", "record_id",
+    "old_data", "new_data", "ip_address", "created_at",
+)
+
+class AuditWriter:
+    """
+    Background audit persistence for AUDIT_MODE=async.
+    AuditService.log stages rows in the caller's session; they are queued when
+    that session commits (dropped on rollback) and a single task writes them in
+    batches of AUDIT_BATCH_SIZE, at least every AUDIT_FLUSH_INTERVAL seconds.
+    When the queue stays full for AUDIT_ENQUEUE_TIMEOUT the caller falls back
+    to a transactional write (backpressure instead of unbounded memory).
+    A row the database rejects is logged and dropped on its own, not with
+    the rest of its batch.
+    """
+    MAX_ATTEMPTS = 3
+
+    def __init__(self):
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._overflow = set()
+        self.flush = DurationStat()
+        self.enqueued = 0
+        self.written = 0
+        self.failed = 0
+        self.fallbacks = 0
+
+    @property
+    def enabled(self) -> bool:
+        return settings.AUDIT_MODE == "async"
+
+    async def stage(self, db: AsyncSession, row: dict) -> bool:
+        """
+        Holds `row` until `db` commits. False when there is no room in the
+        queue: the caller must then write the record itself.
+        """
+        self._ensure_worker()
+        if not await self._wait_for_space(settings.AUDIT_ENQUEUE_TIMEOUT):
+            self.fallbacks += 1
+            return False
+        db.info.setdefault(PENDING_KEY, []).append(row)
+        return True
+
+    def stage_committed(self, session, rows: List[dict]) -> None:
+        """
+        stage() for callers that cannot wait (the buffered audit decorator
+        flushes from before_commit): no backpressure, put() absorbs a full queue.
+        """
+        session.info.setdefault(PENDING_KEY, []).extend(rows)
+
+    async def _wait_for_space(self, timeout: float) -> bool:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while self._queue.full():
+            if loop.time() >= deadline:
+                return False
+            await asyncio.sleep(0.01)
+        return True
+
+    def put(self, rows: List[dict]) -> None:
+        """
+        Queues committed rows. Never blocks: the queue may have filled up since
+        the rows were staged, in which case the put waits in a task.
+        """
+        self._ensure_worker()
+        for row in rows:
+            self.enqueued += 1
+            try:
+                self._queue.put_nowait(row)
+            except asyncio.QueueFull:
+                task = asyncio.get_running_loop().create_task(self._queue.put(row))
+                self._overflow.add(task)
+                task.add_done_callback(self._overflow.discard)
+
+    def _ensure_worker(self) -> None:
+        if self._worker is None or self._worker.done():
+            self._queue = self._queue or asyncio.Queue(maxsize=settings.AUDIT_QUEUE_SIZE)
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + settings.AUDIT_FLUSH_INTERVAL
+            while len(batch) < settings.AUDIT_BATCH_SIZE:
+                try:
+                    batch.append(self._queue.get_nowait())
+                    continue
+                except asyncio.QueueEmpty:
+                    pass
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            try:
+                await self._write_batch(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _write_batch(self, batch: List[dict]) -> None:
+        for attempt in range(1, self.MAX_ATTEMPTS + 1):
+            start = time.perf_counter()
+            try:
+                failed = await self._write(batch)
+            except Exception as e:
+                logger.warning(f"Audit batch of {len(batch)} failed (attempt {attempt}): {e}")
+                await asyncio.sleep(0.5 * attempt)
+                continue
+            self.flush.add((time.perf_counter() - start) * 1000)
+            self.written += len(batch) - len(failed)
+            if failed:
+                await self._write_rows(failed)
+            return
+        # Still failing as a whole: isolate the bad rows instead of dropping the batch
+        await self._write_rows(batch)
+
+    async def _write(self, batch: List[dict]) -> List[dict]:
+        """
+        Writes `batch` in one transaction, each condominium's rows in their own
+        SAVEPOINT. Returns the rows of the condominiums that failed.
+        """
+        by_condo = {}
+        for row in batch:
+            by_condo.setdefault(row["condominium_id"], []).append(row)
+
+        failed = []
+        async with database.engine.begin() as conn:
+            for condo_id, rows in by_condo.items():
+                try:
+                    async with conn.begin_nested():
+                        await self._insert(conn, condo_id, rows)
+                except Exception as e:
+                    logger.warning(f"Audit rows of condominium {condo_id} failed ({len(rows)} records): {e}")
+                    failed.extend(rows)
+        return failed
+
+    async def _write_rows(self, rows: List[dict]) -> None:
+        """
+        Last resort: one SAVEPOINT per row, so only the bad rows are lost.
+        """
+        written = 0
+        try:
+            async with database.engine.begin() as conn:
+                for row in rows:
+                    try:
+                        async with conn.begin_nested():
+                            await self._insert(conn, row["condominium_id"], [row])
+                        written += 1
+                    except Exception as e:
+                        self.failed += 1
+                        logger.error(
+                            f"Audit writer dropped record {row['id']} "
+                            f"({row['action']} {row['table_name']} {row['record_id']}): {e}"
+                        )
+        except Exception as e:
+            self.failed += written
+            logger.error(f"Audit writer dropped {written} records: {e}")
+            return
+        self.written += written
+
+    async def _insert(self, conn, condo_id, rows: List[dict]) -> None:
+        # audit_logs RLS: admin of the row's condominium
+        await conn.execute(database.SET_SECURITY_CONTEXT_SQL, {
+            "uid": "", "cid": str(condo_id or ""), "role": "ADMIN",
+            "key": settings.APP_ENCRYPTION_KEY, "ip": ""
+        })
+        if settings.AUDIT_WRITE_METHOD == "copy":
+            raw = (await conn.get_raw_connection()).driver_connection
+            await raw.copy_records_to_table(
+                "audit_logs", columns=COLUMNS, records=[_copy_record(r) for r in rows]
+            )
+        else:
+            await conn.execute(insert(AuditLog.__table__), rows)
+
+    def snapshot(self) -> dict:
+        return {
+            "mode": settings.AUDIT_MODE,
+            "queue": {
+                "depth": self._queue.qsize() if self._queue else 0,
+                "max": settings.AUDIT_QUEUE_SIZE,
+            },
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "failed": self.failed,
+            "fallbacks": self.fallbacks,
+            "flush": self.flush.as_dict(),
+        }
+
+    async def shutdown(self, timeout: float = 10) -> None:
+        """
+        Flushes what is queued, then stops the worker.
+        """
+        if not self._worker:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Audit writer shutdown with {self._queue.qsize()} records pending")
+        self._worker.cancel()
+        self._worker = None
+
+def _copy_record(row: dict) -> tuple:
+    # COPY goes through asyncpg's codecs: JSONB as text
+    record = dict(row)
+    for key in ("old_data", "new_data"):
+        if record[key] is not None:
+            record[key] = json.dumps(record[key], default=str)
+    return tuple(record[c] for c in COLUMNS)
+
+audit_writer = AuditWriter()
+
+@event.listens_for(database.ContextSession, "after_commit")
+def _queue_committed(session):
+    rows = session.info.pop(PENDING_KEY, None)
+    if rows:
+        audit_writer.put(rows)
+
+@event.listens_for(database.ContextSession, "after_soft_rollback")
+def _discard_pending(session, previous_transaction):
+    session.info.pop(PENDING_KEY, None)
@@ -0,0 +1,100 @@
+import asyncio
+import logging
+import os
+from typing import Set
+from uuid import UUID
+from sqlalchemy import update
+from app.core.config import settings
+from app.core import database
+from app.documents.models import Document
+from app.documents.storage import get_storage
+from app.services.optimizer import Slot
+from app.utils.file_optimizer import optimize_file
+
+logger = logging.getLogger(__name__)
+
+class DocumentJobs:
+    """
+    Post-upload optimization of documents (PDF recompression, image resize).
+    The upload request only stores the file, creates the row and reserves an
+    optimizer slot; the CPU-bound work runs in the optimizer's process pool
+    (app/services/optimizer.py), off the event loop and the GIL. When a job
+    finishes the optimized contents are stored under their own key and the
+    row is switched to it (file_path / file_size / mime_type) in one UPDATE,
+    then the original is released.
+    """
+    def __init__(self):
+        self._tasks: Set[asyncio.Task] = set()
+
+    def submit(self, slot: Slot, doc_id: UUID, condo_id: UUID, user_id: UUID, path: str, content_type: str) -> None:
+        task = asyncio.get_running_loop().create_task(
+            self._optimize(slot, doc_id, condo_id, user_id, path, content_type)
+        )
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _optimize(self, slot: Slot, doc_id: UUID, condo_id: UUID, user_id: UUID, key: str, content_type: str) -> None:
+        storage = get_storage()
+        out_path = storage.staging_path()
+        try:
+            async with storage.local_copy(key) as path:
+                result = await slot.run(optimize_file, path, content_type, out_path)
+            if result is None:
+                return
+            _, mime_type, size = result
+            # New contents, new key: the original object is never modified
+            new_key = await storage.put(out_path, str(doc_id))
+        except Exception as e:
+            logger.error(f"Optimization of document {doc_id} failed: {e}")
+            return
+        finally:
+            slot.release()
+            await asyncio.to_thread(_remove, out_path)
+
+        try:
+            updated = await self._update_row(doc_id, condo_id, user_id, new_key, mime_type, size)
+        except Exception as e:
+            logger.error(f"Could not update document {doc_id} after optimization: {e}")
+            updated = False
+
+        # Swap done (or abandoned): drop the reference the row no longer holds.
+        # When the document was deleted meanwhile, its original was released by the delete.
+        if new_key == key:
+            return
+        if updated:
+            await storage.release(key, str(doc_id))
+        else:
+            await storage.release(new_key, str(doc_id))
+
+    async def _update_row(self, doc_id, condo_id, user_id, path: str, mime_type: str, size: int) -> bool:
+        async with database.AsyncSessionLocal() as session:
+            # documents RLS: admin of the document's condominium
+            session.info[database.SECURITY_CONTEXT_KEY] = {
+                "uid": str(user_id or ""), "cid": str(condo_id), "role": "ADMIN",
+                "key": settings.APP_ENCRYPTION_KEY, "ip": None
+            }
+            result = await session.execute(
+                update(Document).where(Document.id == doc_id)
+                .values(file_path=path, mime_type=mime_type, file_size=size)
+            )
+            await session.commit()
+            return result.rowcount > 0
+
+    async def shutdown(self, timeout: float = 30) -> None:
+        """
+        Lets running jobs finish (call before stopping the optimizer).
+        """
+        if self._tasks:
+            done, pending = await asyncio.wait(set(self._tasks), timeout=timeout)
+            if pending:
+                logger.warning(f"Document jobs shutdown with {len(pending)} optimizations pending")
+                for task in pending:
+                    task.cancel()
+
+def _remove(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+document_jobs = DocumentJobs()
@@ -0,0 +1,232 @@
+import logging
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from uuid import UUID
+from sqlalchemy import any_, bindparam, select, text
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.units.models import Unit
+from app.users.models import User
+from app.reservations.models import CommonArea
+from app.utils.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Reference resolution for JSON payloads (audit old/new data, lists...).
+# A rule maps a payload field to a resolver; all ids of a response are collected
+# in one pass and each resolver loads its ids with a single query.
+
+def uuid_array(name: str):
+    # Native uuid[] parameter: `id = ANY($1)` keeps the primary key index usable
+    return bindparam(name, type_=ARRAY(PG_UUID(as_uuid=True)))
+
+def unit_label(block: Optional[str], number: Optional[str], prefix: str = "") -> Optional[str]:
+    if not number:
+        return None
+    return f"{prefix}{block} - {number}" if block else f"{number}"
+
+class Resolver(ABC):
+    """
+    Batch loader for one kind of reference.
+    `cache_ttl` enables a per-condominium TTL cache shared across requests
+    (only for slow-changing entities).
+    """
+    name: str = ""
+    cache_ttl: Optional[float] = None
+    cache_size: int = 5000
+
+    def __init__(self):
+        self._cache = TTLCache(self.cache_size, self.cache_ttl) if self.cache_ttl else None
+
+    def parse_key(self, value: Any) -> Optional[Any]:
+        try:
+            return value if isinstance(value, UUID) else UUID(str(value))
+        except (ValueError, TypeError):
+            return None
+
+    @abstractmethod
+    async def fetch(self, db: AsyncSession, condo_id: UUID, keys: List[Any]) -> Dict[Any, Any]:
+        ...
+
+    async def load(self, db: AsyncSession, condo_id: UUID, keys: Iterable[Any]) -> Dict[Any, Any]:
+        found, missing = {}, []
+        for key in keys:
+            hit = self._cache.get((condo_id, key)) if self._cache else None
+            if hit is not None:
+                found[key] = hit
+            else:
+                missing.append(key)
+        if missing:
+            loaded = await self.fetch(db, condo_id, missing)
+            if self._cache:
+                for key, value in loaded.items():
+                    self._cache.set((condo_id, key), value)
+            found.update(loaded)
+        return found
+
+    def invalidate(self, condo_id: UUID, key: Any = None) -> None:
+        """
+        Drops the cached value of `key`, or every cached value of the
+        condominium when `key` is None. Call after changing a cached entity.
+        """
+        if not self._cache:
+            return
+        condo_id = UUID(str(condo_id))
+        if key is None:
+            self._cache.pop_where(lambda k: k[0] == condo_id)
+        else:
+            self._cache.pop((condo_id, self.parse_key(key)))
+
+class UnitResolver(Resolver):
+    name = "units"
+    cache_ttl = 300
+
+    async def fetch(self, db, condo_id, keys):
+        stmt = select(Unit.id, Unit.block, Unit.number).where(
+            Unit.condominium_id == condo_id, Unit.id == any_(uuid_array("ids"))
+        )
+        rows = await db.execute(stmt, {"ids": keys})
+        return {r.id: unit_label(r.block, r.number, prefix="Bloco ") for r in rows}
+
+class CommonAreaResolver(Resolver):
+    name = "common_areas"
+    cache_ttl = 300
+
+    async def fetch(self, db, condo_id, keys):
+        stmt = select(CommonArea.id, CommonArea.name).where(
+            CommonArea.condominium_id == condo_id, CommonArea.id == any_(uuid_array("ids"))
+        )
+        rows = await db.execute(stmt, {"ids": keys})
+        return {r.id: r.name for r in rows}
+
+class UserResolver(Resolver):
+    name = "users"
+
+    async def fetch(self, db, condo_id, keys):
+        stmt = select(User.id, User.name, Unit.block, Unit.number).outerjoin(
+            Unit, User.unit_id == Unit.id
+        ).where(User.condominium_id == condo_id, User.id == any_(uuid_array("ids")))
+        rows = await db.execute(stmt, {"ids": keys})
+        return {r.id: {"name": r.name, "unit": unit_label(r.block, r.number)} for r in rows}
+
+class DecryptResolver(Resolver):
+    """
+    Sensitive values: "ENC(...)" is unwrapped locally, pgcrypto values
+    (hex bytea) are decrypted in one query with the request's user key.
+    Never cached.
+    """
+    name = "decrypt"
+
+    def parse_key(self, value):
+        if not isinstance(value, str):
+            return None
+        if value.startswith("ENC(") or value.startswith("\\x") or value.startswith("x"):
+            return value
+        return None
+
+    async def fetch(self, db, condo_id, keys):
+        result = {k: k[4:-1] for k in keys if k.startswith("ENC(")}
+        encrypted = [k for k in keys if k not in result]
+        if encrypted:
+            stmt = text("""
+                SELECT val, pgp_sym_decrypt(val::bytea, current_setting('app.current_user_key'))
+                FROM unnest(CAST(:vals AS text[])) AS val
+            """)
+            try:
+                # SAVEPOINT: a failed decrypt (wrong key, bad value) must not abort
+                # the transaction used by the other resolvers
+                async with db.begin_nested():
+                    for original, decrypted in await db.execute(stmt, {"vals": encrypted}):
+                        result[original] = decrypted
+            except Exception as e:
+                logger.error(f"DB decryption error in enrichment: {e}")
+        return result
+
+RESOLVERS: Dict[str, Resolver] = {
+    r.name: r for r in (UnitResolver(), CommonAreaResolver(), UserResolver(), DecryptResolver())
+}
+
+@dataclass(frozen=True)
+class Rule:
+    """
+    `field` of the payload is resolved by `resolver`; `inject(data, value)` writes the result.
+    """
+    field: str
+    resolver: str
+    inject: Callable[[dict, Any], None]
+
+def set_key(target: str) -> Callable[[dict, Any], None]:
+    def inject(data, value):
+        data[target] = value
+    return inject
+
+def set_user(name_key: str, unit_key: str) -> Callable[[dict, Any], None]:
+    def inject(data, value):
+        data[name_key] = value["name"]
+        if value["unit"]:
+            data[unit_key] = value["unit"]
+    return inject
+
+def decrypted(field: str) -> Rule:
+    # email_encrypted -> email
+    return Rule(field, "decrypt", set_key(field.replace("_encrypted", "")))
+
+class Enricher:
+    """
+    Per-request enrichment. Usage:
+        enricher = Enricher(db, condo_id, AUDIT_RULES)
+        await enricher.prepare(payloads)   # one pass + one query per resolver
+        enriched = enricher.apply(payload) # returns a new dict
+    """
+    def __init__(self, db: AsyncSession, condo_id: UUID, rules: List[Rule]):
+        self.db = db
+        self.condo_id = UUID(str(condo_id))
+        self.rules = rules
+        self._resolved: Dict[str, Dict[Any, Any]] = {}
+
+    async def prepare(self, payloads: Iterable[Optional[dict]]) -> None:
+        pending: Dict[str, set] = {}
+        for data in payloads:
+            if not isinstance(data, dict):
+                continue
+            for rule in self.rules:
+                value = data.get(rule.field)
+                if not value:
+                    continue
+                key = RESOLVERS[rule.resolver].parse_key(value)
+                if key is not None:
+                    pending.setdefault(rule.resolver, set()).add(key)
+
+        for name, keys in pending.items():
+            resolved = self._resolved.setdefault(name, {})
+            missing = [k for k in keys if k not in resolved]
+            if missing:
+                resolved.update(await RESOLVERS[name].load(self.db, self.condo_id, missing))
+
+    def apply(self, data: Optional[dict]) -> Optional[dict]:
+        if not isinstance(data, dict):
+            return data
+        result = dict(data)
+        for rule in self.rules:
+            value = data.get(rule.field)
+            if not value:
+                continue
+            key = RESOLVERS[rule.resolver].parse_key(value)
+            resolved = self._resolved.get(rule.resolver, {}).get(key)
+            if resolved is not None:
+                rule.inject(result, resolved)
+        return result
+
+# Audit log payloads (field names follow the audited tables' columns)
+AUDIT_RULES = [
+    decrypted("email_encrypted"),
+    decrypted("phone_encrypted"),
+    decrypted("cpf_encrypted"),
+    decrypted("cnpj_encrypted"),
+    Rule("unit_id", "units", set_key("unidade")),
+    Rule("common_area_id", "common_areas", set_key("area_comum")),
+    Rule("resident_id", "users", set_user("morador_alvo_nome", "morador_alvo_unidade")),
+    Rule("user_id", "users", set_user("solicitante_nome", "solicitante_unidade")),
+    Rule("created_by", "users", set_user("criado_por_nome", "criado_por_unidade")),
+]
@@ -0,0 +1,146 @@
+import asyncio
+import json
+import logging
+from typing import Dict, Optional, Set
+import asyncpg
+from app.core.config import settings
+from app.schemas.token import TokenData
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "condo_events"
+
+# Roles that see every event of the condominium (dashboard pending counts)
+STAFF_ROLES = {'ADMIN', 'SINDICO', 'SUBSINDICO', 'CONSELHO', 'PORTEIRO', 'FINANCEIRO'}
+
+# Sent instead of the missed events when a client fell behind or the listener reconnected
+RESYNC = {"table": "resync"}
+
+class Subscription:
+    """
+    One open stream. Events are kept in a bounded queue; when it overflows the
+    backlog is dropped and the client gets a single "resync" event instead.
+    """
+    def __init__(self, user: TokenData):
+        self.user_id = user.user_id
+        self.condo_id = user.condo_id
+        self.is_staff = user.role in STAFF_ROLES
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=settings.EVENTS_CLIENT_QUEUE_SIZE)
+        self._lagged = False
+
+    def wants(self, event: dict) -> bool:
+        if event.get("table") == "announcements" or self.is_staff:
+            return True
+        # Rows owned by / addressed to someone else stay private
+        return event.get("user_id") == self.user_id
+
+    def push(self, event: dict) -> None:
+        if self._lagged:
+            return
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.resync()
+
+    def resync(self) -> None:
+        self._lagged = True
+        # Wake up a waiting get()
+        if self._queue.empty():
+            self._queue.put_nowait(RESYNC)
+
+    async def get(self) -> dict:
+        event = await self._queue.get()
+        if self._lagged:
+            self._lagged = False
+            while not self._queue.empty():
+                self._queue.get_nowait()
+            return RESYNC
+        return event
+
+class EventBroker:
+    """
+    One LISTEN connection per worker process, shared by every open stream.
+    Notifications from notify_condo_event() (db/init.sql) are routed to the
+    subscriptions of their condominium. The connection is opened with the
+    first subscriber and re-established (with a resync) if it drops.
+    """
+    def __init__(self):
+        self._subscribers: Dict[str, Set[Subscription]] = {}
+        self._conn: Optional[asyncpg.Connection] = None
+        self._supervisor: Optional[asyncio.Task] = None
+
+    def subscribe(self, user: TokenData) -> Subscription:
+        sub = Subscription(user)
+        self._subscribers.setdefault(sub.condo_id, set()).add(sub)
+        if self._supervisor is None or self._supervisor.done():
+            self._supervisor = asyncio.get_running_loop().create_task(self._supervise())
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        subs = self._subscribers.get(sub.condo_id)
+        if subs:
+            subs.discard(sub)
+            if not subs:
+                del self._subscribers[sub.condo_id]
+
+    def _dsn(self) -> str:
+        url = settings.EVENTS_DATABASE_URL or settings.get_database_url()
+        # asyncpg takes a plain libpq URL
+        return url.replace("postgresql+asyncpg://", "postgresql://", 1)
+
+    async def _supervise(self) -> None:
+        delay = 1
+        while True:
+            lost = asyncio.Event()
+            try:
+                self._conn = await asyncpg.connect(self._dsn())
+                self._conn.add_termination_listener(lambda conn: lost.set())
+                await self._conn.add_listener(CHANNEL, self._on_notify)
+                delay = 1
+                # Changes made while not listening (disconnected, or before the first
+                # LISTEN) are unknown to the clients: they refetch once
+                self._broadcast_resync()
+                await lost.wait()
+                logger.warning("Event listener connection lost, reconnecting")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Event listener failed: {e}")
+            finally:
+                await self._close()
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 30)
+
+    def _on_notify(self, connection, pid, channel, payload: str) -> None:
+        try:
+            event = json.loads(payload)
+        except ValueError:
+            return
+        for sub in self._subscribers.get(event.get("condo"), ()):
+            if sub.wants(event):
+                sub.push(event)
+
+    def _broadcast_resync(self) -> None:
+        for subs in self._subscribers.values():
+            for sub in subs:
+                sub.resync()
+
+    async def _close(self) -> None:
+        conn, self._conn = self._conn, None
+        if conn and not conn.is_closed():
+            try:
+                await conn.close(timeout=2)
+            except Exception:
+                conn.terminate()
+
+    async def shutdown(self) -> None:
+        if self._supervisor:
+            self._supervisor.cancel()
+            try:
+                await self._supervisor
+            except asyncio.CancelledError:
+                pass
+            self._supervisor = None
+        await self._close()
+
+events = EventBroker()
@@ -0,0 +1,232 @@
+import asyncio
+import bisect
+import csv
+import ipaddress
+import json
+import logging
+import urllib.request
+from abc import ABC, abstractmethod
+from typing import Optional
+from uuid import UUID
+from sqlalchemy import update
+from app.core.config import settings
+from app.utils.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+LOCALHOST = "Localhost"
+UNKNOWN = "Desconhecido"
+
+# Failed lookups are retried sooner than successful ones
+NEGATIVE_TTL = 300
+
+class GeoIPResolver(ABC):
+    """
+    Backend interface: returns a display location ("City, Region - Country") or None.
+    """
+    @abstractmethod
+    async def resolve(self, ip: str) -> Optional[str]:
+        ...
+
+class NullResolver(GeoIPResolver):
+    async def resolve(self, ip: str) -> Optional[str]:
+        return None
+
+class IpApiResolver(GeoIPResolver):
+    """
+    Online lookup through ip-api.com (free tier: HTTP only, ~45 req/min).
+    """
+    URL = "http://ip-api.com/json/{ip}?fields=status,city,regionName,country"
+
+    def __init__(self, timeout: float):
+        self.timeout = timeout
+
+    def _fetch(self, ip: str) -> Optional[str]:
+        with urllib.request.urlopen(self.URL.format(ip=ip), timeout=self.timeout) as response:
+            data = json.loads(response.read())
+        if data.get('status') == 'success':
+            return f"{data['city']}, {data['regionName']} - {data['country']}"
+        return None
+
+    async def resolve(self, ip: str) -> Optional[str]:
+        return await asyncio.to_thread(self._fetch, ip)
+
+class CsvResolver(GeoIPResolver):
+    """
+    Offline lookup from a CSV of networks: `network,location`
+    (e.g. `177.0.0.0/12,São Paulo, SP - Brazil`). Networks must not overlap,
+    as in the GeoLite2 / DB-IP CSV exports. Ranges are loaded once and
+    searched with bisect.
+    """
+    def __init__(self, path: str):
+        ranges = {4: [], 6: []}
+        with open(path, newline='', encoding='utf-8') as f:
+            for row in csv.reader(f):
+                if not row or row[0].startswith('#'):
+                    continue
+                try:
+                    network = ipaddress.ip_network(row[0].strip(), strict=False)
+                except ValueError:
+                    continue  # header or malformed line
+                ranges[network.version].append((
+                    int(network.network_address), int(network.broadcast_address), ','.join(row[1:]).strip()
+                ))
+        self._ranges = {version: sorted(items) for version, items in ranges.items()}
+        self._starts = {version: [r[0] for r in items] for version, items in self._ranges.items()}
+
+    async def resolve(self, ip: str) -> Optional[str]:
+        address = ipaddress.ip_address(ip)
+        value = int(address)
+        i = bisect.bisect_right(self._starts[address.version], value) - 1
+        if i < 0:
+            return None
+        start, end, location = self._ranges[address.version][i]
+        return location if start <= value <= end and location else None
+
+class MMDBResolver(GeoIPResolver):
+    """
+    Offline lookup from a MaxMind/DB-IP .mmdb city database.
+    Requires the optional `maxminddb` package.
+    """
+    def __init__(self, path: str):
+        try:
+            import maxminddb
+        except ImportError:
+            raise RuntimeError("GEOIP_BACKEND=mmdb requires the 'maxminddb' package")
+        self._reader = maxminddb.open_database(path)
+
+    async def resolve(self, ip: str) -> Optional[str]:
+        record = self._reader.get(ip)
+        if not record:
+            return None
+
+        def name(entry):
+            names = (entry or {}).get('names', {})
+            return names.get('pt-BR') or names.get('en')
+
+        city = name(record.get('city'))
+        region = name((record.get('subdivisions') or [None])[0])
+        country = name(record.get('country'))
+        place = ", ".join(p for p in (city, region) if p)
+        return " - ".join(p for p in (place, country) if p) or None
+
+def build_resolver() -> GeoIPResolver:
+    backend = settings.GEOIP_BACKEND.lower()
+    if backend == 'ip-api':
+        return IpApiResolver(settings.GEOIP_TIMEOUT)
+    if backend == 'csv':
+        return CsvResolver(settings.GEOIP_DB_PATH)
+    if backend == 'mmdb':
+        return MMDBResolver(settings.GEOIP_DB_PATH)
+    return NullResolver()
+
+def _local_label(ip: str) -> Optional[str]:
+    """
+    Addresses that never need a lookup.
+    """
+    if not ip or ip == 'localhost':
+        return LOCALHOST
+    try:
+        address = ipaddress.ip_address(ip)
+    except ValueError:
+        return UNKNOWN
+    if address.is_loopback:
+        return LOCALHOST
+    if address.is_private or address.is_link_local:
+        return "Rede local"
+    return None
+
+class GeoIPService:
+    """
+    Resolves AccessLog.location off the request path.
+    Login calls `location_or_enqueue`: cache hits are returned immediately,
+    misses are queued and a single background worker fills the row later.
+    """
+    def __init__(self, resolver: Optional[GeoIPResolver] = None):
+        self._resolver = resolver
+        self.cache = TTLCache(settings.GEOIP_CACHE_SIZE, settings.GEOIP_CACHE_TTL)
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    @property
+    def resolver(self) -> GeoIPResolver:
+        # Built lazily so an offline database is only opened when first needed
+        if self._resolver is None:
+            self._resolver = build_resolver()
+        return self._resolver
+
+    def cached(self, ip: str) -> Optional[str]:
+        return _local_label(ip) or self.cache.get(ip)
+
+    async def lookup(self, ip: str) -> str:
+        location = self.cached(ip)
+        if location:
+            return location
+        try:
+            location = await self.resolver.resolve(ip)
+        except Exception as e:
+            logger.warning(f"GeoIP lookup failed for {ip}: {e}")
+            location = None
+        self.cache.set(ip, location or UNKNOWN, None if location else NEGATIVE_TTL)
+        return location or UNKNOWN
+
+    def location_or_enqueue(self, log_id: UUID, ip: Optional[str], condo_id: UUID, user_id: UUID) -> Optional[str]:
+        """
+        Returns the location when known without I/O; otherwise schedules the lookup
+        for AccessLog `log_id` and returns None. Never blocks.
+        """
+        location = self.cached(ip)
+        if location:
+            return location
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait((log_id, ip, condo_id, user_id))
+        except asyncio.QueueFull:
+            logger.warning("GeoIP queue full, dropping lookup")
+        return None
+
+    def _ensure_worker(self) -> None:
+        if self._worker is None or self._worker.done():
+            self._queue = self._queue or asyncio.Queue(maxsize=settings.GEOIP_QUEUE_SIZE)
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            log_id, ip, condo_id, user_id = await self._queue.get()
+            try:
+                location = await self.lookup(ip)
+                await self._store(log_id, location, condo_id, user_id)
+            except Exception as e:
+                logger.error(f"GeoIP update failed for access log {log_id}: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def _store(self, log_id: UUID, location: str, condo_id: UUID, user_id: UUID) -> None:
+        from app.core import database
+        from app.users.models import AccessLog
+
+        async with database.AsyncSessionLocal() as session:
+            # access_logs RLS is scoped to the owner of the row
+            session.info[database.SECURITY_CONTEXT_KEY] = {
+                "uid": str(user_id), "cid": str(condo_id), "role": "",
+                "key": settings.APP_ENCRYPTION_KEY, "ip": None
+            }
+            await session.execute(
+                update(AccessLog).where(AccessLog.id == log_id).values(location=location[:100])
+            )
+            await session.commit()
+
+    async def shutdown(self, timeout: float = 5) -> None:
+        """
+        Gives pending lookups a chance to finish, then stops the worker.
+        """
+        if not self._worker:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"GeoIP shutdown with {self._queue.qsize()} lookups pending")
+        self._worker.cancel()
+        self._worker = None
+
+geoip = GeoIPService()
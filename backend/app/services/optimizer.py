@@ -0,0 +1,153 @@
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+from fastapi import HTTPException
+from app.core.config import settings
+from app.core.pool_metrics import DurationStat
+from app.utils.file_optimizer import init_worker, run_job, JobTimeout
+
+logger = logging.getLogger(__name__)
+
+# Extra time the parent waits past OPTIMIZER_TIMEOUT before giving up on a worker
+# that did not honour its alarm (stuck in C code) and recycling the pool
+GRACE = 5
+
+class Slot:
+    """
+    A reserved place in the optimizer queue. Reserved while the request is still
+    running (so it can get the 503), used later by the background job.
+    """
+    def __init__(self, service: "OptimizerService"):
+        self._service = service
+        self._held = True
+
+    async def run(self, fn, *args):
+        try:
+            return await self._service._execute(fn, *args)
+        finally:
+            self.release()
+
+    def release(self) -> None:
+        if self._held:
+            self._held = False
+            self._service._pending -= 1
+
+class OptimizerService:
+    """
+    CPU-bound optimization (pypdf, Pillow) in a dedicated process pool of
+    OPTIMIZER_WORKERS processes: no GIL contention with the event loop, and a
+    bounded number of jobs. Each worker has an address-space cap
+    (OPTIMIZER_MEMORY_LIMIT_MB) and every job an alarm (OPTIMIZER_TIMEOUT).
+    When OPTIMIZER_QUEUE_LIMIT jobs are queued or running, reserve() fails fast
+    with 503 (try_reserve() returns None) instead of piling up work.
+    """
+    def __init__(self):
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._running = asyncio.Semaphore(settings.OPTIMIZER_WORKERS)
+        self._pending = 0
+        self.duration = DurationStat()
+        self.completed = 0
+        self.failed = 0
+        self.timeouts = 0
+        self.rejected = 0
+
+    def try_reserve(self) -> Optional[Slot]:
+        """
+        Like reserve(), but returns None when the queue is full (for callers
+        that can do without the optimization).
+        """
+        if self._pending >= settings.OPTIMIZER_QUEUE_LIMIT:
+            self.rejected += 1
+            return None
+        self._pending += 1
+        return Slot(self)
+
+    def reserve(self) -> Slot:
+        slot = self.try_reserve()
+        if slot is None:
+            raise HTTPException(
+                status_code=503,
+                detail="Servidor ocupado, tente novamente em instantes.",
+                headers={"Retry-After": "5"}
+            )
+        return slot
+
+    async def run(self, fn, *args):
+        """
+        Runs `fn(*args)` in a worker process. `fn` and its arguments cross the
+        process boundary: pass paths, not file contents.
+        """
+        return await self.reserve().run(fn, *args)
+
+    def _ensure_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # spawn: forking a process that runs an event loop and DB pool is unsafe
+            self._pool = ProcessPoolExecutor(
+                max_workers=settings.OPTIMIZER_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=init_worker,
+                initargs=(settings.OPTIMIZER_MEMORY_LIMIT_MB,)
+            )
+        return self._pool
+
+    async def _execute(self, fn, *args):
+        # Jobs wait here rather than inside the pool, so a job handed to the pool
+        # starts right away and its deadline measures only its own run
+        async with self._running:
+            return await self._submit(fn, *args)
+
+    async def _submit(self, fn, *args):
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        pool = self._ensure_pool()
+        future = loop.run_in_executor(pool, run_job, settings.OPTIMIZER_TIMEOUT, fn, *args)
+        try:
+            result = await asyncio.wait_for(future, settings.OPTIMIZER_TIMEOUT + GRACE)
+        except (JobTimeout, asyncio.TimeoutError) as e:
+            self.timeouts += 1
+            if isinstance(e, asyncio.TimeoutError):
+                self._recycle(pool)
+            raise TimeoutError(f"optimization exceeded {settings.OPTIMIZER_TIMEOUT}s")
+        except BrokenProcessPool:
+            # A worker died (e.g. killed by the OOM killer): start over with a fresh pool
+            self.failed += 1
+            self._recycle(pool)
+            raise
+        except Exception:
+            self.failed += 1
+            raise
+        self.completed += 1
+        self.duration.add((loop.time() - start) * 1000)
+        return result
+
+    def _recycle(self, pool: ProcessPoolExecutor) -> None:
+        if self._pool is not pool:
+            return
+        self._pool = None
+        logger.warning("Recycling optimizer process pool")
+        # shutdown() does not stop running jobs: terminate the workers explicitly
+        for process in list((pool._processes or {}).values()):
+            process.terminate()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def snapshot(self) -> dict:
+        return {
+            "workers": settings.OPTIMIZER_WORKERS,
+            "pending": self._pending,
+            "queue_limit": settings.OPTIMIZER_QUEUE_LIMIT,
+            "completed": self.completed,
+            "failed": self.failed,
+            "timeouts": self.timeouts,
+            "rejected": self.rejected,
+            "duration": self.duration.as_dict(),
+        }
+
+    async def shutdown(self) -> None:
+        if self._pool:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+optimizer = OptimizerService()
@@ -5,15 +5,13 @@ from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, delete, update
 from sqlalchemy.orm import selectinload
-import asyncio
-import urllib.request
-import json
 import hashlib
 
 from app.core import security, deps, config
 from app.users.models import User, AccessLog, RefreshToken
 from app.units.models import Unit
 from app.users.schemas import UserRead, UserRegister
+from app.services.geoip import geoip
 
 router = APIRouter()
 
@@ -30,7 +28,10 @@ async def login_access_token(
     result = await db.execute(stmt)
     user = result.scalars().first()
     
-    if not user or not security.verify_password(form_data.password, user.password_hash):
+    valid, new_hash = (False, None)
+    if user:
+        valid, new_hash = await security.verify_and_update_password(form_data.password, user.password_hash)
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -40,6 +41,10 @@ async def login_access_token(
     if user.status != 'ATIVO':
          raise HTTPException(status_code=400, detail="User account is inactive or pending approval.")
 
+    # Stored hash uses an old bcrypt cost: replace it (committed with the login below)
+    if new_hash:
+        user.password_hash = new_hash
+
     # 1. Create Access Token (Short-lived)
     access_token_expires = timedelta(minutes=config.settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = security.create_access_token(
@@ -72,37 +77,21 @@ async def login_access_token(
     )
     db.add(db_refresh)
     
-    # 3. GeoIP & Access Log (Best Effort)
-    try:
-        # Simple Location Logic
-        async def get_location_from_ip(ip: str):
-            if not ip or ip in ('127.0.0.1', 'localhost', '::1'):
-                return "Localhost"
-            try:
-                # Run blocking call in thread
-                url = f"http://ip-api.com/json/{ip}?fields=status,city,regionName,country"
-                response = await asyncio.to_thread(urllib.request.urlopen, url, timeout=3)
-                data = json.loads(response.read())
-                if data.get('status') == 'success':
-                    return f"{data['city']}, {data['regionName']} - {data['country']}"
-            except Exception as e:
-                print(f"GeoIP Error: {e}")
-            return "Desconhecido"
-
-        location = await get_location_from_ip(client_ip)
-        
-        log_entry = AccessLog(
-            condominium_id=user.condominium_id,
-            user_id=user.id,
-            ip_address=client_ip,
-            user_agent=user_agent,
-            location=location
-        )
-        db.add(log_entry)
-    except:
-        pass
+    # 3. Access Log. Location comes from the GeoIP cache when known; otherwise it is
+    # resolved in the background (app.services.geoip) so login never waits on it.
+    log_entry = AccessLog(
+        condominium_id=user.condominium_id,
+        user_id=user.id,
+        ip_address=client_ip,
+        user_agent=user_agent,
+        location=geoip.cached(client_ip)
+    )
+    db.add(log_entry)
 
     await db.commit()
+
+    if not log_entry.location:
+        geoip.location_or_enqueue(log_entry.id, client_ip, user.condominium_id, user.id)
     
     # 4. Set Cookies
     # Access Token: 15 min
@@ -355,7 +344,7 @@ async def register_public(
         
     from sqlalchemy import text
     
-    password_hash = security.get_password_hash(user_in.password)
+    password_hash = await security.get_password_hash_async(user_in.password)
     phone_clean = ''.join(filter(str.isdigit, user_in.phone))
     phone_hash = hashlib.sha256(phone_clean.encode('utf-8')).hexdigest()
     
@@ -66,7 +66,7 @@ class UserService:
             name=user_in.name,
             email_encrypted=f"ENC({user_in.email})", 
             email_hash=email_hash,
-            password_hash=security.get_password_hash(user_in.password if user_in.password else "Mudar@123"),
+            password_hash=await security.get_password_hash_async(user_in.password if user_in.password else "Mudar@123"),
             role=user_in.role,
             profile_type=user_in.profile_type,
             unit_id=user_in.unit_id,
@@ -203,9 +203,9 @@ class UserService:
                  if not user_in.current_password:
                       raise HTTPException(status_code=400, detail="Senha atual obrigatória.")
                  
-                 if not security.verify_password(user_in.current_password, db_user.password_hash):
+                 if not await security.verify_password_async(user_in.current_password, db_user.password_hash):
                       raise HTTPException(status_code=401, detail="Senha atual incorreta.")
-            db_user.password_hash = security.get_password_hash(user_in.password)
+            db_user.password_hash = await security.get_password_hash_async(user_in.password)
 
         await self.db.commit()
         updated_user = await self.repo.get_by_id(user_id, load_unit=True)
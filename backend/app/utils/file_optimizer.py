@@ -1,4 +1,7 @@
 import io
+import resource
+import signal
+from typing import Optional
 from pypdf import PdfReader, PdfWriter
 from PIL import Image
 
@@ -91,3 +94,58 @@ def optimize_image(file_bytes: bytes, max_width: int = 2048, quality: int = 80)
     except Exception as e:
         print(f"Falha na otimização da imagem: {e}")
         return file_bytes, "image/jpeg"
+
+def optimize_file(path: str, content_type: str, out_path: Optional[str] = None) -> Optional[tuple[str, str, int]]:
+    """
+    Versão baseada em arquivo, executada nos processos de otimização (só caminhos
+    atravessam a fronteira entre processos, nunca o conteúdo).
+    Grava o resultado em `out_path` (padrão `<path>.opt`) e retorna
+    (caminho_do_resultado, mime_type, tamanho), ou None quando não houve ganho de espaço.
+    """
+    with open(path, "rb") as f:
+        content = f.read()
+
+    if content_type == "application/pdf":
+        optimized, mime_type = optimize_pdf(content), content_type
+    elif content_type in ("image/jpeg", "image/png"):
+        optimized, mime_type = optimize_image(content)
+    else:
+        return None
+
+    if len(optimized) >= len(content):
+        return None
+
+    out_path = out_path or f"{path}.opt"
+    with open(out_path, "wb") as f:
+        f.write(optimized)
+    return out_path, mime_type, len(optimized)
+
+# Processos de otimização (app/services/optimizer.py)
+
+class JobTimeout(BaseException):
+    """
+    BaseException: não é engolida pelos `except Exception` de optimize_pdf/optimize_image.
+    """
+
+def _on_alarm(signum, frame):
+    raise JobTimeout()
+
+def init_worker(memory_limit_mb: int) -> None:
+    """
+    Inicializador dos processos: limita o espaço de endereçamento, de modo que um
+    arquivo patológico gere MemoryError no processo em vez de consumir a máquina.
+    """
+    if memory_limit_mb > 0:
+        limit = memory_limit_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    signal.signal(signal.SIGALRM, _on_alarm)
+
+def run_job(timeout: float, fn, *args):
+    """
+    Executa `fn` com um alarme de `timeout` segundos (JobTimeout ao estourar).
+    """
+    signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        return fn(*args)
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
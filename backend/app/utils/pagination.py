@@ -0,0 +1,43 @@
+import base64
+from datetime import date, datetime
+from typing import Optional, Tuple, Union
+from uuid import UUID
+from fastapi import HTTPException
+from sqlalchemy import Date, DateTime, and_, literal, or_
+
+# Header com o cursor da próxima página (vazio/ausente = última página)
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+SortValue = Union[date, datetime]
+
+def encode_cursor(sort_value: SortValue, id: UUID) -> str:
+    """
+    Cursor opaco para paginação keyset em (coluna de ordenação, id).
+    """
+    raw = f"{sort_value.isoformat()}|{id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[SortValue, UUID]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        value, id = base64.urlsafe_b64decode(padded.encode()).decode().split("|", 1)
+        sort_value = date.fromisoformat(value) if len(value) == 10 else datetime.fromisoformat(value)
+        return sort_value, UUID(id)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+
+def keyset_before(sort_column, id_column, cursor: Optional[str]) -> list:
+    """
+    Filtro da próxima página para ORDER BY sort_column DESC, id DESC.
+    O termo redundante `sort_column <= valor` mantém o predicado indexável
+    por um índice (condominium_id, sort_column).
+    """
+    if not cursor:
+        return []
+    sort_value, last_id = decode_cursor(cursor)
+    bound_type = DateTime(timezone=True) if isinstance(sort_value, datetime) else Date()
+    value = literal(sort_value, bound_type)
+    return [
+        sort_column <= value,
+        or_(sort_column < value, and_(sort_column == value, id_column < last_id)),
+    ]
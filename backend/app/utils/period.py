@@ -0,0 +1,60 @@
+from datetime import date, datetime
+from typing import List, Optional, Tuple, Union
+from zoneinfo import ZoneInfo
+from sqlalchemy import Date, DateTime, extract, func, literal
+
+# Fuso padrão do condomínio para agrupamentos por mês
+DEFAULT_TZ = 'America/Sao_Paulo'
+
+Bound = Union[date, datetime]
+
+def add_months(year: int, month: int, months: int) -> Tuple[int, int]:
+    """
+    Soma (ou subtrai) meses a um par (ano, mês).
+    """
+    index = year * 12 + (month - 1) + months
+    return index // 12, index % 12 + 1
+
+def month_start(year: int, month: int, tz: Optional[str] = None) -> Bound:
+    """
+    Primeiro instante do mês. Com `tz`, meia-noite local (datetime com fuso);
+    sem `tz`, a data pura (para colunas DATE).
+    """
+    if tz:
+        return datetime(year, month, 1, tzinfo=ZoneInfo(tz))
+    return date(year, month, 1)
+
+def month_range(month: int, year: int, tz: Optional[str] = None) -> Tuple[Bound, Bound]:
+    """
+    Intervalo semiaberto [início, fim) do mês.
+    """
+    return month_start(year, month, tz), month_start(*add_months(year, month, 1), tz)
+
+def year_range(year: int, tz: Optional[str] = None) -> Tuple[Bound, Bound]:
+    """
+    Intervalo semiaberto [início, fim) do ano.
+    """
+    return month_start(year, 1, tz), month_start(year + 1, 1, tz)
+
+def in_range(column, start: Bound, end: Bound) -> list:
+    """
+    Filtro `column >= start AND column < end`.
+    A coluna fica "nua" na comparação, então o índice (condominium_id, data) é usado
+    (ao contrário de extract(...) / timezone(...) aplicados sobre a coluna).
+    """
+    bound_type = DateTime(timezone=True) if isinstance(start, datetime) else Date()
+    return [column >= literal(start, bound_type), column < literal(end, bound_type)]
+
+def period_filter(column, month: Optional[int] = None, year: Optional[int] = None,
+                  tz: Optional[str] = None) -> List:
+    """
+    Converte filtros de mês/ano em intervalos indexáveis.
+    Apenas o mês (sem ano) não forma um intervalo contínuo: nesse caso usamos extract.
+    """
+    if month and year:
+        return in_range(column, *month_range(month, year, tz))
+    if year:
+        return in_range(column, *year_range(year, tz))
+    if month:
+        return [extract('month', func.timezone(tz, column) if tz else column) == month]
+    return []
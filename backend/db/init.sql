@@ -4,6 +4,7 @@
 -- 1. Extensions
 CREATE EXTENSION IF NOT EXISTS "uuid-ossp";
 CREATE EXTENSION IF NOT EXISTS "pgcrypto";
+CREATE EXTENSION IF NOT EXISTS "btree_gist"; -- UUID equality inside GiST exclusion constraints
 
 -- 2. Tables
 
@@ -127,14 +128,23 @@ CREATE TABLE IF NOT EXISTS reservations (
     status VARCHAR(20) DEFAULT 'PENDENTE' CHECK (status IN ('PENDENTE', 'CONFIRMADO', 'REJEITADO', 'CANCELADO', 'BLOQUEADO')),
     reason TEXT,
     total_price DECIMAL(10, 2) DEFAULT 0,
-    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    -- Half-open [start, end): back-to-back bookings do not conflict
+    period TSTZRANGE GENERATED ALWAYS AS (tstzrange(start_time, end_time, '[)')) STORED,
+    CONSTRAINT reservations_valid_period CHECK (end_time > start_time),
+    -- No two active bookings of the same area may overlap. Enforced by a GiST index
+    -- at insert/update time, so concurrent bookings cannot both succeed.
+    CONSTRAINT reservations_no_overlap EXCLUDE USING gist (common_area_id WITH =, period WITH &&)
+        WHERE (status IN ('PENDENTE', 'CONFIRMADO', 'BLOQUEADO'))
 );
 
 ALTER TABLE reservations ENABLE ROW LEVEL SECURITY;
 
 -- Audit Logs
+-- Partitioned by month on created_at (see create_monthly_partitions below and
+-- scripts/maintain_log_partitions.py for creation/retention/archival)
 CREATE TABLE IF NOT EXISTS audit_logs (
-    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    id UUID NOT NULL DEFAULT uuid_generate_v4(),
     condominium_id UUID NOT NULL REFERENCES condominiums(id),
     actor_id UUID,
     action VARCHAR(10) NOT NULL CHECK (action IN ('INSERT', 'UPDATE', 'DELETE')),
@@ -143,8 +153,16 @@ CREATE TABLE IF NOT EXISTS audit_logs (
     old_data JSONB,
     new_data JSONB,
     ip_address INET,
-    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
-);
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (id, created_at)
+) PARTITION BY RANGE (created_at);
+-- Safety net for rows outside the pre-created months (should stay empty)
+CREATE TABLE IF NOT EXISTS audit_logs_default PARTITION OF audit_logs DEFAULT;
+-- Audit listing: ORDER BY created_at DESC, id DESC per condominium (keyset pagination)
+CREATE INDEX IF NOT EXISTS idx_audit_logs_condo_created ON audit_logs(condominium_id, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_audit_logs_condo_table_created ON audit_logs(condominium_id, table_name, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_audit_logs_condo_actor_created ON audit_logs(condominium_id, actor_id, created_at DESC, id DESC) WHERE actor_id IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_audit_logs_condo_record ON audit_logs(condominium_id, record_id, created_at DESC);
 
 ALTER TABLE audit_logs ENABLE ROW LEVEL SECURITY;
 
@@ -159,8 +177,13 @@ CREATE TABLE IF NOT EXISTS transactions (
     date DATE NOT NULL,
     status VARCHAR(20) DEFAULT 'PAGO' CHECK (status IN ('PAGO', 'PENDENTE')),
     observation TEXT,
+    import_hash VARCHAR(64),
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
+-- Bulk imports (CSV/OFX): the same statement line is never inserted twice
+CREATE UNIQUE INDEX IF NOT EXISTS idx_transactions_import_hash ON transactions(condominium_id, import_hash) WHERE import_hash IS NOT NULL;
+-- Period filters (month/year) are range scans on (condominium_id, date)
+CREATE INDEX IF NOT EXISTS idx_transactions_condo_date ON transactions(condominium_id, date);
 ALTER TABLE transactions ENABLE ROW LEVEL SECURITY;
 
 -- Readings: Water (Individual)
@@ -173,6 +196,7 @@ CREATE TABLE IF NOT EXISTS readings_water (
     value_m3 DECIMAL(10, 3) NOT NULL,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
+CREATE INDEX IF NOT EXISTS idx_readings_water_condo_date ON readings_water(condominium_id, reading_date);
 ALTER TABLE readings_water ENABLE ROW LEVEL SECURITY;
 
 -- Readings: Gas (Collective)
@@ -189,6 +213,7 @@ CREATE TABLE IF NOT EXISTS readings_gas (
     transaction_id UUID REFERENCES transactions(id) ON DELETE CASCADE,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
+CREATE INDEX IF NOT EXISTS idx_readings_gas_condo_date ON readings_gas(condominium_id, purchase_date);
 ALTER TABLE readings_gas ENABLE ROW LEVEL SECURITY;
 
 -- Readings: Electricity (Collective)
@@ -202,6 +227,7 @@ CREATE TABLE IF NOT EXISTS readings_electricity (
     transaction_id UUID REFERENCES transactions(id) ON DELETE CASCADE,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
+CREATE INDEX IF NOT EXISTS idx_readings_electricity_condo_date ON readings_electricity(condominium_id, due_date);
 ALTER TABLE readings_electricity ENABLE ROW LEVEL SECURITY;
 
 -- Refresh Tokens (Auth Security)
@@ -223,23 +249,101 @@ ALTER TABLE refresh_tokens ENABLE ROW LEVEL SECURITY;
 
 -- Access Logs (Login History)
 CREATE TABLE IF NOT EXISTS access_logs (
-    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    id UUID NOT NULL DEFAULT uuid_generate_v4(),
     condominium_id UUID NOT NULL REFERENCES condominiums(id),
     user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
     ip_address INET,
     user_agent TEXT,
     location VARCHAR(100), -- GeoIP placeholder
-    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
-);
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (id, created_at)
+) PARTITION BY RANGE (created_at);
+CREATE TABLE IF NOT EXISTS access_logs_default PARTITION OF access_logs DEFAULT;
+CREATE INDEX IF NOT EXISTS idx_access_logs_condo_created ON access_logs(condominium_id, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_access_logs_user_created ON access_logs(user_id, created_at DESC);
 ALTER TABLE access_logs ENABLE ROW LEVEL SECURITY;
 
+-- Monthly partitions (UTC months) named <table>_yYYYYmMM, from p_from (default: current
+-- month) up to p_months_ahead months ahead. Idempotent; returns how many were created.
+CREATE OR REPLACE FUNCTION create_monthly_partitions(p_table TEXT, p_months_ahead INT DEFAULT 3, p_from DATE DEFAULT NULL)
+RETURNS INTEGER AS $$
+DECLARE
+    m DATE := date_trunc('month', COALESCE(p_from, (now() AT TIME ZONE 'UTC')::date))::date;
+    last_month DATE := (date_trunc('month', now() AT TIME ZONE 'UTC') + make_interval(months => p_months_ahead))::date;
+    part TEXT;
+    default_part TEXT := p_table || '_default';
+    lo TIMESTAMPTZ;
+    hi TIMESTAMPTZ;
+    stray BOOLEAN;
+    created INTEGER := 0;
+BEGIN
+    WHILE m <= last_month LOOP
+        part := format('%s_y%sm%s', p_table, to_char(m, 'YYYY'), to_char(m, 'MM'));
+        IF to_regclass(part) IS NULL THEN
+            lo := m::timestamp AT TIME ZONE 'UTC';
+            hi := (m + interval '1 month')::timestamp AT TIME ZONE 'UTC';
+            -- Rows of this month already in the DEFAULT partition (maintenance lapsed past
+            -- the pre-created months) make CREATE ... PARTITION OF fail: detach it, create
+            -- the month, move those rows over and attach it back
+            stray := FALSE;
+            IF to_regclass(default_part) IS NOT NULL THEN
+                EXECUTE format('LOCK TABLE %I IN SHARE ROW EXCLUSIVE MODE', default_part);
+                EXECUTE format('SELECT EXISTS (SELECT 1 FROM %I WHERE created_at >= %L AND created_at < %L)',
+                               default_part, lo, hi) INTO stray;
+            END IF;
+            IF stray THEN
+                EXECUTE format('ALTER TABLE %I DETACH PARTITION %I', p_table, default_part);
+            END IF;
+            EXECUTE format('CREATE TABLE %I PARTITION OF %I FOR VALUES FROM (%L) TO (%L)', part, p_table, lo, hi);
+            IF stray THEN
+                EXECUTE format(
+                    'WITH moved AS (DELETE FROM %I WHERE created_at >= %L AND created_at < %L RETURNING *) '
+                    'INSERT INTO %I SELECT * FROM moved',
+                    default_part, lo, hi, part
+                );
+                EXECUTE format('ALTER TABLE %I ATTACH PARTITION %I DEFAULT', p_table, default_part);
+            END IF;
+            created := created + 1;
+        END IF;
+        m := (m + interval '1 month')::date;
+    END LOOP;
+    RETURN created;
+END;
+$$ LANGUAGE plpgsql;
+
+SELECT create_monthly_partitions('audit_logs', 3);
+SELECT create_monthly_partitions('access_logs', 3);
+
 
 -- 3. Functions & Policies (Zero Trust Logic)
 
+-- Per-table audit options:
+--   excluded_columns: never stored; an UPDATE that only touches them is not audited
+--   full_row_updates: store whole OLD/NEW rows on UPDATE instead of the changed keys
+CREATE TABLE IF NOT EXISTS audit_table_settings (
+    table_name VARCHAR(50) PRIMARY KEY,
+    excluded_columns TEXT[] NOT NULL DEFAULT '{}',
+    full_row_updates BOOLEAN NOT NULL DEFAULT FALSE
+);
+
+INSERT INTO audit_table_settings (table_name, excluded_columns) VALUES
+    ('users', ARRAY['last_notification_check', 'updated_at']),
+    ('transactions', ARRAY['import_hash']),
+    ('reservations', ARRAY['period'])
+ON CONFLICT (table_name) DO NOTHING;
+
 CREATE OR REPLACE FUNCTION audit_trigger_func() RETURNS TRIGGER AS $$
 DECLARE
     curr_condo UUID;
     curr_user UUID;
+    excluded TEXT[];
+    full_rows BOOLEAN;
+    old_row JSONB;
+    new_row JSONB;
+    old_diff JSONB;
+    new_diff JSONB;
+    -- Identity keys kept in UPDATE diffs (self-service filter and enrichment rely on them)
+    context_keys CONSTANT TEXT[] := ARRAY['id', 'user_id', 'resident_id', 'unit_id', 'common_area_id', 'created_by'];
 BEGIN
     -- Safely try to get context variables
     BEGIN
@@ -271,20 +375,44 @@ BEGIN
         END IF;
     END IF;
 
-    IF curr_condo IS NOT NULL THEN
-        IF (TG_OP = 'INSERT') THEN
-            INSERT INTO audit_logs (condominium_id, actor_id, action, table_name, record_id, new_data)
-            VALUES (curr_condo, curr_user, 'INSERT', TG_TABLE_NAME, NEW.id, row_to_json(NEW));
-            RETURN NEW;
-        ELSIF (TG_OP = 'UPDATE') THEN
-            INSERT INTO audit_logs (condominium_id, actor_id, action, table_name, record_id, old_data, new_data)
-            VALUES (curr_condo, curr_user, 'UPDATE', TG_TABLE_NAME, NEW.id, row_to_json(OLD), row_to_json(NEW));
+    IF curr_condo IS NULL THEN
+        RETURN NULL;
+    END IF;
+
+    SELECT s.excluded_columns, s.full_row_updates INTO excluded, full_rows
+    FROM audit_table_settings s WHERE s.table_name = TG_TABLE_NAME;
+    excluded := COALESCE(excluded, '{}');
+
+    IF (TG_OP = 'INSERT') THEN
+        INSERT INTO audit_logs (condominium_id, actor_id, action, table_name, record_id, new_data)
+        VALUES (curr_condo, curr_user, 'INSERT', TG_TABLE_NAME, NEW.id, to_jsonb(NEW) - excluded);
+        RETURN NEW;
+    ELSIF (TG_OP = 'UPDATE') THEN
+        old_row := to_jsonb(OLD) - excluded;
+        new_row := to_jsonb(NEW) - excluded;
+        -- Nothing but excluded (noise) columns changed
+        IF old_row = new_row THEN
             RETURN NEW;
-        ELSIF (TG_OP = 'DELETE') THEN
-            INSERT INTO audit_logs (condominium_id, actor_id, action, table_name, record_id, old_data)
-            VALUES (curr_condo, curr_user, 'DELETE', TG_TABLE_NAME, OLD.id, row_to_json(OLD));
-            RETURN OLD;
         END IF;
+
+        IF NOT COALESCE(full_rows, FALSE) THEN
+            SELECT jsonb_object_agg(n.key, o.value), jsonb_object_agg(n.key, n.value)
+            INTO old_diff, new_diff
+            FROM jsonb_each(new_row) n
+            JOIN jsonb_each(old_row) o ON o.key = n.key
+            WHERE n.value IS DISTINCT FROM o.value OR n.key = ANY(context_keys);
+
+            old_row := old_diff;
+            new_row := new_diff;
+        END IF;
+
+        INSERT INTO audit_logs (condominium_id, actor_id, action, table_name, record_id, old_data, new_data)
+        VALUES (curr_condo, curr_user, 'UPDATE', TG_TABLE_NAME, NEW.id, old_row, new_row);
+        RETURN NEW;
+    ELSIF (TG_OP = 'DELETE') THEN
+        INSERT INTO audit_logs (condominium_id, actor_id, action, table_name, record_id, old_data)
+        VALUES (curr_condo, curr_user, 'DELETE', TG_TABLE_NAME, OLD.id, to_jsonb(OLD) - excluded);
+        RETURN OLD;
     END IF;
     
     RETURN NULL;
@@ -300,31 +428,28 @@ END;
 $$ LANGUAGE plpgsql SECURITY DEFINER;
 
 -- Helpers to get session variables
+-- Evaluated by every RLS policy, so they must stay cheap: plain STABLE SQL functions
+-- (no SECURITY DEFINER, no EXCEPTION block) are inlined by the planner, and
+-- `condominium_id = current_condo_id()` becomes an index condition computed once
+-- per scan instead of a function call per row. Malformed ids still yield NULL
+-- (no rows) because the value is matched against the UUID format before the cast.
 CREATE OR REPLACE FUNCTION current_condo_id() RETURNS UUID AS $$
-BEGIN
-    BEGIN
-        RETURN NULLIF(current_setting('app.current_condo_id', true), '')::UUID;
-    EXCEPTION WHEN OTHERS THEN
-        RETURN NULL;
-    END;
-END;
-$$ LANGUAGE plpgsql SECURITY DEFINER;
+    SELECT CASE WHEN current_setting('app.current_condo_id', true)
+                     ~ '^[0-9a-fA-F]{8}-?([0-9a-fA-F]{4}-?){3}[0-9a-fA-F]{12}$'
+                THEN current_setting('app.current_condo_id', true)::UUID
+           END;
+$$ LANGUAGE sql STABLE;
 
 CREATE OR REPLACE FUNCTION current_user_id() RETURNS UUID AS $$
-BEGIN
-    BEGIN
-        RETURN NULLIF(current_setting('app.current_user_id', true), '')::UUID;
-    EXCEPTION WHEN OTHERS THEN
-        RETURN NULL;
-    END;
-END;
-$$ LANGUAGE plpgsql SECURITY DEFINER;
+    SELECT CASE WHEN current_setting('app.current_user_id', true)
+                     ~ '^[0-9a-fA-F]{8}-?([0-9a-fA-F]{4}-?){3}[0-9a-fA-F]{12}$'
+                THEN current_setting('app.current_user_id', true)::UUID
+           END;
+$$ LANGUAGE sql STABLE;
 
 CREATE OR REPLACE FUNCTION current_app_role() RETURNS VARCHAR AS $$
-BEGIN
-    RETURN NULLIF(current_setting('app.current_role', true), '')::VARCHAR;
-END;
-$$ LANGUAGE plpgsql SECURITY DEFINER;
+    SELECT NULLIF(current_setting('app.current_role', true), '')::VARCHAR;
+$$ LANGUAGE sql STABLE;
 
 -- RLS Policies
 
@@ -383,6 +508,39 @@ CREATE POLICY reservations_modify_policy ON reservations FOR ALL
         )
     );
 
+-- Reservation Versions (availability cache key per common area)
+-- Bumped by trigger on every reservation change of the area; GET /reservations/availability
+-- uses it as ETag and cache key, so cached free/busy windows are never stale.
+CREATE TABLE IF NOT EXISTS reservation_versions (
+    common_area_id UUID PRIMARY KEY REFERENCES common_areas(id) ON DELETE CASCADE,
+    condominium_id UUID NOT NULL REFERENCES condominiums(id),
+    version BIGINT NOT NULL DEFAULT 1
+);
+ALTER TABLE reservation_versions ENABLE ROW LEVEL SECURITY;
+
+-- Read-only for the app. Writes happen only through the SECURITY DEFINER trigger below.
+CREATE POLICY reservation_versions_policy ON reservation_versions FOR SELECT
+    USING (condominium_id = current_condo_id());
+
+CREATE OR REPLACE FUNCTION reservation_versions_trigger_func() RETURNS TRIGGER AS $$
+BEGIN
+    IF (TG_OP = 'UPDATE' OR TG_OP = 'DELETE') THEN
+        INSERT INTO reservation_versions (common_area_id, condominium_id)
+        VALUES (OLD.common_area_id, OLD.condominium_id)
+        ON CONFLICT (common_area_id) DO UPDATE SET version = reservation_versions.version + 1;
+    END IF;
+    IF (TG_OP = 'INSERT' OR (TG_OP = 'UPDATE' AND NEW.common_area_id <> OLD.common_area_id)) THEN
+        INSERT INTO reservation_versions (common_area_id, condominium_id)
+        VALUES (NEW.common_area_id, NEW.condominium_id)
+        ON CONFLICT (common_area_id) DO UPDATE SET version = reservation_versions.version + 1;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+CREATE TRIGGER reservation_versions_trigger AFTER INSERT OR UPDATE OR DELETE ON reservations
+    FOR EACH ROW EXECUTE FUNCTION reservation_versions_trigger_func();
+
 -- Audit Logs: Admin Only
 CREATE POLICY audit_policy ON audit_logs
     USING (
@@ -431,6 +589,87 @@ CREATE POLICY transactions_policy ON transactions
     USING (condominium_id = current_condo_id())
     WITH CHECK (condominium_id = current_condo_id() AND current_app_role() IN ('ADMIN', 'FINANCEIRO', 'SINDICO', 'SUBSINDICO'));
 
+-- Monthly Ledger (rollup of transactions per month/type)
+-- Maintained by trigger on transactions; summary and running balance read
+-- O(months) rows instead of scanning every transaction.
+CREATE TABLE IF NOT EXISTS monthly_ledger (
+    condominium_id UUID NOT NULL REFERENCES condominiums(id),
+    year INTEGER NOT NULL,
+    month INTEGER NOT NULL CHECK (month BETWEEN 1 AND 12),
+    type VARCHAR(20) NOT NULL CHECK (type IN ('RECEITA', 'DESPESA')),
+    total DECIMAL(14, 2) NOT NULL DEFAULT 0,
+    tx_count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (condominium_id, year, month, type)
+);
+ALTER TABLE monthly_ledger ENABLE ROW LEVEL SECURITY;
+
+-- Read-only for the app. Writes happen only through the SECURITY DEFINER functions below.
+CREATE POLICY monthly_ledger_policy ON monthly_ledger FOR SELECT
+    USING (condominium_id = current_condo_id());
+
+CREATE OR REPLACE FUNCTION monthly_ledger_trigger_func() RETURNS TRIGGER AS $$
+BEGIN
+    -- Status/description edits do not move money between buckets
+    IF (TG_OP = 'UPDATE'
+        AND NEW.condominium_id = OLD.condominium_id
+        AND NEW.type = OLD.type
+        AND NEW.amount = OLD.amount
+        AND NEW.date = OLD.date) THEN
+        RETURN NULL;
+    END IF;
+
+    IF (TG_OP = 'UPDATE' OR TG_OP = 'DELETE') THEN
+        UPDATE monthly_ledger
+           SET total = total - OLD.amount,
+               tx_count = tx_count - 1
+         WHERE condominium_id = OLD.condominium_id
+           AND year = EXTRACT(YEAR FROM OLD.date)::INTEGER
+           AND month = EXTRACT(MONTH FROM OLD.date)::INTEGER
+           AND type = OLD.type;
+    END IF;
+
+    IF (TG_OP = 'INSERT' OR TG_OP = 'UPDATE') THEN
+        INSERT INTO monthly_ledger (condominium_id, year, month, type, total, tx_count)
+        VALUES (NEW.condominium_id, EXTRACT(YEAR FROM NEW.date)::INTEGER, EXTRACT(MONTH FROM NEW.date)::INTEGER, NEW.type, NEW.amount, 1)
+        ON CONFLICT (condominium_id, year, month, type)
+        DO UPDATE SET total = monthly_ledger.total + EXCLUDED.total,
+                      tx_count = monthly_ledger.tx_count + 1;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+CREATE TRIGGER monthly_ledger_trigger AFTER INSERT OR UPDATE OR DELETE ON transactions
+    FOR EACH ROW EXECUTE FUNCTION monthly_ledger_trigger_func();
+
+-- Re-derive the rollup from transactions (all condominiums when p_condo is NULL).
+-- Usage: SELECT rebuild_monthly_ledger(); or scripts/rebuild_monthly_ledger.py
+CREATE OR REPLACE FUNCTION rebuild_monthly_ledger(p_condo UUID DEFAULT NULL) RETURNS INTEGER AS $$
+DECLARE
+    rows_written INTEGER;
+BEGIN
+    -- Block concurrent writes to transactions so the rollup is consistent
+    LOCK TABLE transactions IN SHARE MODE;
+
+    DELETE FROM monthly_ledger WHERE p_condo IS NULL OR condominium_id = p_condo;
+
+    INSERT INTO monthly_ledger (condominium_id, year, month, type, total, tx_count)
+    SELECT condominium_id,
+           EXTRACT(YEAR FROM date)::INTEGER,
+           EXTRACT(MONTH FROM date)::INTEGER,
+           type,
+           SUM(amount),
+           COUNT(*)
+      FROM transactions
+     WHERE p_condo IS NULL OR condominium_id = p_condo
+     GROUP BY 1, 2, 3, 4;
+
+    GET DIAGNOSTICS rows_written = ROW_COUNT;
+    RETURN rows_written;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
 -- Inventory Items
 CREATE TABLE IF NOT EXISTS inventory_items (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
@@ -784,3 +1023,223 @@ $$ LANGUAGE plpgsql SECURITY DEFINER;
 -- Audit
 CREATE TRIGGER audit_financial_shares_trigger AFTER INSERT OR UPDATE OR DELETE ON financial_shares
     FOR EACH ROW EXECUTE FUNCTION audit_trigger_func();
+
+-- 15. Notification State (contador de não lidas por usuário)
+-- One row per user, maintained by triggers on announcements/violations/users.
+-- `version` changes whenever the user's feed changes (new/edited/removed item,
+-- read-all): it is the ETag of GET /notifications, so idle polls are one
+-- primary key lookup.
+CREATE TABLE IF NOT EXISTS notification_state (
+    user_id UUID PRIMARY KEY REFERENCES users(id) ON DELETE CASCADE,
+    condominium_id UUID NOT NULL REFERENCES condominiums(id),
+    unread_count INTEGER NOT NULL DEFAULT 0,
+    version BIGINT NOT NULL DEFAULT 1,
+    last_read_at TIMESTAMP WITH TIME ZONE,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+CREATE INDEX IF NOT EXISTS idx_notification_state_condo ON notification_state(condominium_id);
+
+ALTER TABLE notification_state ENABLE ROW LEVEL SECURITY;
+
+-- RLS: each user reads/updates only their own row (read-all). Fan-out happens
+-- in the SECURITY DEFINER functions below.
+CREATE POLICY notification_state_policy ON notification_state
+    USING (condominium_id = current_condo_id() AND user_id = current_user_id())
+    WITH CHECK (condominium_id = current_condo_id() AND user_id = current_user_id());
+
+-- Recount a user's unread items from scratch (new users, role/condo changes, backfill).
+-- Usage: SELECT refresh_notification_state(id) FROM users;
+CREATE OR REPLACE FUNCTION refresh_notification_state(p_user UUID) RETURNS VOID AS $$
+BEGIN
+    INSERT INTO notification_state AS s (user_id, condominium_id, unread_count, last_read_at)
+    SELECT u.id, u.condominium_id,
+           (SELECT count(*) FROM announcements a
+             WHERE a.condominium_id = u.condominium_id
+               AND (u.last_notification_check IS NULL OR a.created_at > u.last_notification_check))
+         + CASE WHEN u.role = 'RESIDENTE' THEN
+               (SELECT count(*) FROM violations v
+                 WHERE v.resident_id = u.id
+                   AND (u.last_notification_check IS NULL OR v.created_at > u.last_notification_check))
+           ELSE 0 END,
+           u.last_notification_check
+    FROM users u WHERE u.id = p_user
+    ON CONFLICT (user_id) DO UPDATE
+        SET condominium_id = EXCLUDED.condominium_id,
+            unread_count = EXCLUDED.unread_count,
+            last_read_at = EXCLUDED.last_read_at,
+            version = s.version + 1,
+            updated_at = NOW();
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+CREATE OR REPLACE FUNCTION notification_announcement_trigger_func() RETURNS TRIGGER AS $$
+BEGIN
+    IF (TG_OP = 'INSERT') THEN
+        UPDATE notification_state
+           SET unread_count = unread_count + 1, version = version + 1, updated_at = NOW()
+         WHERE condominium_id = NEW.condominium_id;
+    ELSIF (TG_OP = 'UPDATE') THEN
+        UPDATE notification_state
+           SET version = version + 1, updated_at = NOW()
+         WHERE condominium_id = NEW.condominium_id;
+    ELSE
+        UPDATE notification_state
+           SET unread_count = GREATEST(unread_count - CASE
+                   WHEN last_read_at IS NULL OR OLD.created_at > last_read_at THEN 1 ELSE 0 END, 0),
+               version = version + 1, updated_at = NOW()
+         WHERE condominium_id = OLD.condominium_id;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+CREATE TRIGGER notification_announcements_trigger AFTER INSERT OR UPDATE OR DELETE ON announcements
+    FOR EACH ROW EXECUTE FUNCTION notification_announcement_trigger_func();
+
+-- Violations only show up in the feed of residents
+CREATE OR REPLACE FUNCTION notification_violation_trigger_func() RETURNS TRIGGER AS $$
+BEGIN
+    IF (TG_OP = 'INSERT') THEN
+        UPDATE notification_state s
+           SET unread_count = s.unread_count + 1, version = s.version + 1, updated_at = NOW()
+          FROM users u
+         WHERE s.user_id = NEW.resident_id AND u.id = s.user_id AND u.role = 'RESIDENTE';
+    ELSIF (TG_OP = 'UPDATE') THEN
+        UPDATE notification_state
+           SET version = version + 1, updated_at = NOW()
+         WHERE user_id IN (OLD.resident_id, NEW.resident_id);
+    ELSE
+        UPDATE notification_state s
+           SET unread_count = GREATEST(s.unread_count - CASE
+                   WHEN s.last_read_at IS NULL OR OLD.created_at > s.last_read_at THEN 1 ELSE 0 END, 0),
+               version = s.version + 1, updated_at = NOW()
+          FROM users u
+         WHERE s.user_id = OLD.resident_id AND u.id = s.user_id AND u.role = 'RESIDENTE';
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+CREATE TRIGGER notification_violations_trigger AFTER INSERT OR UPDATE OR DELETE ON violations
+    FOR EACH ROW EXECUTE FUNCTION notification_violation_trigger_func();
+
+CREATE OR REPLACE FUNCTION notification_user_trigger_func() RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM refresh_notification_state(NEW.id);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+CREATE TRIGGER notification_users_trigger AFTER INSERT OR UPDATE OF role, condominium_id ON users
+    FOR EACH ROW EXECUTE FUNCTION notification_user_trigger_func();
+
+-- Users created before this section (seed above)
+SELECT refresh_notification_state(id) FROM users;
+
+-- 16. Condominium Events (LISTEN/NOTIFY)
+-- Small change notices for live clients (GET /api/v1/events/stream): the app
+-- keeps one LISTEN connection per worker and fans events out to the browsers of
+-- the condominium, which then refetch what changed instead of polling.
+-- Payload: {"condo", "table", "op", "id", "user_id"} (user_id = owner/recipient of the row, if any)
+CREATE OR REPLACE FUNCTION notify_condo_event() RETURNS TRIGGER AS $$
+DECLARE
+    rec RECORD;
+    target UUID;
+BEGIN
+    IF (TG_OP = 'DELETE') THEN
+        rec := OLD;
+    ELSE
+        rec := NEW;
+    END IF;
+
+    IF TG_TABLE_NAME = 'violations' THEN
+        target := rec.resident_id;
+    ELSIF TG_TABLE_NAME = 'users' THEN
+        target := rec.id;
+    ELSIF TG_TABLE_NAME IN ('occurrences', 'reservations') THEN
+        target := rec.user_id;
+    END IF;
+
+    PERFORM pg_notify('condo_events', json_build_object(
+        'condo', rec.condominium_id,
+        'table', TG_TABLE_NAME,
+        'op', TG_OP,
+        'id', rec.id,
+        'user_id', target
+    )::text);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER notify_announcements_trigger AFTER INSERT OR UPDATE OR DELETE ON announcements
+    FOR EACH ROW EXECUTE FUNCTION notify_condo_event();
+
+CREATE TRIGGER notify_violations_trigger AFTER INSERT OR UPDATE OR DELETE ON violations
+    FOR EACH ROW EXECUTE FUNCTION notify_condo_event();
+
+CREATE TRIGGER notify_occurrences_trigger AFTER INSERT OR UPDATE OR DELETE ON occurrences
+    FOR EACH ROW EXECUTE FUNCTION notify_condo_event();
+
+CREATE TRIGGER notify_reservations_trigger AFTER INSERT OR UPDATE OR DELETE ON reservations
+    FOR EACH ROW EXECUTE FUNCTION notify_condo_event();
+
+-- Users: new sign-ups (pending access requests) and status/role changes only
+CREATE TRIGGER notify_users_trigger AFTER INSERT OR DELETE OR UPDATE OF status, role ON users
+    FOR EACH ROW EXECUTE FUNCTION notify_condo_event();
+
+-- 17. Index Pack (foreign keys, RLS predicates, repository query shapes)
+-- Every listing filters on condominium_id (repository + RLS policy) and sorts by a
+-- timestamp, so most indexes are (condominium_id, <sort column>): the same index
+-- serves the filter, the ORDER BY and the LIMIT. Foreign keys that are filtered on
+-- or referenced by ON DELETE CASCADE get their own index.
+-- Mirrored by scripts/add_index_pack.py; scripts/explain_hot_queries.py checks the plans.
+
+-- Users: login looks up email_hash without the condominium (the UNIQUE index leads with condominium_id)
+CREATE INDEX IF NOT EXISTS idx_users_email_hash ON users(email_hash);
+CREATE INDEX IF NOT EXISTS idx_users_unit ON users(unit_id) WHERE unit_id IS NOT NULL;
+-- Dashboard counters and recent residents (role/status filters, newest first)
+CREATE INDEX IF NOT EXISTS idx_users_condo_role_status_created ON users(condominium_id, role, status, created_at DESC);
+
+CREATE INDEX IF NOT EXISTS idx_vehicles_user ON vehicles(user_id);
+CREATE INDEX IF NOT EXISTS idx_vehicles_condo ON vehicles(condominium_id);
+CREATE INDEX IF NOT EXISTS idx_pets_user ON pets(user_id);
+CREATE INDEX IF NOT EXISTS idx_pets_condo ON pets(condominium_id);
+
+CREATE INDEX IF NOT EXISTS idx_common_areas_condo ON common_areas(condominium_id);
+
+-- Reservations: the exclusion constraint's GiST index only covers active statuses
+CREATE INDEX IF NOT EXISTS idx_reservations_condo_start ON reservations(condominium_id, start_time DESC);
+CREATE INDEX IF NOT EXISTS idx_reservations_user_start ON reservations(user_id, start_time DESC);
+CREATE INDEX IF NOT EXISTS idx_reservations_area_start ON reservations(common_area_id, start_time);
+CREATE INDEX IF NOT EXISTS idx_reservations_condo_pending ON reservations(condominium_id) WHERE status = 'PENDENTE';
+
+CREATE INDEX IF NOT EXISTS idx_readings_water_unit ON readings_water(unit_id);
+CREATE INDEX IF NOT EXISTS idx_readings_gas_condo_created ON readings_gas(condominium_id, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_readings_gas_transaction ON readings_gas(transaction_id) WHERE transaction_id IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_readings_electricity_condo_created ON readings_electricity(condominium_id, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_readings_electricity_transaction ON readings_electricity(transaction_id) WHERE transaction_id IS NOT NULL;
+
+-- Refresh tokens: session list per user, family revocation on reuse
+CREATE INDEX IF NOT EXISTS idx_refresh_tokens_user ON refresh_tokens(user_id);
+CREATE INDEX IF NOT EXISTS idx_refresh_tokens_family ON refresh_tokens(family_id);
+
+CREATE INDEX IF NOT EXISTS idx_inventory_items_condo_name ON inventory_items(condominium_id, name);
+CREATE INDEX IF NOT EXISTS idx_bylaws_condo_category ON bylaws(condominium_id, category);
+
+-- Occupation history: the open period of a user (end_date IS NULL)
+CREATE INDEX IF NOT EXISTS idx_occupation_history_user_open ON occupation_history(user_id) WHERE end_date IS NULL;
+CREATE INDEX IF NOT EXISTS idx_occupation_history_condo ON occupation_history(condominium_id);
+CREATE INDEX IF NOT EXISTS idx_occupation_history_unit ON occupation_history(unit_id) WHERE unit_id IS NOT NULL;
+
+-- Violations: staff list per condominium, resident's own list and notification feed
+CREATE INDEX IF NOT EXISTS idx_violations_condo_created ON violations(condominium_id, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_violations_resident_created ON violations(resident_id, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_violations_bylaw ON violations(bylaw_id) WHERE bylaw_id IS NOT NULL;
+
+CREATE INDEX IF NOT EXISTS idx_occurrences_condo_created ON occurrences(condominium_id, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_occurrences_user_created ON occurrences(user_id, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_occurrences_condo_open ON occurrences(condominium_id) WHERE status = 'ABERTO';
+
+CREATE INDEX IF NOT EXISTS idx_announcements_condo_created ON announcements(condominium_id, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_documents_condo_created ON documents(condominium_id, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_financial_shares_condo ON financial_shares(condominium_id);
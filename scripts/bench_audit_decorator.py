@@ -0,0 +1,117 @@
+import sys
+import os
+import asyncio
+import functools
+import inspect
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from decimal import Decimal
+
+# Add backend directory to sys.path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from sqlalchemy.ext.asyncio import AsyncSession
+import app.main  # noqa: F401 (registers every model, so mappers can be configured)
+from app.core.decorators import AUDIT_BUFFER_KEY, audit_log, flush_audit_buffer
+from app.financial.models import Transaction
+from app.services.audit_service import AuditService
+
+# Per-call overhead of @audit_log on a service method returning a Transaction.
+# No database needed: the session is never flushed, records are only added to it.
+#   legacy:    previous implementation (inspect.signature + bind + str() per column on every call)
+#   immediate: @audit_log(...)                -> AuditService.log per call
+#   buffered:  @audit_log(..., buffered=True) -> call only; the work is deferred to COMMIT
+#   buffered+commit: buffered plus its before_commit work for a one-call transaction
+#              (serialization of the final row state, building the audit_logs row).
+# Not included in any mode: executing the INSERT (immediate at flush, buffered at
+# COMMIT), which needs a database.
+# Usage: python scripts/bench_audit_decorator.py [iterations]
+
+BATCH = 1000
+
+def legacy_audit_log(action: str, table_name: str):
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(self, *args, **kwargs):
+            result = await func(self, *args, **kwargs)
+            sig = inspect.signature(func)
+            bound_args = sig.bind(self, *args, **kwargs)
+            bound_args.apply_defaults()
+            actor_id = bound_args.arguments.get('current_user_id')
+            new_data = {c.name: str(getattr(result, c.name)) for c in result.__table__.columns}
+            await AuditService.log(
+                db=self.db, action=action, table_name=table_name, record_id=str(result.id),
+                actor_id=actor_id, new_data=new_data, condominium_id=str(result.condominium_id)
+            )
+            return result
+        return wrapper
+    return decorator
+
+class BenchService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.record = Transaction(
+            id=uuid.uuid4(), condominium_id=uuid.uuid4(), type="expense", description="Bench",
+            amount=Decimal("123.45"), category="Manutenção", date=datetime.now(timezone.utc),
+            status="PAGO"
+        )
+
+    async def plain(self, data: dict, current_user_id: str):
+        return self.record
+
+    legacy = legacy_audit_log("UPDATE", "transactions")(plain)
+    immediate = audit_log("UPDATE", "transactions")(plain)
+    buffered = audit_log("UPDATE", "transactions", buffered=True)(plain)
+
+class CommitSession:
+    """
+    Stands in for the Session flush_audit_buffer receives at COMMIT: pending
+    changes are already flushed and the INSERT is not sent.
+    """
+    def __init__(self, info: dict):
+        self.info = info
+
+    def flush(self):
+        pass
+
+    @contextmanager
+    def begin_nested(self):
+        yield
+
+    def execute(self, stmt, rows):
+        pass
+
+async def measure(service: BenchService, name: str, iterations: int, commit: bool = False) -> float:
+    method = getattr(service, name)
+    actor = str(uuid.uuid4())
+    session = CommitSession(service.db.info)
+    elapsed = 0.0
+    for _ in range(iterations // BATCH):
+        start = time.perf_counter()
+        for _ in range(BATCH):
+            await method({"amount": 1}, current_user_id=actor)
+            if commit:
+                flush_audit_buffer(session)
+        elapsed += time.perf_counter() - start
+        # Keep the session small between batches
+        service.db.expunge_all()
+        service.db.info.pop(AUDIT_BUFFER_KEY, None)
+    return elapsed / iterations * 1_000_000
+
+async def main(iterations: int):
+    service = BenchService(AsyncSession())
+    base = await measure(service, "plain", iterations)
+    print(f"{iterations} calls\n")
+    print(f"{'mode':<17}{'us/call':>10}{'overhead':>10}")
+    for name in ("plain", "legacy", "immediate", "buffered", "buffered+commit"):
+        if name == "plain":
+            per_call = base
+        else:
+            method, _, commit = name.partition("+")
+            per_call = await measure(service, method, iterations, commit=bool(commit))
+        print(f"{name:<17}{per_call:>10.2f}{per_call - base:>10.2f}")
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000))
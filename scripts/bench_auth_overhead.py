@@ -0,0 +1,49 @@
+import sys
+import os
+import asyncio
+import statistics
+import time
+import uuid
+
+# Add backend directory to sys.path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from starlette.requests import Request
+from app.core import config, deps, security
+
+# Per-request cost of deps.get_current_user (cookie token, HS256).
+#   uncached: JWT verified on every request (old behaviour)
+#   cached:   verified once, then served from the LRU keyed by token hash
+# Run with JWT_BACKEND=pyjwt to compare backends (requires PyJWT).
+# Usage: python scripts/bench_auth_overhead.py [iterations]
+
+def make_request(token: str) -> Request:
+    cookie = f"access_token={token}".encode()
+    return Request({"type": "http", "headers": [(b"cookie", cookie)], "state": {}})
+
+async def measure(label: str, iterations: int, token: str, cache: bool):
+    config.settings.JWT_CACHE_SIZE = 2048 if cache else 0
+    deps._token_cache.clear()
+    samples = []
+    for _ in range(iterations):
+        request = make_request(token)  # new request each time: no per-request reuse
+        start = time.perf_counter()
+        await deps.get_current_user(request)
+        samples.append((time.perf_counter() - start) * 1_000_000)
+    samples.sort()
+    p50 = statistics.median(samples)
+    p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+    print(f"{label:<12}{p50:>12.1f}{p99:>12.1f}")
+
+async def main(iterations: int):
+    token = security.create_access_token(
+        subject=str(uuid.uuid4()),
+        claims={"condo_id": str(uuid.uuid4()), "role": "ADMIN", "name": "Bench", "unit": None}
+    )
+    print(f"backend {config.settings.JWT_BACKEND}, {iterations} requests\n")
+    print(f"{'mode':<12}{'p50 (us)':>12}{'p99 (us)':>12}")
+    await measure("uncached", iterations, token, cache=False)
+    await measure("cached", iterations, token, cache=True)
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000))
@@ -0,0 +1,140 @@
+import sys
+import os
+import asyncio
+import glob
+import random
+import shutil
+import tempfile
+import time
+
+# Add backend directory to sys.path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from fastapi import HTTPException
+from app.core.config import settings
+from app.services.optimizer import optimizer
+from app.utils.file_optimizer import optimize_file
+
+# Throughput and compression of document optimization over a corpus of PDFs/images.
+#   threads: asyncio.to_thread per file (previous upload path: default executor, GIL-bound)
+#   pool:    app.services.optimizer (OPTIMIZER_WORKERS processes)
+#   burst:   every file submitted at once with the configured OPTIMIZER_QUEUE_LIMIT -> 503s
+# "loop lag" is the worst delay of a 10 ms ticker on the event loop while the mode runs.
+# Without a corpus directory a synthetic one is generated (photos, scans, multi-page PDFs).
+# Usage: OPTIMIZER_WORKERS=4 python scripts/bench_file_optimizer.py [corpus_dir]
+
+MIME_TYPES = {".pdf": "application/pdf", ".jpg": "image/jpeg", ".jpeg": "image/jpeg", ".png": "image/png"}
+
+def generate_corpus(path: str, count: int = 24) -> None:
+    from PIL import Image, ImageDraw
+    rng = random.Random(42)
+
+    def photo(width: int, height: int) -> Image.Image:
+        img = Image.new("RGB", (width, height))
+        draw = ImageDraw.Draw(img)
+        for _ in range(400):
+            x, y = rng.randrange(width), rng.randrange(height)
+            color = tuple(rng.randrange(256) for _ in range(3))
+            draw.ellipse((x, y, x + rng.randrange(20, 400), y + rng.randrange(20, 400)), fill=color)
+        return img
+
+    for i in range(count):
+        img = photo(rng.choice([3000, 4000]), rng.choice([2000, 3000]))
+        kind = i % 3
+        if kind == 0:
+            img.save(os.path.join(path, f"photo_{i}.png"))
+        elif kind == 1:
+            img.save(os.path.join(path, f"photo_{i}.jpg"), quality=98)
+        else:
+            # Scanned minutes: the same letterhead image on every page
+            pages = [img.resize((1240, 1754))] * 8
+            pages[0].save(os.path.join(path, f"minutes_{i}.pdf"), save_all=True, append_images=pages[1:])
+
+def corpus(path: str) -> list:
+    files = []
+    for name in sorted(glob.glob(os.path.join(path, "*"))):
+        mime = MIME_TYPES.get(os.path.splitext(name)[1].lower())
+        if mime:
+            files.append((name, mime))
+    return files
+
+def collect(path: str, result) -> int:
+    # Size after optimization; the output is discarded
+    if result is None:
+        return os.path.getsize(path)
+    tmp_path, _, size = result
+    os.remove(tmp_path)
+    return size
+
+async def watch_loop(stop: asyncio.Event) -> float:
+    worst = 0.0
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        start = loop.time()
+        await asyncio.sleep(0.01)
+        worst = max(worst, loop.time() - start - 0.01)
+    return worst * 1000
+
+async def run_mode(name: str, files: list, submit) -> None:
+    stop = asyncio.Event()
+    watcher = asyncio.create_task(watch_loop(stop))
+    rejected = failed = 0
+
+    async def one(path: str, mime: str) -> int:
+        nonlocal rejected, failed
+        try:
+            return collect(path, await submit(path, mime))
+        except HTTPException:
+            rejected += 1
+        except Exception:
+            # Timeouts, MemoryError in the worker, unreadable files
+            failed += 1
+        return 0
+
+    start = time.perf_counter()
+    sizes = await asyncio.gather(*[one(path, mime) for path, mime in files])
+    elapsed = time.perf_counter() - start
+    stop.set()
+    lag = await watcher
+
+    done = len(files) - rejected - failed
+    done_in = sum(os.path.getsize(path) for (path, _), size in zip(files, sizes) if size)
+    ratio = sum(sizes) / done_in if done_in else 0
+    print(f"{name:<8}{done:>6}{rejected:>6}{failed:>8}{elapsed:>9.2f}{done / elapsed:>9.2f}"
+          f"{done_in / elapsed / 1e6:>9.2f}{ratio:>8.2f}{lag:>11.1f}")
+
+async def main(corpus_dir: str):
+    files = corpus(corpus_dir)
+    total = sum(os.path.getsize(path) for path, _ in files)
+    print(f"{len(files)} files, {total / 1e6:.1f} MB, {settings.OPTIMIZER_WORKERS} workers, "
+          f"queue limit {settings.OPTIMIZER_QUEUE_LIMIT}\n")
+    print(f"{'mode':<8}{'files':>6}{'503':>6}{'failed':>8}{'seconds':>9}{'files/s':>9}{'MB/s':>9}{'ratio':>8}{'loop lag':>11}")
+
+    await run_mode("threads", files, lambda path, mime: asyncio.to_thread(optimize_file, path, mime))
+
+    # Warm up the worker processes (spawn + imports) outside the measurement
+    for (path, _), result in zip(files, await asyncio.gather(*[
+        optimizer.run(optimize_file, path, mime) for path, mime in files[:settings.OPTIMIZER_WORKERS]
+    ], return_exceptions=True)):
+        if not isinstance(result, BaseException):
+            collect(path, result)
+    limit = settings.OPTIMIZER_QUEUE_LIMIT
+    settings.OPTIMIZER_QUEUE_LIMIT = len(files)
+    await run_mode("pool", files, lambda path, mime: optimizer.run(optimize_file, path, mime))
+    settings.OPTIMIZER_QUEUE_LIMIT = limit
+    await run_mode("burst", files, lambda path, mime: optimizer.run(optimize_file, path, mime))
+
+    print(f"\n{optimizer.snapshot()}")
+    await optimizer.shutdown()
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        asyncio.run(main(sys.argv[1]))
+    else:
+        workdir = tempfile.mkdtemp(prefix="optimizer-corpus-")
+        try:
+            print("Generating synthetic corpus...")
+            generate_corpus(workdir)
+            asyncio.run(main(workdir))
+        finally:
+            shutil.rmtree(workdir)
@@ -0,0 +1,87 @@
+import sys
+import os
+import asyncio
+import statistics
+import time
+import uuid
+from sqlalchemy import event, text
+from starlette.requests import Request
+
+# Add backend directory to sys.path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from app.core import config, database, deps
+from app.schemas.token import TokenData
+
+# Microbenchmark of the per-request RLS context (deps.get_db).
+#   before: eager session-level SELECT set_config(..., false) when the session opens
+#   after:  context kept in Session.info, applied with set_config(..., true) on BEGIN
+# Two "endpoints" are measured: one running a trivial query and one that returns
+# without touching the database (e.g. a 403 raised by the service). Only the second
+# saves a round-trip: the query endpoint still sends the set_config (now after BEGIN),
+# and a request with several transactions sends it once per transaction.
+# Usage: python scripts/bench_security_context.py [iterations]
+
+OLD_SET_CONFIG = text(
+    "SELECT set_config('app.current_user_id', :uid, false), set_config('app.current_condo_id', :cid, false), "
+    "set_config('app.current_role', :role, false), set_config('app.current_user_key', :key, false), "
+    "set_config('app.current_user_ip', :ip, false)"
+)
+
+statements = 0
+
+@event.listens_for(database.engine.sync_engine, "before_cursor_execute")
+def _count(conn, cursor, statement, parameters, context, executemany):
+    global statements
+    statements += 1
+
+def fake_request() -> Request:
+    return Request({"type": "http", "client": ("127.0.0.1", 50000), "headers": []})
+
+async def before(request, user, query: bool):
+    async with database.AsyncSessionLocal() as session:
+        await session.execute(OLD_SET_CONFIG, {
+            "uid": user.user_id, "cid": user.condo_id, "role": user.role,
+            "key": config.settings.APP_ENCRYPTION_KEY, "ip": request.client.host
+        })
+        if query:
+            await session.execute(text("SELECT 1"))
+
+async def after(request, user, query: bool):
+    gen = deps.get_db(request, user)
+    session = await gen.__anext__()
+    if query:
+        await session.execute(text("SELECT 1"))
+    await gen.aclose()
+
+async def measure(fn, iterations: int, query: bool):
+    global statements
+    request, user = fake_request(), TokenData(user_id=str(uuid.uuid4()), condo_id=str(uuid.uuid4()), role="ADMIN")
+    for _ in range(50):  # warm-up: pool connections and prepared statement cache
+        await fn(request, user, query)
+
+    statements = 0
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        await fn(request, user, query)
+        samples.append((time.perf_counter() - start) * 1000)
+
+    samples.sort()
+    p50 = statistics.median(samples)
+    p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+    return p50, p99, statements / iterations
+
+async def main(iterations: int):
+    print(f"{iterations} iterations per case\n")
+    print(f"{'case':<28}{'p50 (ms)':>10}{'p99 (ms)':>10}{'stmts/req':>11}")
+    for query in (True, False):
+        label = "SELECT 1" if query else "no query"
+        for name, fn in (("before", before), ("after", after)):
+            p50, p99, stmts = await measure(fn, iterations, query)
+            print(f"{name + ' / ' + label:<28}{p50:>10.3f}{p99:>10.3f}{stmts:>11.1f}")
+
+    await database.engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000))
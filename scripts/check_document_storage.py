@@ -0,0 +1,69 @@
+import sys
+import os
+import asyncio
+import uuid
+
+# Add backend directory to sys.path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from fastapi import HTTPException
+from app.core.config import settings
+from app.documents.storage import get_storage
+
+# Smoke test of the configured document storage backend (DOCUMENT_STORAGE):
+# deduplication, reference counting, garbage collection and downloads. Uses random contents and
+# releases everything it stores.
+# Local stand-in for the S3 backend (docker compose --profile s3 up minio):
+#   DOCUMENT_STORAGE=s3 DOCUMENT_S3_BUCKET=documents DOCUMENT_S3_ENDPOINT_URL=http://localhost:9000 \
+#   AWS_ACCESS_KEY_ID=minioadmin AWS_SECRET_ACCESS_KEY=minioadmin python scripts/check_document_storage.py
+
+async def stage(storage, content: bytes) -> str:
+    path = storage.staging_path()
+    with open(path, "wb") as f:
+        f.write(content)
+    return path
+
+async def body(response) -> bytes:
+    if hasattr(response, "body_iterator"):
+        return b"".join([chunk async for chunk in response.body_iterator])
+    with open(response.path, "rb") as f:
+        return f.read()
+
+async def downloadable(storage, key: str) -> bool:
+    try:
+        await storage.response(key, "check.bin", "application/octet-stream")
+        return True
+    except HTTPException as e:
+        assert e.status_code == 404
+        return False
+
+async def main():
+    storage = get_storage()
+    print(f"backend: {type(storage).__name__} ({settings.DOCUMENT_STORAGE}), staging: {storage.staging_dir}")
+    content = os.urandom(256 * 1024)
+    first, second = str(uuid.uuid4()), str(uuid.uuid4())
+
+    key = await storage.put(await stage(storage, content), first)
+    again = await storage.put(await stage(storage, content), second)
+    assert key == again, "identical contents must share a key"
+    print(f"dedup ok: {key}")
+
+    assert await body(await storage.response(key, "check.bin", "application/octet-stream")) == content
+    async with storage.local_copy(key) as path:
+        with open(path, "rb") as f:
+            assert f.read() == content
+    print("download / local copy ok")
+
+    await storage.release(key, first)
+    await storage.collect_garbage(0)
+    assert await downloadable(storage, key), "released while still referenced"
+    await storage.release(key, second)
+    # Idempotent: releasing twice must not fail
+    await storage.release(key, second)
+    # S3 only removes unreferenced objects in the sweep (local storage already did on release)
+    await storage.collect_garbage(0)
+    assert not await downloadable(storage, key), "not removed after the last reference"
+    print("reference counting ok")
+
+if __name__ == "__main__":
+    asyncio.run(main())
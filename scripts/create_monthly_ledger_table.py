@@ -0,0 +1,110 @@
+import sys
+import os
+import asyncio
+from sqlalchemy import text
+
+# Add backend directory to sys.path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from app.core.database import engine
+
+# Same DDL as backend/db/init.sql ("Monthly Ledger" section), one statement per entry.
+STATEMENTS = [
+    """
+    CREATE TABLE IF NOT EXISTS monthly_ledger (
+        condominium_id UUID NOT NULL REFERENCES condominiums(id),
+        year INTEGER NOT NULL,
+        month INTEGER NOT NULL CHECK (month BETWEEN 1 AND 12),
+        type VARCHAR(20) NOT NULL CHECK (type IN ('RECEITA', 'DESPESA')),
+        total DECIMAL(14, 2) NOT NULL DEFAULT 0,
+        tx_count INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (condominium_id, year, month, type)
+    );
+    """,
+    "ALTER TABLE monthly_ledger ENABLE ROW LEVEL SECURITY;",
+    "DROP POLICY IF EXISTS monthly_ledger_policy ON monthly_ledger;",
+    """
+    CREATE POLICY monthly_ledger_policy ON monthly_ledger FOR SELECT
+        USING (condominium_id = current_condo_id());
+    """,
+    """
+    CREATE OR REPLACE FUNCTION monthly_ledger_trigger_func() RETURNS TRIGGER AS $$
+    BEGIN
+        -- Status/description edits do not move money between buckets
+        IF (TG_OP = 'UPDATE'
+            AND NEW.condominium_id = OLD.condominium_id
+            AND NEW.type = OLD.type
+            AND NEW.amount = OLD.amount
+            AND NEW.date = OLD.date) THEN
+            RETURN NULL;
+        END IF;
+
+        IF (TG_OP = 'UPDATE' OR TG_OP = 'DELETE') THEN
+            UPDATE monthly_ledger
+               SET total = total - OLD.amount,
+                   tx_count = tx_count - 1
+             WHERE condominium_id = OLD.condominium_id
+               AND year = EXTRACT(YEAR FROM OLD.date)::INTEGER
+               AND month = EXTRACT(MONTH FROM OLD.date)::INTEGER
+               AND type = OLD.type;
+        END IF;
+
+        IF (TG_OP = 'INSERT' OR TG_OP = 'UPDATE') THEN
+            INSERT INTO monthly_ledger (condominium_id, year, month, type, total, tx_count)
+            VALUES (NEW.condominium_id, EXTRACT(YEAR FROM NEW.date)::INTEGER, EXTRACT(MONTH FROM NEW.date)::INTEGER, NEW.type, NEW.amount, 1)
+            ON CONFLICT (condominium_id, year, month, type)
+            DO UPDATE SET total = monthly_ledger.total + EXCLUDED.total,
+                          tx_count = monthly_ledger.tx_count + 1;
+        END IF;
+
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql SECURITY DEFINER;
+    """,
+    "DROP TRIGGER IF EXISTS monthly_ledger_trigger ON transactions;",
+    """
+    CREATE TRIGGER monthly_ledger_trigger AFTER INSERT OR UPDATE OR DELETE ON transactions
+        FOR EACH ROW EXECUTE FUNCTION monthly_ledger_trigger_func();
+    """,
+    """
+    CREATE OR REPLACE FUNCTION rebuild_monthly_ledger(p_condo UUID DEFAULT NULL) RETURNS INTEGER AS $$
+    DECLARE
+        rows_written INTEGER;
+    BEGIN
+        -- Block concurrent writes to transactions so the rollup is consistent
+        LOCK TABLE transactions IN SHARE MODE;
+
+        DELETE FROM monthly_ledger WHERE p_condo IS NULL OR condominium_id = p_condo;
+
+        INSERT INTO monthly_ledger (condominium_id, year, month, type, total, tx_count)
+        SELECT condominium_id,
+               EXTRACT(YEAR FROM date)::INTEGER,
+               EXTRACT(MONTH FROM date)::INTEGER,
+               type,
+               SUM(amount),
+               COUNT(*)
+          FROM transactions
+         WHERE p_condo IS NULL OR condominium_id = p_condo
+         GROUP BY 1, 2, 3, 4;
+
+        GET DIAGNOSTICS rows_written = ROW_COUNT;
+        RETURN rows_written;
+    END;
+    $$ LANGUAGE plpgsql SECURITY DEFINER;
+    """,
+]
+
+async def create_monthly_ledger():
+    print("Creating monthly_ledger table and trigger...")
+    async with engine.begin() as conn:
+        for stmt in STATEMENTS:
+            await conn.execute(text(stmt))
+
+        # Backfill from existing transactions
+        rows = (await conn.execute(text("SELECT rebuild_monthly_ledger()"))).scalar()
+        print(f"monthly_ledger ready ({rows} month/type rows).")
+
+    await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(create_monthly_ledger())
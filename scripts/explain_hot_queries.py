@@ -0,0 +1,279 @@
+import sys
+import os
+import argparse
+import asyncio
+import json
+from sqlalchemy import text
+
+# Add backend directory to sys.path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from app.core import database
+from app.core.config import settings
+
+# Index advisor: runs EXPLAIN (ANALYZE, BUFFERS) over the app's hot queries and flags
+# sequential scans on tables with at least --min-rows rows. Exits 1 when a query is
+# flagged, so it can gate schema changes (see section 17 of backend/db/init.sql).
+#
+#   --seed        insert synthetic condominiums first (--condos x --rows per table);
+#                 everything runs in one transaction that is rolled back at the end
+#   --as-role     SET LOCAL ROLE before explaining, so RLS policies are part of the
+#                 plans (superusers and table owners bypass RLS)
+#
+# Usage: python scripts/explain_hot_queries.py [--seed] [--condos 50] [--rows 200] [--as-role app]
+
+SEED_TAG = "EXPLAIN seed"
+
+SEED = [
+    """INSERT INTO condominiums (name, cnpj_encrypted, cnpj_hash, address)
+       SELECT :tag, 'ENC(seed)', md5(random()::text || g || clock_timestamp()), 'Seed'
+       FROM generate_series(1, CAST(:condos AS int)) g""",
+    """INSERT INTO units (condominium_id, block, number)
+       SELECT c.id, 'B' || (n % 4), n::text
+       FROM condominiums c, generate_series(1, 60) n WHERE c.name = :tag""",
+    """INSERT INTO users (condominium_id, unit_id, name, email_encrypted, email_hash, password_hash, role, status, created_at)
+       SELECT u.condominium_id, u.id, 'Seed ' || u.number, 'ENC(seed)', md5(u.id::text) || md5(u.number),
+              'x', 'RESIDENTE', CASE WHEN random() < 0.9 THEN 'ATIVO' ELSE 'PENDENTE' END,
+              NOW() - random() * INTERVAL '720 days'
+       FROM units u JOIN condominiums c ON c.id = u.condominium_id WHERE c.name = :tag""",
+    """INSERT INTO common_areas (condominium_id, name)
+       SELECT c.id, 'Area ' || n FROM condominiums c, generate_series(1, 3) n WHERE c.name = :tag""",
+    # One booking every 2 hours per area: never overlapping (reservations_no_overlap)
+    """WITH residents AS (
+           SELECT condominium_id, array_agg(id) AS ids FROM users GROUP BY condominium_id
+       )
+       INSERT INTO reservations (condominium_id, common_area_id, user_id, start_time, end_time, status)
+       SELECT a.condominium_id, a.id, r.ids[1 + n % cardinality(r.ids)],
+              date_trunc('hour', NOW()) + INTERVAL '2 hours' * (n - CAST(:rows AS int) / 2),
+              date_trunc('hour', NOW()) + INTERVAL '2 hours' * (n - CAST(:rows AS int) / 2) + INTERVAL '1 hour',
+              (ARRAY['PENDENTE', 'CONFIRMADO', 'CANCELADO'])[1 + n % 3]
+       FROM common_areas a JOIN condominiums c ON c.id = a.condominium_id
+       JOIN residents r ON r.condominium_id = a.condominium_id, generate_series(1, CAST(:rows AS int) / 3) n
+       WHERE c.name = :tag""",
+    """WITH residents AS (
+           SELECT condominium_id, array_agg(id) AS ids FROM users GROUP BY condominium_id
+       )
+       INSERT INTO violations (condominium_id, resident_id, type, description, created_at)
+       SELECT c.id, r.ids[1 + n % cardinality(r.ids)], 'ADVERTENCIA', 'Seed',
+              NOW() - random() * INTERVAL '720 days'
+       FROM condominiums c JOIN residents r ON r.condominium_id = c.id, generate_series(1, CAST(:rows AS int)) n
+       WHERE c.name = :tag""",
+    """WITH residents AS (
+           SELECT condominium_id, array_agg(id) AS ids FROM users GROUP BY condominium_id
+       )
+       INSERT INTO occurrences (condominium_id, user_id, title, description, category, status, created_at)
+       SELECT c.id, r.ids[1 + n % cardinality(r.ids)], 'Seed', 'Seed', 'Outro',
+              (ARRAY['ABERTO', 'RESOLVIDO', 'FECHADO'])[1 + n % 3], NOW() - random() * INTERVAL '720 days'
+       FROM condominiums c JOIN residents r ON r.condominium_id = c.id, generate_series(1, CAST(:rows AS int)) n
+       WHERE c.name = :tag""",
+    """INSERT INTO announcements (condominium_id, title, description, type, created_at)
+       SELECT c.id, 'Seed', 'Seed', 'Geral', NOW() - random() * INTERVAL '720 days'
+       FROM condominiums c, generate_series(1, CAST(:rows AS int) / 4) n WHERE c.name = :tag""",
+    """INSERT INTO documents (condominium_id, title, category, file_path, mime_type, file_size, is_active, created_at)
+       SELECT c.id, 'Seed', 'Outros', 'seed.pdf', 'application/pdf', 1, n % 10 <> 0,
+              NOW() - random() * INTERVAL '720 days'
+       FROM condominiums c, generate_series(1, CAST(:rows AS int) / 4) n WHERE c.name = :tag""",
+    """INSERT INTO inventory_items (condominium_id, name, category, unit)
+       SELECT c.id, 'Item ' || n, 'Limpeza', 'un'
+       FROM condominiums c, generate_series(1, CAST(:rows AS int) / 4) n WHERE c.name = :tag""",
+    """INSERT INTO bylaws (condominium_id, title, category)
+       SELECT c.id, 'Seed', (ARRAY['Geral', 'Barulho', 'Garagem'])[1 + n % 3]
+       FROM condominiums c, generate_series(1, 20) n WHERE c.name = :tag""",
+    """INSERT INTO readings_gas (condominium_id, supplier, purchase_date, total_price,
+                                cylinder_1_kg, cylinder_2_kg, cylinder_3_kg, cylinder_4_kg, created_at)
+       SELECT c.id, 'Seed', CURRENT_DATE - n, 1, 1, 1, 1, 1, NOW() - INTERVAL '1 day' * n
+       FROM condominiums c, generate_series(1, CAST(:rows AS int) / 4) n WHERE c.name = :tag""",
+    """INSERT INTO occupation_history (condominium_id, user_id, unit_id, profile_type, end_date)
+       SELECT u.condominium_id, u.id, u.unit_id, 'PROPRIETARIO', CASE WHEN n = 1 THEN NULL ELSE NOW() END
+       FROM users u JOIN condominiums c ON c.id = u.condominium_id, generate_series(1, 2) n
+       WHERE c.name = :tag""",
+]
+
+# (name, role, SQL). Same shapes as the repositories; condominium_id filters that only
+# RLS adds (e.g. UserRepository.get_all) are written out so they also show up when
+# the check runs as a superuser.
+CATALOG = [
+    ("login", "", """
+        SELECT * FROM users WHERE email_hash = :email_hash AND deleted_at IS NULL"""),
+    ("users.pending", "ADMIN", """
+        SELECT * FROM users WHERE condominium_id = :condo AND status = 'PENDENTE' LIMIT 100"""),
+    ("users.by_unit", "ADMIN", """
+        SELECT * FROM users WHERE unit_id = :unit"""),
+    ("dashboard.counters", "ADMIN", """
+        SELECT count(*) FILTER (WHERE status = 'ATIVO' AND unit_id IS NOT NULL),
+               count(DISTINCT unit_id) FILTER (WHERE status = 'ATIVO' AND unit_id IS NOT NULL),
+               count(*) FILTER (WHERE status = 'PENDENTE' AND role = 'RESIDENTE'),
+               (SELECT count(*) FROM units WHERE condominium_id = :condo),
+               (SELECT count(*) FROM occurrences WHERE condominium_id = :condo AND status = 'ABERTO'),
+               (SELECT count(*) FROM reservations WHERE condominium_id = :condo AND status = 'PENDENTE')
+        FROM users WHERE condominium_id = :condo"""),
+    ("dashboard.recent_residents", "ADMIN", """
+        SELECT u.id, u.name, un.block, un.number FROM users u LEFT JOIN units un ON un.id = u.unit_id
+        WHERE u.condominium_id = :condo AND u.role = 'RESIDENTE' AND u.status = 'ATIVO'
+        ORDER BY u.created_at DESC LIMIT 5"""),
+    ("units.list", "ADMIN", """
+        SELECT * FROM units WHERE condominium_id = :condo ORDER BY block, number"""),
+    ("common_areas.list", "RESIDENTE", """
+        SELECT * FROM common_areas WHERE condominium_id = :condo"""),
+    ("reservations.list", "ADMIN", """
+        SELECT r.*, u.name, a.name FROM reservations r
+        JOIN users u ON u.id = r.user_id JOIN common_areas a ON a.id = r.common_area_id
+        WHERE r.condominium_id = :condo ORDER BY r.start_time DESC LIMIT 100"""),
+    ("reservations.mine", "RESIDENTE", """
+        SELECT * FROM reservations WHERE condominium_id = :condo AND user_id = :user
+        ORDER BY start_time DESC LIMIT 100"""),
+    ("reservations.overlap", "RESIDENTE", """
+        SELECT id FROM reservations
+        WHERE common_area_id = :area AND status IN ('PENDENTE', 'CONFIRMADO', 'BLOQUEADO')
+          AND period && tstzrange(NOW(), NOW() + INTERVAL '2 hours', '[)') LIMIT 1"""),
+    ("reservations.availability", "RESIDENTE", """
+        SELECT start_time, end_time FROM reservations
+        WHERE common_area_id = :area AND status IN ('PENDENTE', 'CONFIRMADO', 'BLOQUEADO')
+          AND period && tstzrange(NOW(), NOW() + INTERVAL '31 days', '[)') ORDER BY start_time"""),
+    ("violations.list", "ADMIN", """
+        SELECT * FROM violations WHERE condominium_id = :condo ORDER BY created_at DESC LIMIT 100"""),
+    ("violations.mine", "RESIDENTE", """
+        SELECT * FROM violations WHERE condominium_id = :condo AND resident_id = :user
+        ORDER BY created_at DESC LIMIT 100"""),
+    ("notifications.violations", "RESIDENTE", """
+        SELECT id, type, description, created_at FROM violations WHERE resident_id = :user
+        ORDER BY created_at DESC LIMIT 5"""),
+    ("notifications.announcements", "RESIDENTE", """
+        SELECT id, title, description, created_at FROM announcements WHERE condominium_id = :condo
+        ORDER BY created_at DESC LIMIT 5"""),
+    ("occurrences.list", "ADMIN", """
+        SELECT * FROM occurrences WHERE condominium_id = :condo ORDER BY created_at DESC LIMIT 100"""),
+    ("occurrences.mine", "RESIDENTE", """
+        SELECT * FROM occurrences WHERE condominium_id = :condo AND user_id = :user
+        ORDER BY created_at DESC LIMIT 100"""),
+    ("documents.active", "RESIDENTE", """
+        SELECT * FROM documents WHERE condominium_id = :condo AND is_active
+        ORDER BY created_at DESC LIMIT 100"""),
+    ("inventory.list", "ADMIN", """
+        SELECT * FROM inventory_items WHERE condominium_id = :condo ORDER BY name LIMIT 100"""),
+    ("bylaws.category", "RESIDENTE", """
+        SELECT * FROM bylaws WHERE condominium_id = :condo AND category = 'Geral'"""),
+    ("readings.gas", "ADMIN", """
+        SELECT * FROM readings_gas WHERE condominium_id = :condo ORDER BY created_at DESC LIMIT 100"""),
+    ("occupation.open", "ADMIN", """
+        SELECT * FROM occupation_history WHERE user_id = :user AND end_date IS NULL"""),
+    ("sessions.mine", "RESIDENTE", """
+        SELECT * FROM refresh_tokens WHERE user_id = :user AND revoked_at IS NULL"""),
+    ("access_logs.mine", "RESIDENTE", """
+        SELECT * FROM access_logs WHERE user_id = :user ORDER BY created_at DESC LIMIT 5"""),
+    ("transactions.month", "FINANCEIRO", """
+        SELECT * FROM transactions WHERE condominium_id = :condo
+          AND date >= date_trunc('month', CURRENT_DATE) AND date < date_trunc('month', CURRENT_DATE) + INTERVAL '1 month'
+        ORDER BY date DESC, id DESC LIMIT 50"""),
+]
+
+SEEDED_TABLES = [
+    "condominiums", "units", "users", "common_areas", "reservations", "violations", "occurrences",
+    "announcements", "documents", "inventory_items", "bylaws", "readings_gas", "occupation_history",
+]
+
+def walk(node: dict):
+    yield node
+    for child in node.get("Plans", ()):
+        yield from walk(child)
+
+async def pick_targets(conn, seeded: bool) -> dict:
+    if seeded:
+        query = text("SELECT id FROM condominiums WHERE name = :tag LIMIT 1").bindparams(tag=SEED_TAG)
+    else:
+        query = text("SELECT condominium_id FROM users WHERE role = 'ADMIN' LIMIT 1")
+    condo = (await conn.execute(query)).scalar()
+    resident = (await conn.execute(text(
+        "SELECT id, unit_id, email_hash FROM users WHERE condominium_id = :condo AND role = 'RESIDENTE' "
+        "ORDER BY unit_id NULLS LAST LIMIT 1"
+    ), {"condo": condo})).first()
+    area = (await conn.execute(
+        text("SELECT id FROM common_areas WHERE condominium_id = :condo LIMIT 1"), {"condo": condo}
+    )).scalar()
+    return {
+        "condo": condo, "area": area,
+        "user": resident.id if resident else None,
+        "unit": resident.unit_id if resident else None,
+        "email_hash": resident.email_hash if resident else None,
+    }
+
+async def explain(conn, name: str, role: str, sql: str, params: dict, min_rows: int) -> dict:
+    await conn.execute(database.SET_SECURITY_CONTEXT_SQL, {
+        "uid": str(params["user"] or ""), "cid": str(params["condo"] or ""), "role": role,
+        "key": settings.APP_ENCRYPTION_KEY, "ip": ""
+    })
+    used = {k: v for k, v in params.items() if f":{k}" in sql}
+    raw = (await conn.execute(text(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}"), used)).scalar()
+    result = (json.loads(raw) if isinstance(raw, str) else raw)[0]
+    plan = result["Plan"]
+
+    flagged, scans = [], []
+    for node in walk(plan):
+        relation = node.get("Relation Name")
+        if not relation:
+            continue
+        scans.append(f"{node['Node Type']}({node.get('Index Name') or relation})")
+        if node["Node Type"] == "Seq Scan":
+            rows = (await conn.execute(
+                text("SELECT reltuples::bigint FROM pg_class WHERE oid = CAST(:rel AS regclass)"), {"rel": relation}
+            )).scalar()
+            if rows >= min_rows:
+                flagged.append(f"{relation} (~{rows} rows)")
+    return {
+        "name": name,
+        "ms": result["Execution Time"],
+        "hit": plan.get("Shared Hit Blocks", 0),
+        "read": plan.get("Shared Read Blocks", 0),
+        "scans": scans,
+        "flagged": flagged,
+    }
+
+async def main(args) -> int:
+    async with database.engine.connect() as conn:
+        trans = await conn.begin()
+        try:
+            if args.seed:
+                params = {"tag": SEED_TAG, "condos": args.condos, "rows": args.rows}
+                for stmt in SEED:
+                    await conn.execute(text(stmt), {k: v for k, v in params.items() if f":{k}" in stmt})
+                for table in SEEDED_TABLES:
+                    await conn.execute(text(f"ANALYZE {table}"))
+                print(f"Seeded {args.condos} condominiums ({args.rows} rows per table each), rolled back at exit\n")
+
+            targets = await pick_targets(conn, args.seed)
+            if targets["condo"] is None:
+                print("No condominium to explain against (run with --seed)")
+                return 2
+            if args.as_role:
+                await conn.execute(text(f'SET LOCAL ROLE "{args.as_role}"'))
+
+            reports = []
+            for name, role, sql in CATALOG:
+                missing = [k for k, v in targets.items() if v is None and f":{k}" in sql]
+                if missing:
+                    print(f"{name:<30} skipped (no {', '.join(missing)})")
+                    continue
+                reports.append(await explain(conn, name, role, sql, targets, args.min_rows))
+        finally:
+            await trans.rollback()
+    await database.engine.dispose()
+
+    print(f"{'query':<30}{'ms':>9}{'hit':>8}{'read':>8}  plan")
+    for r in reports:
+        mark = "SEQ " if r["flagged"] else "    "
+        print(f"{r['name']:<30}{r['ms']:>9.2f}{r['hit']:>8}{r['read']:>8}  {mark}{', '.join(r['scans'])}")
+
+    flagged = [r for r in reports if r["flagged"]]
+    print(f"\n{len(reports)} queries, {len(flagged)} with sequential scans on tables >= {args.min_rows} rows")
+    for r in flagged:
+        print(f"  {r['name']}: {', '.join(r['flagged'])}")
+    return 1 if flagged else 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="EXPLAIN the app's hot queries and flag sequential scans")
+    parser.add_argument("--seed", action="store_true", help="insert synthetic data first (rolled back)")
+    parser.add_argument("--condos", type=int, default=50)
+    parser.add_argument("--rows", type=int, default=200, help="rows per condominium for the main tables")
+    parser.add_argument("--min-rows", type=int, default=1000, help="ignore sequential scans of smaller tables")
+    parser.add_argument("--as-role", help="role to explain as, so RLS policies apply")
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,30 @@
+import sys
+import os
+import asyncio
+import argparse
+
+# Add backend directory to sys.path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from app.core.config import settings
+from app.documents.storage import get_storage
+
+# Garbage collection of the document storage (DOCUMENT_STORAGE): removes
+# contents no document references anymore. Required with DOCUMENT_STORAGE=s3,
+# where releasing the last reference does not delete the object (see
+# S3Storage); with local storage it only clears blobs orphaned by a crash.
+# Run periodically from cron, e.g. hourly.
+# Usage: python scripts/gc_document_storage.py [--grace SECONDS]
+
+async def main(grace: float):
+    storage = get_storage()
+    counts = await storage.collect_garbage(grace)
+    print(f"{type(storage).__name__} ({settings.DOCUMENT_STORAGE}): "
+          + ", ".join(f"{name} {count}" for name, count in counts.items()))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Remove unreferenced document contents.")
+    parser.add_argument("--grace", type=float, default=3600,
+                        help="minimum age (seconds) of an unreferenced object before it is removed")
+    args = parser.parse_args()
+    asyncio.run(main(args.grace))
@@ -0,0 +1,61 @@
+import sys
+import os
+import asyncio
+import statistics
+import time
+
+# Add backend directory to sys.path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from app.core import security
+from app.core.config import settings
+
+# Event-loop latency while N logins verify bcrypt passwords concurrently.
+#   inline: security.verify_password called directly in the coroutine (old behaviour)
+#   pool:   security.verify_password_async (bounded bcrypt thread pool)
+# A probe task sleeps TICK seconds in a loop; the overshoot of each wake-up is how
+# long any other request on this worker would have been stalled.
+# Usage: python scripts/load_test_password_hashing.py [concurrent_logins]
+
+TICK = 0.005
+
+async def probe(samples: list, stop: asyncio.Event):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(TICK)
+        samples.append((time.perf_counter() - start - TICK) * 1000)
+
+async def login_inline(password: str, hashed: str):
+    await asyncio.sleep(0)
+    return security.verify_password(password, hashed)
+
+async def login_pool(password: str, hashed: str):
+    return await security.verify_password_async(password, hashed)
+
+async def run(name: str, login, logins: int, hashed: str):
+    samples, stop = [], asyncio.Event()
+    probe_task = asyncio.create_task(probe(samples, stop))
+    await asyncio.sleep(TICK * 2)
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(login("Senha@123", hashed) for _ in range(logins)), return_exceptions=True)
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    await probe_task
+    rejected = sum(1 for r in results if isinstance(r, Exception))
+    samples.sort()
+    p50 = statistics.median(samples)
+    p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+    print(f"{name:<8}{elapsed:>10.2f}{p50:>12.2f}{p99:>12.2f}{samples[-1]:>12.2f}{rejected:>10}")
+
+async def main(logins: int):
+    hashed = security.get_password_hash("Senha@123")
+    print(f"bcrypt cost {settings.PASSWORD_BCRYPT_ROUNDS}, {logins} concurrent logins, "
+          f"{settings.PASSWORD_HASH_WORKERS} hash workers, queue limit {settings.PASSWORD_HASH_QUEUE_LIMIT}\n")
+    print(f"{'mode':<8}{'total (s)':>10}{'lag p50 ms':>12}{'lag p99 ms':>12}{'lag max ms':>12}{'503s':>10}")
+    await run("inline", login_inline, logins, hashed)
+    await run("pool", login_pool, logins, hashed)
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 20))
@@ -0,0 +1,65 @@
+import sys
+import os
+import asyncio
+import shutil
+from sqlalchemy import text
+
+# Add backend directory to sys.path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from app.core import database
+from app.documents.storage import get_storage, is_digest
+
+# Moves documents stored before the content-addressed layout
+# (backend/storage/uploads/documents/<condo>/<uuid><ext>, file_path = that path)
+# into the configured storage backend and points file_path at the new key.
+# Safe to re-run: rows already holding a key are skipped. Needs a role that
+# bypasses RLS on documents (e.g. postgres).
+# Usage: python scripts/migrate_documents_to_cas.py [--dry-run]
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+def locate(path: str):
+    # Legacy paths are relative to the API's working directory (repo root or backend/)
+    for candidate in (path, os.path.join(ROOT, path), os.path.join(ROOT, 'backend', path)):
+        if os.path.isfile(candidate):
+            return candidate
+    return None
+
+async def main(dry_run: bool):
+    storage = get_storage()
+    async with database.engine.connect() as conn:
+        rows = (await conn.execute(text("SELECT id, file_path FROM documents ORDER BY created_at"))).all()
+
+    moved = missing = 0
+    for doc_id, file_path in rows:
+        if is_digest(file_path):
+            continue
+        source = locate(file_path)
+        if source is None:
+            print(f"{doc_id}: file not found ({file_path})")
+            missing += 1
+            continue
+        if dry_run:
+            print(f"{doc_id}: {source}")
+            moved += 1
+            continue
+
+        # put() consumes its input: hand it a copy, the original goes only after the UPDATE
+        staged = storage.staging_path()
+        await asyncio.to_thread(shutil.copyfile, source, staged)
+        key = await storage.put(staged, str(doc_id))
+        async with database.engine.begin() as conn:
+            await conn.execute(
+                text("UPDATE documents SET file_path = :key WHERE id = :id AND file_path = :old"),
+                {"key": key, "id": doc_id, "old": file_path}
+            )
+        await asyncio.to_thread(os.remove, source)
+        print(f"{doc_id}: {file_path} -> {key}")
+        moved += 1
+
+    print(f"\n{moved} documents {'to migrate' if dry_run else 'migrated'}, {missing} files missing")
+    await database.engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(main("--dry-run" in sys.argv))
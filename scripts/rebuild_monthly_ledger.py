@@ -0,0 +1,25 @@
+import sys
+import os
+import asyncio
+from sqlalchemy import text
+
+# Add backend directory to sys.path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from app.core.database import engine
+
+# Re-derives monthly_ledger from transactions (e.g. after a bulk fix done with triggers disabled).
+# Usage: python scripts/rebuild_monthly_ledger.py [condominium_id]
+async def rebuild(condo_id: str = None):
+    async with engine.begin() as conn:
+        rows = (await conn.execute(
+            text("SELECT rebuild_monthly_ledger(CAST(:condo_id AS UUID))"),
+            {"condo_id": condo_id}
+        )).scalar()
+        scope = condo_id or "all condominiums"
+        print(f"monthly_ledger rebuilt for {scope}: {rows} month/type rows.")
+
+    await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(rebuild(sys.argv[1] if len(sys.argv) > 1 else None))
@@ -0,0 +1,100 @@
+import sys
+import os
+import asyncio
+import random
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import text
+
+# Add backend directory to sys.path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from fastapi import HTTPException
+import app.main  # noqa: F401 (registers every model)
+from app.core import database
+from app.core.config import settings
+from app.reservations.schemas import ReservationCreate
+from app.reservations.service import ReservationService
+
+# Concurrent booking stress test for the reservations_no_overlap constraint.
+#   same slot:    N clients book the exact same slot at once -> exactly 1 must succeed
+#   random slots: N clients book random overlapping windows -> no overlap may be stored
+# Runs against a temporary common area of the first ADMIN's condominium, removed at the end.
+# Usage: python scripts/stress_reservation_booking.py [clients]
+
+async def book(admin, area_id, start, end) -> tuple:
+    session = database.AsyncSessionLocal()
+    session.info[database.SECURITY_CONTEXT_KEY] = {
+        "uid": str(admin.id), "cid": str(admin.condominium_id), "role": "ADMIN",
+        "key": settings.APP_ENCRYPTION_KEY, "ip": None
+    }
+    began = time.perf_counter()
+    try:
+        await ReservationService(session).create_reservation(
+            ReservationCreate(common_area_id=area_id, start_time=start, end_time=end, status="CONFIRMADO"),
+            admin.id, "ADMIN", admin.condominium_id
+        )
+        outcome = "ok"
+    except HTTPException as e:
+        outcome = str(e.status_code)
+    finally:
+        await session.close()
+    return outcome, (time.perf_counter() - began) * 1000
+
+def report(label: str, results: list) -> None:
+    outcomes = {}
+    for outcome, _ in results:
+        outcomes[outcome] = outcomes.get(outcome, 0) + 1
+    latencies = sorted(ms for _, ms in results)
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(f"{label:<14} {outcomes}  p50 {statistics.median(latencies):.1f} ms  p99 {p99:.1f} ms")
+
+async def main(clients: int):
+    async with database.AsyncSessionLocal() as db:
+        admin = (await db.execute(text(
+            "SELECT id, condominium_id FROM users WHERE role = 'ADMIN' LIMIT 1"
+        ))).one()
+        area_id = uuid.uuid4()
+        await db.execute(text(
+            "INSERT INTO common_areas (id, condominium_id, name) VALUES (:id, :condo, :name)"
+        ), {"id": area_id, "condo": admin.condominium_id, "name": f"Stress test {area_id.hex[:8]}"})
+        await db.commit()
+
+    try:
+        base = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0) + timedelta(days=30)
+
+        results = await asyncio.gather(*[
+            book(admin, area_id, base, base + timedelta(hours=2)) for _ in range(clients)
+        ])
+        report("same slot", results)
+        assert sum(1 for outcome, _ in results if outcome == "ok") == 1, "more than one booking of the same slot"
+
+        day = base + timedelta(days=1)
+        windows = []
+        for _ in range(clients):
+            start = day + timedelta(minutes=30 * random.randrange(0, 96))
+            windows.append((start, start + timedelta(minutes=30 * random.randint(1, 6))))
+        results = await asyncio.gather(*[book(admin, area_id, s, e) for s, e in windows])
+        report("random slots", results)
+
+        async with database.AsyncSessionLocal() as db:
+            overlaps = (await db.execute(text("""
+                SELECT count(*) FROM reservations a JOIN reservations b
+                  ON b.common_area_id = a.common_area_id AND b.id > a.id AND a.period && b.period
+                WHERE a.common_area_id = :area
+                  AND a.status IN ('PENDENTE', 'CONFIRMADO', 'BLOQUEADO')
+                  AND b.status IN ('PENDENTE', 'CONFIRMADO', 'BLOQUEADO')
+            """), {"area": area_id})).scalar()
+        print(f"overlapping pairs stored: {overlaps}")
+        assert overlaps == 0
+    finally:
+        async with database.AsyncSessionLocal() as db:
+            await db.execute(text("DELETE FROM reservations WHERE common_area_id = :area"), {"area": area_id})
+            await db.execute(text("DELETE FROM common_areas WHERE id = :area"), {"area": area_id})
+            await db.commit()
+        await database.engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 200))
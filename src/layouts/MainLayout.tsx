@@ -48,7 +48,7 @@ const MainLayout: React.FC<LayoutProps> = ({
 
   useEffect(() => {
     if (user) {
-      NotificationService.getAll()
+      const loadNotifications = () => NotificationService.getAll()
         .then(data => {
           setNotifications(data);
           if (data.some(note => !note.read)) {
@@ -56,6 +56,14 @@ const MainLayout: React.FC<LayoutProps> = ({
           }
         })
         .catch(err => console.error("Failed to fetch notifications", err));
+
+      loadNotifications();
+      // Refetch only when the server reports a change that affects the feed
+      return NotificationService.subscribe(table => {
+        if (table === 'announcements' || table === 'violations' || table === 'resync') {
+          loadNotifications();
+        }
+      });
     }
   }, [user]);
 
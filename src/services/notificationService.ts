@@ -1,5 +1,7 @@
 import api from './api';
 
+const API_URL = import.meta.env.VITE_API_URL || '/api/v1';
+
 export interface Notification {
     id: string;
     title: string;
@@ -17,5 +19,49 @@ export const NotificationService = {
     },
     markAllAsRead: async () => {
         await api.post('/notifications/read-all');
+    },
+    // Live change notices (SSE). `onEvent` receives the table that changed,
+    // or 'resync' when everything should be reloaded. Returns the unsubscribe function.
+    subscribe: (onEvent: (table: string) => void) => {
+        const tables = ['announcements', 'violations', 'occurrences', 'reservations', 'users', 'resync'];
+        let source: EventSource | null = null;
+        let retryTimer: number | undefined;
+        let closed = false;
+
+        const open = () => {
+            source = new EventSource(`${API_URL}/events/stream`, { withCredentials: true });
+            tables.forEach(table => source!.addEventListener(table, () => onEvent(table)));
+            // EventSource retries dropped connections by itself but gives up on a non-200
+            // response: the 401 once the stream's access token (and its cookie) expired
+            source.onerror = () => {
+                if (!closed && source?.readyState === EventSource.CLOSED) {
+                    retryTimer = window.setTimeout(reconnect, 5000);
+                }
+            };
+        };
+
+        const reconnect = async () => {
+            if (closed) return;
+            try {
+                await api.post('/auth/refresh');
+            } catch (error: any) {
+                // Session is gone (the app handles the logout); otherwise try again later
+                if (error.response?.status !== 401 && !closed) {
+                    retryTimer = window.setTimeout(reconnect, 5000);
+                }
+                return;
+            }
+            if (closed) return;
+            open();
+            // Changes made while disconnected were not delivered
+            onEvent('resync');
+        };
+
+        open();
+        return () => {
+            closed = true;
+            window.clearTimeout(retryTimer);
+            source?.close();
+        };
     }
 };